@@ -0,0 +1,339 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Message codec benchmarks
+************************
+
+:module: codec_benchmark
+
+:synopsis: measure the message codec, checksum and serial framing hot
+    paths.
+
+Each benchmark is run for every payload: no tlv, a small tlv, a set of
+tlvs of all the supported value types and a payload of 255 bytes. The
+report gives the operations per second, from the median of several
+timing runs, and the peak memory allocated by one operation together
+with the number of memory blocks it leaves allocated.
+
+.. code:: bash
+
+    python benchmarks/codec_benchmark.py --save baseline.json
+    python benchmarks/codec_benchmark.py --compare baseline.json
+
+When comparing, the command fails if a benchmark is slower, or
+allocates more, than the baseline by more than the tolerance. The
+throughput is compared using the best timing run, which is the least
+sensitive to the load of the machine, and a benchmark slower than the
+baseline is measured again before being reported.
+
+.. currentmodule:: codec_benchmark
+
+"""
+
+import argparse
+import collections
+import io
+import json
+import logging
+import statistics
+import struct
+import sys
+import timeit
+import tracemalloc
+from typing import Callable, Dict, Optional
+from unittest import mock
+
+from pykiso.lib.connectors import cc_uart, cc_usb
+from pykiso.message import (
+    MAX_MESSAGE_SIZE,
+    Message,
+    MessageStreamDecoder,
+    MessageType,
+    TlvKnownTags,
+)
+
+# allocation differences ignored when comparing with a baseline
+ALLOCATION_MARGIN = 64
+BLOCK_MARGIN = 2
+# timing runs of each benchmark, and measurements of a slower benchmark
+REPEAT = 20
+RETRIES = 2
+
+PAYLOADS = {
+    "empty": None,
+    "small": {TlvKnownTags.TEST_REPORT: "OK"},
+    "mixed": {
+        TlvKnownTags.TEST_REPORT: 0x1234,
+        TlvKnownTags.FAILURE_REASON: b"\x00\xc0\xdb" * 10,
+    },
+    "max": {TlvKnownTags.FAILURE_REASON: "x" * 253},
+}
+
+# the fields missing from older baselines are not compared
+Result = collections.namedtuple(
+    "Result",
+    ["ops_per_sec", "peak_bytes", "best_ops_per_sec", "blocks"],
+    defaults=(None, None),
+)
+
+
+class LoopbackSerial:
+    """In-memory replacement of serial.Serial for the serial connectors."""
+
+    def __init__(self):
+        self.timeout = None
+        self.baudrate = 115200
+        self.written = io.BytesIO()
+        self.received = io.BytesIO()
+
+    def write(self, data: bytes) -> int:
+        return self.written.write(data)
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self.received.getbuffer()) - self.received.tell()
+
+    def read(self, size: int = 1) -> bytes:
+        return self.received.read(size)
+
+    def flushOutput(self) -> None:
+        pass
+
+
+def _serial_connector(connector_class: type) -> cc_uart.CCUart:
+    """Create a serial connector communicating with a LoopbackSerial.
+
+    :param connector_class: CCUart or one of its subclasses
+
+    :return: the connector
+    """
+    connector = connector_class("loopback")
+    connector.serial = LoopbackSerial()
+    return connector
+
+
+def build_benchmarks(payload_name: str) -> Dict[str, Callable[[], object]]:
+    """Create the benchmarked operations for a payload.
+
+    :param payload_name: key of the payload in PAYLOADS
+
+    :return: operations to benchmark, by name
+    """
+    msg = Message(msg_type=MessageType.LOG, tlv_dict=PAYLOADS[payload_name])
+    packet = msg.serialize()
+    tlv_packet = packet[Message.header_size : -Message.crc_byte_size]
+    buffer = bytearray(MAX_MESSAGE_SIZE)
+    decoder = MessageStreamDecoder()
+
+    uart = _serial_connector(cc_uart.CCUart)
+    usb = _serial_connector(cc_usb.CCUsb)
+    # the device sends its packets without the message CRC
+    device_packet = packet[: -Message.crc_byte_size]
+    uart._send_using_slip(
+        struct.pack(">H", uart._calculate_crc32(device_packet)) + device_packet
+    )
+    slip_packet = uart.serial.written.getvalue()
+
+    def decode_stream():
+        decoder.feed(packet)
+        return decoder.get_message()
+
+    def serial_send(connector):
+        connector.serial.written.seek(0)
+        connector._cc_send(msg)
+
+    def uart_receive():
+        uart.serial.received = io.BytesIO(slip_packet)
+        return uart._cc_receive()
+
+    return {
+        "message.serialize": msg.serialize,
+        "message.serialize_into": lambda: msg.serialize_into(buffer),
+        "message.parse_packet": lambda: Message.parse_packet(packet),
+        "message.parse_packet_lazy": lambda: Message.parse_packet(packet, True),
+        "message.parse_tlv": lambda: list(Message._parse_tlv(tlv_packet)),
+        "message.get_crc": lambda: Message.get_crc(packet),
+        "stream.decode": decode_stream,
+        "uart.send": lambda: serial_send(uart),
+        "uart.receive": uart_receive,
+        "usb.send": lambda: serial_send(usb),
+    }
+
+
+def measure(operation: Callable[[], object], repeat: int = REPEAT) -> Result:
+    """Measure the throughput and allocations of an operation.
+
+    :param operation: operation to measure
+    :param repeat: number of timing runs, each one lasting at least
+        50 milliseconds
+
+    :return: median and best operations per second, peak bytes
+        allocated per call and blocks still allocated after it
+    """
+    timer = timeit.Timer(operation)
+    # autorange targets runs of at least 0.2 seconds
+    number = max(1, timer.autorange()[0] // 4)
+    timings = timer.repeat(repeat, number)
+
+    # warm up caches before tracing the allocations of a single call
+    operation()
+    tracemalloc.start()
+    result = operation()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    # the blocks allocated by the call and kept, e.g. by its result
+    blocks = sum(
+        stat.count
+        for stat in snapshot.filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        ).statistics("filename")
+    )
+    return Result(
+        number / statistics.median(timings), peak_bytes, number / min(timings), blocks
+    )
+
+
+def remeasure(name: str) -> Result:
+    """Measure a benchmark again.
+
+    :param name: name of the benchmark, with its payload
+
+    :return: the new result
+    """
+    operation_name, payload_name = name[:-1].split("[")
+    with mock.patch.object(cc_uart.time, "sleep"):
+        return measure(build_benchmarks(payload_name)[operation_name])
+
+
+def _throughput_ratio(result: Result, reference: Result) -> float:
+    """Compare the throughput of a result with its reference.
+
+    :param result: current result
+    :param reference: result of the baseline
+
+    :return: current throughput relative to the reference one
+    """
+    if reference.best_ops_per_sec is None:
+        return result.ops_per_sec / reference.ops_per_sec
+    return result.best_ops_per_sec / reference.best_ops_per_sec
+
+
+def run(name_filter: Optional[str] = None) -> Dict[str, Result]:
+    """Run the benchmarks and print their results.
+
+    :param name_filter: only run the benchmarks containing this string
+
+    :return: the results, by benchmark name
+    """
+    results = {}
+    # the uart packets are parsed without their CRC, don't log the errors
+    logging.disable(logging.ERROR)
+    print(f"{'benchmark':45} {'ops/s':>12} {'peak B/op':>10} {'blocks/op':>10}")
+    # the uart connector waits for the transmission of the previous frame
+    with mock.patch.object(cc_uart.time, "sleep"):
+        for payload_name in PAYLOADS:
+            for name, operation in build_benchmarks(payload_name).items():
+                name = f"{name}[{payload_name}]"
+                if name_filter and name_filter not in name:
+                    continue
+                results[name] = result = measure(operation)
+                print(
+                    f"{name:45} {result.ops_per_sec:12.0f} "
+                    f"{result.peak_bytes:10} {result.blocks:10}"
+                )
+    return results
+
+
+def compare(
+    results: Dict[str, Result],
+    baseline: Dict[str, Dict],
+    tolerance: float,
+    retries: int = RETRIES,
+) -> bool:
+    """Compare the results with a baseline and print the regressions.
+
+    :param results: current results
+    :param baseline: results loaded from a saved baseline
+    :param tolerance: accepted relative slowdown or allocation increase
+    :param retries: number of times a slower benchmark is measured
+        again, its best throughput is kept
+
+    :return: True if no benchmark regressed
+    """
+    success = True
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        reference = Result(**baseline[name])
+        ratio = _throughput_ratio(result, reference)
+        for _ in range(retries):
+            if ratio >= 1 - tolerance:
+                break
+            ratio = max(ratio, _throughput_ratio(remeasure(name), reference))
+        if ratio < 1 - tolerance:
+            print(f"REGRESSION {name}: {ratio:.0%} of the baseline throughput")
+            success = False
+        allowed_bytes = reference.peak_bytes * (1 + tolerance) + ALLOCATION_MARGIN
+        if result.peak_bytes > allowed_bytes:
+            print(
+                f"REGRESSION {name}: allocates {result.peak_bytes} bytes "
+                f"instead of {reference.peak_bytes}"
+            )
+            success = False
+        if reference.blocks is not None and result.blocks > (
+            reference.blocks * (1 + tolerance) + BLOCK_MARGIN
+        ):
+            print(
+                f"REGRESSION {name}: keeps {result.blocks} blocks allocated "
+                f"instead of {reference.blocks}"
+            )
+            success = False
+    return success
+
+
+def main(argv=None) -> int:
+    """Run the benchmarks from the command line.
+
+    :param argv: command line arguments, sys.argv if None
+
+    :return: exit code, 1 if a regression was found
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with this JSON baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.3,
+        help="accepted relative regression (default: 0.3)",
+    )
+    parser.add_argument("--filter", help="only run the matching benchmarks")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter)
+    if args.save:
+        with open(args.save, "w") as baseline_file:
+            json.dump(
+                {name: result._asdict() for name, result in results.items()},
+                baseline_file,
+                indent=2,
+            )
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if not compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -74,7 +74,7 @@ setup(
         "pyvisa-py",
     ],
     tests_require=["pytest", "pytest-mock", "coverage"],
-    extras_require={},
+    extras_require={"numpy": ["numpy"]},
     setup_requires=[],
     entry_points={
         "console_scripts": [
@@ -22,9 +22,18 @@ pykiso - extensible framework for (embedded) integration testing.
 __version__ = "0.9.4"
 
 
-from . import auxiliary, cli, config_parser, connector, message, types
+from . import (
+    async_auxiliary,
+    auxiliary,
+    cli,
+    config_parser,
+    connector,
+    message,
+    types,
+)
+from .async_auxiliary import AsyncAuxiliaryInterface
 from .auxiliary import AuxiliaryInterface
-from .connector import CChannel, Flasher
+from .connector import AsyncCChannel, CChannel, Flasher
 from .message import Message
 from .test_coordinator import test_case, test_message_handler, test_suite
 from .test_coordinator.test_case import BasicTest, define_test_parameters
@@ -0,0 +1,448 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Asynchronous Auxiliary Interface Definition
+*******************************************
+
+:module: async_auxiliary
+
+:synopsis: Implementation of basic auxiliary functionality on top of an
+    asyncio event loop and adapter for the threaded auxiliaries.
+
+Contrary to :py:class:`pykiso.auxiliary.AuxiliaryInterface`, an
+asynchronous auxiliary doesn't own any thread: all its methods are
+coroutines, and the reception of messages runs as a task on the event
+loop the auxiliary instance was created on. Many auxiliaries can thus
+share one single thread.
+
+.. currentmodule:: async_auxiliary
+
+"""
+
+import abc
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import queue
+from typing import Any, Callable, List, Optional, Type
+
+from .auxiliary import AuxiliaryInterface
+from .message import Message
+from .types import MsgType
+from .worker_pool import get_adapter_executors
+
+log = logging.getLogger(__name__)
+
+
+class AsyncAuxiliaryInterface(abc.ABC):
+    """Defines the Interface of asynchronous Auxiliaries."""
+
+    def __init__(
+        self,
+        name: str = None,
+        is_proxy_capable: bool = False,
+        is_pausable: bool = False,
+        activate_log: List[str] = None,
+        receive_timeout: float = 0.01,
+    ):
+        """Auxiliary initialization.
+
+        :param name: alias of the auxiliary instance
+        :param is_proxy_capable: notify if the current auxiliary could
+            be (or not) associated to a proxy-auxiliary.
+        :param is_pausable: notify if the current auxiliary could be
+            (or not) paused
+        :param activate_log: loggers to deactivate
+        :param receive_timeout: maximum time in seconds a reception
+            waits for an incoming message
+        """
+        AuxiliaryInterface.initialize_loggers(activate_log)
+        self.name = name
+        self.is_proxy_capable = is_proxy_capable
+        self.is_pausable = is_pausable
+        self.receive_timeout = receive_timeout
+        self.is_instance = False
+        # event loop bound objects, created with the instance
+        self.lock = None
+        self.queue_out = None
+        self._receive_task = None
+
+    def __repr__(self):
+        name = self.name
+        repr_ = super().__repr__()
+        if name:
+            repr_ = repr_[:1] + f"{name} is " + repr_[1:]
+        return repr_
+
+    async def create_instance(self) -> bool:
+        """Create an auxiliary instance and ensure the communication to it.
+
+        :return: True - Successfully created / False - Failed by creation
+        """
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+            self.queue_out = asyncio.Queue()
+        async with self.lock:
+            if not self.is_instance:
+                self.is_instance = await self._create_auxiliary_instance()
+        if self.is_instance and not self.is_pausable and self._receive_task is None:
+            self._receive_task = asyncio.ensure_future(self._receive_loop())
+        return self.is_instance
+
+    async def delete_instance(self) -> bool:
+        """Delete an auxiliary instance and its communication to it.
+
+        :return: True - Successfully deleted / False - Failed deleting
+        """
+        await self._cancel_receive_task()
+        if not self.is_instance:
+            return False
+        async with self.lock:
+            return_code = await self._delete_auxiliary_instance()
+            self.is_instance = not return_code
+        return return_code
+
+    async def run_command(
+        self,
+        cmd_message: MsgType,
+        cmd_data: Any = None,
+        timeout_in_s: Optional[float] = None,
+    ) -> Any:
+        """Send a test request.
+
+        :param cmd_message: command request to the auxiliary
+        :param cmd_data: data you would like to populate the command with
+        :param timeout_in_s: Number of time (in s) you want to wait for
+            an answer, None to wait forever
+
+        :return: the command response, False if the auxiliary instance
+            is not created or if no reply was received within time
+        """
+        if not self.is_instance:
+            log.error(f"cannot run command '{cmd_message}': {self} is not created")
+            return False
+        log.debug(f"sending command '{cmd_message}' in {self}")
+        async with self.lock:
+            try:
+                return await asyncio.wait_for(
+                    self._run_command(cmd_message, cmd_data), timeout_in_s
+                )
+            except asyncio.TimeoutError:
+                log.debug("no reply received within time")
+                return False
+
+    async def wait_and_get_report(
+        self, blocking: bool = False, timeout_in_s: Optional[float] = 0
+    ) -> Optional[MsgType]:
+        """Wait for a message received by the auxiliary.
+
+        :param blocking: True: wait for timeout to expire, False: return immediately
+        :param timeout_in_s: if blocking, wait the defined time in seconds
+
+        :return: the received message / None - nothing received
+        """
+        try:
+            if not blocking:
+                return self.queue_out.get_nowait()
+            return await asyncio.wait_for(self.queue_out.get(), timeout_in_s)
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            return None
+
+    async def drain(
+        self, max_items: Optional[int] = None, timeout_in_s: Optional[float] = 0
+    ) -> List[MsgType]:
+        """Get all the messages received by the auxiliary at once.
+
+        :param max_items: maximum number of messages to return, None for
+            all of them
+        :param timeout_in_s: maximum time in seconds to wait for the first
+            message, 0 to return immediately and None to wait forever
+
+        :return: the received messages, oldest first, empty if nothing
+            was received within time
+        """
+        messages = []
+        if timeout_in_s != 0:
+            first = await self.wait_and_get_report(
+                blocking=True, timeout_in_s=timeout_in_s
+            )
+            if first is None:
+                return messages
+            messages.append(first)
+        while max_items is None or len(messages) < max_items:
+            try:
+                messages.append(self.queue_out.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return messages
+
+    async def abort_command(self, timeout_in_s: float = 25) -> bool:
+        """Force test to abort.
+
+        :param timeout_in_s: Number of time (in s) you want to wait
+            for an answer
+
+        :return: True - Abort was a success / False - if not
+        """
+        if not self.is_instance:
+            return False
+        async with self.lock:
+            try:
+                return await asyncio.wait_for(self._abort_command(), timeout_in_s)
+            except asyncio.TimeoutError:
+                log.info("no reply received within time")
+                return False
+
+    async def stop(self) -> None:
+        """Stop the reception and delete the auxiliary instance."""
+        if self.is_instance:
+            await self.delete_instance()
+        else:
+            await self._cancel_receive_task()
+        log.info(f"{self} was stopped")
+
+    async def _cancel_receive_task(self) -> None:
+        """Cancel the reception task if running."""
+        if self._receive_task is None:
+            return
+        self._receive_task.cancel()
+        try:
+            await self._receive_task
+        except asyncio.CancelledError:
+            pass
+        self._receive_task = None
+
+    async def _receive_loop(self) -> None:
+        """Reception task of the auxiliary, run as long as the instance
+        exists.
+
+        The lock is taken for each reception so that it never competes
+        with a running command for the channel.
+        """
+        while self.is_instance:
+            async with self.lock:
+                wait_time = await self._poll_instance()
+            await asyncio.sleep(wait_time)
+
+    async def _poll_instance(self) -> float:
+        """Receive a message from the auxiliary instance and forward it
+        via queue_out.
+
+        :return: time in seconds to wait before polling the instance
+            again
+        """
+        loop = asyncio.get_event_loop()
+        t_start = loop.time()
+        received_message = await self._receive_message(
+            timeout_in_s=self.receive_timeout
+        )
+        if received_message is not None:
+            self.queue_out.put_nowait(received_message)
+            return 0
+        # the channel returned before the end of the timeout
+        return max(0, self.receive_timeout - (loop.time() - t_start))
+
+    @abc.abstractmethod
+    async def _create_auxiliary_instance(self) -> bool:
+        """Create the auxiliary instance with witch we will communicate.
+
+        :return: True - Successfully created / False - Failed by creation
+        """
+        pass
+
+    @abc.abstractmethod
+    async def _delete_auxiliary_instance(self) -> bool:
+        """Delete the auxiliary instance with witch we will communicate.
+
+        :return: True - Successfully deleted / False - Failed deleting
+        """
+        pass
+
+    @abc.abstractmethod
+    async def _run_command(self, cmd_message: MsgType, cmd_data: bytes = None) -> Any:
+        """Run a command for the auxiliary.
+
+        :param cmd_message: command in form of a message to run
+        :param cmd_data: payload data for the command
+
+        :return: the command response
+        """
+        pass
+
+    @abc.abstractmethod
+    async def _abort_command(self) -> bool:
+        """Abort the sent command."""
+        pass
+
+    @abc.abstractmethod
+    async def _receive_message(self, timeout_in_s: float) -> Optional[MsgType]:
+        """Defines what needs to be done as a receive message.
+
+        :param timeout_in_s: How much time to wait on the receive
+
+        :return: the received message / None - Else
+        """
+        pass
+
+
+class AsyncAuxiliaryAdapter(AsyncAuxiliaryInterface):
+    """Run a threaded auxiliary (DUTAuxiliary, CommunicationAuxiliary,
+    ProxyAuxiliary,...) on an event loop.
+
+    The wrapped auxiliary is created without starting its thread, and
+    its internal methods are executed by the given executor. As a
+    CChannel can only be used by the thread that opened it, the default
+    executor is a single thread of
+    :py:class:`~pykiso.worker_pool.PinnedExecutorPool`, shared with
+    other adapters. The wrapped auxiliary instance is polled without
+    waiting, the adapter waits between two polls on the event loop.
+
+    A command sent by a pipelined auxiliary only holds the executor
+    thread while it is sent, its acknowledgement is then awaited on the
+    event loop. Otherwise, the executor thread is held until the wrapped
+    auxiliary's _run_command returns, e.g. for the whole wait for the
+    acknowledgement, and the adapters sharing it are stalled meanwhile.
+    """
+
+    # polling interval right after a message was received, doubled while idle
+    MIN_POLL_INTERVAL = 0.001
+
+    def __init__(
+        self,
+        auxiliary: Type[AuxiliaryInterface],
+        executor: concurrent.futures.Executor = None,
+        **kwargs,
+    ):
+        """Create the wrapped auxiliary.
+
+        :param auxiliary: threaded auxiliary class to wrap
+        :param executor: executor used to run the auxiliary's blocking
+            methods, a shared single thread executor if None
+        :param kwargs: auxiliary's parameters (name, connectors,...)
+        """
+        self.auxiliary = auxiliary(auto_start=False, **kwargs)
+        super().__init__(
+            name=self.auxiliary.name,
+            is_proxy_capable=self.auxiliary.is_proxy_capable,
+            is_pausable=self.auxiliary.is_pausable,
+            activate_log=kwargs.get("activate_log"),
+            receive_timeout=self.auxiliary.receive_timeout,
+        )
+        self._shared_executors = get_adapter_executors() if executor is None else None
+        self.executor = executor or self._shared_executors.acquire()
+        self._poll_interval = self.MIN_POLL_INTERVAL
+
+    def __getattr__(self, name: str) -> Any:
+        """Give access to the wrapped auxiliary's attributes (channel,
+        flash,...).
+        """
+        if name == "auxiliary":
+            raise AttributeError(name)
+        return getattr(self.auxiliary, name)
+
+    async def stop(self) -> None:
+        """Stop the reception, delete the wrapped auxiliary instance and
+        release the shared executor.
+        """
+        await super().stop()
+        if self._shared_executors is not None:
+            self._shared_executors.release(self.executor)
+            self._shared_executors = None
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking method of the wrapped auxiliary in the executor."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _create_auxiliary_instance(self) -> bool:
+        """Create the wrapped auxiliary instance.
+
+        :return: True - Successfully created / False - Failed by creation
+        """
+        return_code = await self._call(self.auxiliary._create_auxiliary_instance)
+        self.auxiliary.is_instance = return_code
+        return return_code
+
+    async def _delete_auxiliary_instance(self) -> bool:
+        """Delete the wrapped auxiliary instance.
+
+        :return: True - Successfully deleted / False - Failed deleting
+        """
+        return_code = await self._call(self.auxiliary._delete_auxiliary_instance)
+        self.auxiliary.is_instance = not return_code
+        await self._call(self.auxiliary._discard_pending_commands)
+        return return_code
+
+    async def _run_command(self, cmd_message: MsgType, cmd_data: bytes = None) -> Any:
+        """Run a command with the wrapped auxiliary.
+
+        :param cmd_message: command in form of a message to run
+        :param cmd_data: payload data for the command
+
+        :return: the command response
+        """
+        if not (self.auxiliary.is_pipelined and isinstance(cmd_message, Message)):
+            return await self._call(self.auxiliary._run_command, cmd_message, cmd_data)
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        try:
+            await self._call(
+                self.auxiliary._send_pipelined_command, cmd_message, cmd_data, future
+            )
+            # the acknowledgement is dispatched by the polls of the instance
+            self._poll_interval = self.MIN_POLL_INTERVAL
+            while not future.done():
+                wait_time = await self._poll_instance()
+                if not future.done():
+                    await asyncio.sleep(wait_time)
+            return future.result()
+        finally:
+            if not future.done():
+                await self._call(self.auxiliary._discard_pending_command, future)
+
+    async def _abort_command(self) -> bool:
+        """Abort the command with the wrapped auxiliary."""
+        return await self._call(self.auxiliary._abort_command)
+
+    async def _receive_message(self, timeout_in_s: float) -> Optional[MsgType]:
+        """Receive a message with the wrapped auxiliary.
+
+        :param timeout_in_s: How much time to wait on the receive
+
+        :return: the received message / None - Else
+        """
+        return await self._call(self.auxiliary._receive_message, timeout_in_s)
+
+    async def _poll_instance(self) -> float:
+        """Poll the wrapped auxiliary and forward everything it received
+        via queue_out.
+
+        The instance is polled without waiting, so that the shared
+        executor is never blocked. The polling interval doubles up to
+        receive_timeout while nothing is received.
+
+        :return: time in seconds to wait before polling the instance
+            again
+        """
+        received = await self._call(self.auxiliary._poll_instance, 0)
+        while True:
+            try:
+                self.queue_out.put_nowait(self.auxiliary.queue_out.get_nowait())
+            except queue.Empty:
+                break
+        if received:
+            self._poll_interval = self.MIN_POLL_INTERVAL
+            return 0
+        wait_time = self._poll_interval
+        self._poll_interval = min(2 * self._poll_interval, self.receive_timeout)
+        return wait_time
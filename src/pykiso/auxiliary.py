@@ -22,18 +22,42 @@ Auxiliary Interface Definition
 """
 
 import abc
+import concurrent.futures
+import copy
 import logging
 import queue
 import threading
 import time
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 
 from pykiso.test_setup.dynamic_loader import PACKAGE
 
+from .bounded_queue import BoundedQueue, OverflowPolicy, QueueMetrics
+from .connector import CChannel
+from .instrumentation import AuxiliaryStats
+from .message import Message, MessageAckType, MessageType, TokenAllocator
 from .types import MsgType
+from .wakeup import Wakeup
+from .worker_pool import get_worker_pool
 
 log = logging.getLogger(__name__)
 
+# longest wait on a channel not supporting the wake-up before checking
+# again for pending requests
+REQUEST_CHECK_INTERVAL = 0.05
+
+
+class _RequestFuture(concurrent.futures.Future):
+    """Future of a request, bound to the auxiliary processing it."""
+
+    def __init__(self, auxiliary: "AuxiliaryInterface"):
+        """Initialize attributes.
+
+        :param auxiliary: auxiliary the request was submitted to
+        """
+        super().__init__()
+        self.auxiliary = auxiliary
+
 
 # Ensure lock and queue unique reference: needed because python will do
 # a copy of the created object when the unittests are called
@@ -49,7 +73,14 @@ class AuxiliaryInterface(threading.Thread, metaclass=abc.ABCMeta):
         name: str = None,
         is_proxy_capable: bool = False,
         is_pausable: bool = False,
+        is_pipelined: bool = False,
         activate_log: List[str] = None,
+        receive_timeout: float = 0.01,
+        request_check_interval: float = REQUEST_CHECK_INTERVAL,
+        queue_maxsize: int = 0,
+        queue_overflow_policy: str = "block",
+        auto_start: bool = True,
+        use_worker_pool: bool = False,
     ):
         """Auxiliary thread initialization.
 
@@ -58,8 +89,40 @@ class AuxiliaryInterface(threading.Thread, metaclass=abc.ABCMeta):
             be (or not) associated to a proxy-auxiliary.
         :param is_pausable: notify if the current auxiliary could be
             (or not) paused
+        :param is_pipelined: if True, commands are only sent by the
+            auxiliary thread and their acknowledgement is matched by
+            token among the received messages, so that several commands
+            can be in flight at the same time
         :param activate_log: loggers to deactivate
+        :param receive_timeout: maximum time in seconds the auxiliary
+            thread waits for an incoming message, a pending request
+            interrupts the wait
+        :param request_check_interval: maximum time in seconds a pending
+            request waits for the end of the reception, on channels
+            whose wait can't be interrupted
+        :param queue_maxsize: maximum number of requests and of received
+            messages waiting to be processed, 0 for unbounded queues
+        :param queue_overflow_policy: what to do with a received message
+            when queue_out is full: block the auxiliary thread until
+            the test code reads a message, drop-oldest, drop-newest or
+            fail (drop the new message and log an error). Callers
+            putting requests in the full queue_in are always blocked.
+        :param auto_start: start the auxiliary thread at creation,
+            otherwise the auxiliary has to be driven by the caller
+            (e.g. by an AsyncAuxiliaryAdapter)
+        :param use_worker_pool: execute the auxiliary on the shared
+            worker pool instead of a dedicated thread
+
+        :raise ValueError: if is_pipelined is set but the auxiliary
+            doesn't implement _send_command
         """
+        if (
+            is_pipelined
+            and type(self)._send_command is AuxiliaryInterface._send_command
+        ):
+            raise ValueError(
+                f"{type(self).__name__} doesn't support pipelined commands"
+            )
         # Initialize thread class
         super().__init__()
         self.initialize_loggers(activate_log)
@@ -67,16 +130,39 @@ class AuxiliaryInterface(threading.Thread, metaclass=abc.ABCMeta):
         self.name = name
         # Define thread control attributes & methods
         self.lock = threading.RLock()
-        self.queue_in = queue.Queue()
-        self.queue_out = queue.Queue()
+        self.queue_in = BoundedQueue(queue_maxsize, name=f"{name} in")
+        self.queue_out = BoundedQueue(
+            queue_maxsize, queue_overflow_policy, name=f"{name} out"
+        )
         self.stop_event = threading.Event()
         self.wait_event = threading.Event()
         self.is_proxy_capable = is_proxy_capable
         self.is_pausable = is_pausable
+        self.is_pipelined = is_pipelined
+        self.receive_timeout = receive_timeout
+        self.request_check_interval = request_check_interval
+        # interrupts the wait on the channel when a request is submitted
+        self._wakeup = Wakeup()
+        # channel the wake-up was registered in, and if it supports it
+        self._wakeup_channel = None
+        self._wakeup_supported = False
+        # in flight pipelined commands, as given and as sent, their futures
+        # and sending time, by token
+        self._pending_commands = {}
+        # tokens of the pipelined commands, never reused while in flight
+        self.token_allocator = TokenAllocator()
+        # runtime statistics, updated by the auxiliary thread
+        self.stats = AuxiliaryStats()
         # Create state
         self.is_instance = False
+        # shared pool executing the auxiliary, if it has no thread
+        self.worker_pool = None
         # Start thread
-        self.start()
+        if auto_start and use_worker_pool:
+            self.worker_pool = get_worker_pool()
+            self.worker_pool.register(self)
+        elif auto_start:
+            self.start()
 
     @staticmethod
     def initialize_loggers(loggers: Optional[List[str]]):
@@ -150,32 +236,92 @@ class AuxiliaryInterface(threading.Thread, metaclass=abc.ABCMeta):
     def create_instance(self) -> bool:
         """Create an auxiliary instance and ensure the communication to it.
 
-        :return: message.Message() - Contain received message
+        :return: True - Successfully created / False - Failed by creation
         """
-        if self.lock.acquire():
-            # Trigger the internal requests
-            self.queue_in.put("create_auxiliary_instance")
-            # Wait until the request was processed
-            report = self.queue_out.get()
-            # Release the above lock
-            self.lock.release()
-            # Return the report
-            return report
+        with self.lock:
+            future = self._submit_request("create_auxiliary_instance")
+        return future.result()
 
     def delete_instance(self) -> bool:
         """Delete an auxiliary instance and its communication to it.
 
-        :return: message.Message() - Contain received message
+        :return: True - Successfully deleted / False - Failed deleting
         """
-        if self.lock.acquire():
-            # Trigger the internal requests
-            self.queue_in.put("delete_auxiliary_instance")
-            # Wait until the request was processed
-            report = self.queue_out.get()
-            # Release the above lock
-            self.lock.release()
-            # Return the report
-            return report
+        with self.lock:
+            future = self._submit_request("delete_auxiliary_instance")
+        return future.result()
+
+    def submit_command(
+        self, cmd_message: MsgType, cmd_data: Any = None
+    ) -> concurrent.futures.Future:
+        """Send a test request without waiting for its response.
+
+        The returned future is only resolved with the response to this
+        request, messages received in the meantime are still available
+        via wait_and_get_report.
+
+        :param cmd_message: command request to the auxiliary
+        :param cmd_data: data you would like to populate the command with
+
+        :return: future resolved with the command response
+        """
+        log.debug("sending command '%s' in %s", cmd_message, self)
+        if cmd_data:
+            log.debug("command payload data: %r", cmd_data)
+        t_submit = time.perf_counter()
+        future = self._submit_request("command", cmd_message, cmd_data)
+        future.add_done_callback(
+            lambda _: self.stats.command_latency.record(time.perf_counter() - t_submit)
+        )
+        return future
+
+    def run_command_async(
+        self, cmd_message: MsgType, cmd_data: Any = None
+    ) -> concurrent.futures.Future:
+        """Send a test request without blocking the caller.
+
+        Used to fan a command out to several auxiliaries at once, the
+        responses can then be awaited together with :py:meth:`gather`.
+
+        :param cmd_message: command request to the auxiliary
+        :param cmd_data: data you would like to populate the command with
+
+        :return: future resolved with the command response
+        """
+        with self.lock:
+            return self.submit_command(cmd_message, cmd_data)
+
+    @staticmethod
+    def gather(
+        futures: List[concurrent.futures.Future], timeout_in_s: Optional[float] = None
+    ) -> List[Any]:
+        """Wait for the responses of several test requests at once.
+
+        All the requests share the same timeout, so the whole wait takes
+        as long as the slowest response instead of the sum of them. The
+        requests not answered within time are cancelled: a request not
+        processed yet is dropped, the token of a pipelined command in
+        flight is released.
+
+        :param futures: futures returned by run_command_async
+        :param timeout_in_s: maximum time in seconds to wait for all the
+            responses, None to wait forever
+
+        :return: the responses in the order of the given futures, False
+            for each response not received within time
+        """
+        concurrent.futures.wait(futures, timeout_in_s)
+        results = []
+        for future in futures:
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                log.debug("no reply received within time")
+                # drop the request, or stop waiting for its acknowledgement
+                if not future.cancel():
+                    future.auxiliary._discard_pending_command(future)
+                results.append(False)
+        return results
 
     def run_command(
         self,
@@ -193,28 +339,13 @@ class AuxiliaryInterface(threading.Thread, metaclass=abc.ABCMeta):
 
         :return: True - Successfully sent / False - Failed by sending / None
         """
-        return_code = False
-
-        log.debug(f"sending command '{cmd_message}' in {self}")
-        if cmd_data:
-            log.debug(f"command payload data: {repr(cmd_data)}")
-
-        if self.lock.acquire():
-            # Trigger the internal requests
-            self.queue_in.put(("command", cmd_message, cmd_data))
-            log.debug(f"sent command '{cmd_message}' in {self}")
-            # Wait until the test request was received
-            try:
-                log.debug(f"waiting for reply to command '{cmd_message}' in {self}")
-                return_code = self.queue_out.get(blocking, timeout_in_s)
-                log.debug(
-                    f"reply to command '{cmd_message}' received: '{return_code}' in {self}"
-                )
-            except queue.Empty:
-                log.debug("no reply received within time")
-            # Release the above lock
-            self.lock.release()
-            # Return the ack_report if exists
+        with self.lock:
+            future = self.submit_command(cmd_message, cmd_data)
+        log.debug("waiting for reply to command '%s' in %s", cmd_message, self)
+        return_code = self._wait_for_result(future, timeout_in_s if blocking else 0)
+        log.debug(
+            "reply to command '%s' received: '%s' in %s", cmd_message, return_code, self
+        )
         return return_code
 
     def wait_and_get_report(
@@ -232,6 +363,23 @@ class AuxiliaryInterface(threading.Thread, metaclass=abc.ABCMeta):
         except queue.Empty:
             return None
 
+    def drain(
+        self, max_items: Optional[int] = None, timeout_in_s: Optional[float] = 0
+    ) -> List[MsgType]:
+        """Get all the messages received by the auxiliary at once.
+
+        :param max_items: maximum number of messages to return, None for
+            all of them
+        :param timeout_in_s: maximum time in seconds to wait for the first
+            message, 0 to return immediately and None to wait forever
+
+        :return: the received messages, oldest first, empty if nothing
+            was received within time
+        """
+        messages = self.queue_out.get_many(max_items, timeout_in_s != 0, timeout_in_s)
+        log.debug("drained %d messages in %s", len(messages), self)
+        return messages
+
     def abort_command(self, blocking: bool = True, timeout_in_s: float = 25) -> bool:
         """Force test to abort.
 
@@ -241,85 +389,406 @@ class AuxiliaryInterface(threading.Thread, metaclass=abc.ABCMeta):
 
         :return: True - Abort was a success / False - if not
         """
-        return_code = False
+        with self.lock:
+            future = self._submit_request("abort")
+        return self._wait_for_result(future, timeout_in_s if blocking else 0)
 
-        if self.lock.acquire():
-            # Trigger the internal requests
-            self.queue_in.put("abort")
-            # Wait until the test request was received
-            try:
-                return_code = self.queue_out.get(blocking, timeout_in_s)
-            except queue.Empty:
-                log.info("no reply received within time")
-            # Release the above lock
-            self.lock.release()
-            # Return the ack_report if exists
-        return return_code
+    def _submit_request(self, *request: Any) -> concurrent.futures.Future:
+        """Put a request in queue_in along with the future its result
+        will be set on.
+
+        :param request: request name followed by its arguments
+
+        :return: future resolved once the request is processed
+        """
+        future = _RequestFuture(self)
+        self.queue_in.put((*request, future))
+        if self.worker_pool is not None:
+            self.worker_pool.wake(self)
+        else:
+            self._wakeup.set()
+        return future
+
+    def _wait_for_result(
+        self, future: concurrent.futures.Future, timeout_in_s: Optional[float]
+    ) -> Any:
+        """Wait for the result of a submitted request.
+
+        If no reply is received within time, the request is still
+        processed but its late reply is dropped instead of being mistaken
+        for the reply to another request.
+
+        :param future: future returned at request submission
+        :param timeout_in_s: maximum time in seconds to wait, None to
+            wait forever
+
+        :return: the request result, False if not received within time
+        """
+        try:
+            return future.result(timeout_in_s)
+        except concurrent.futures.TimeoutError:
+            log.debug("no reply received within time")
+            self._discard_pending_command(future)
+            return False
+
+    def _discard_pending_command(self, future: concurrent.futures.Future) -> None:
+        """Stop waiting for the acknowledgement of a pipelined command,
+        its future is resolved with False.
+
+        :param future: future of the command to discard
+        """
+        for token, (_, _, pending_future, _) in list(self._pending_commands.items()):
+            if pending_future is not future:
+                continue
+            # the acknowledgement may be dispatched meanwhile
+            if self._pending_commands.pop(token, None) is not None:
+                future.set_result(False)
+
+    def _discard_pending_commands(self) -> None:
+        """Stop waiting for the acknowledgement of all the pipelined
+        commands in flight, e.g. once the auxiliary instance is deleted.
+        """
+        for token in list(self._pending_commands):
+            pending = self._pending_commands.pop(token, None)
+            if pending is not None:
+                pending[2].set_result(False)
+
+    def wake(self) -> None:
+        """Interrupt the wait for a request or a message, e.g. because
+        the auxiliary has something new to send.
+        """
+        if self.worker_pool is not None:
+            self.worker_pool.wake(self)
+        elif self.queue_in.empty():
+            self._put_wake_up()
+
+    def _put_wake_up(self) -> None:
+        """Put an empty request in queue_in to wake the thread up."""
+        try:
+            self.queue_in.put_nowait(None)
+        except queue.Full:
+            # the thread will wake up anyway to process the pending requests
+            pass
+        self._wakeup.set()
 
     def stop(self) -> None:
         """Force the thread to stop itself."""
         self.stop_event.set()
+        # wake the thread up if it is waiting for a request
+        self._put_wake_up()
+        if self.worker_pool is not None:
+            self.worker_pool.wake(self)
 
     def run(self) -> None:
-        """ Run function of the auxiliary thread."""
+        """Run function of the auxiliary thread.
+
+        As long as no auxiliary instance is created, or if the auxiliary
+        is pausable, the thread simply blocks until a request is received.
+        Otherwise, it waits for at most receive_timeout on the channel,
+        interrupted as soon as a request is pending. If the channel
+        returns before the end of the timeout, the thread waits on the
+        request queue for the remaining time, so that it never spins
+        while idle.
+        """
+        wait_time = None
+        self.stats.start()
         while not self.stop_event.is_set():
-            # Step 1: Check if a request is available & process it
-            request = ""
-            # Check if a request was received
-            if not self.queue_in.empty():
-                request = self.queue_in.get_nowait()
-            # Process the request
-            if request == "create_auxiliary_instance" and not self.is_instance:
-                # Call the internal instance creation method
-                return_code = self._create_auxiliary_instance()
-                # Based on the result set status:
-                self.is_instance = return_code
-                # Enqueue the result for the request caller
-                self.queue_out.put(return_code)
-            elif request == "delete_auxiliary_instance" and self.is_instance:
-                # Call the internal instance delete method
-                return_code = self._delete_auxiliary_instance()
-                # Based on the result set status:
-                self.is_instance = not return_code
-                # Enqueue the result for the request caller
-                self.queue_out.put(return_code)
-            elif (
-                isinstance(request, tuple)
-                and self.is_instance
-                and request[0] == "command"
-            ):
-                # If the instance is created, send the requested command
-                # to the instance via the internal method
-                _, cmd, data = request
-                cmd_response = self._run_command(cmd, data)
-                if cmd_response is not None:
-                    self.queue_out.put(cmd_response)
-            elif request == "abort" and self.is_instance:
-                self.queue_out.put(self._abort_command())
-            elif request != "":
-                # A request was received but could not be processed
-                log.warning(f"Unknown request '{request}', will not be processed!")
-                log.warning(f"Aux status: {self.__dict__}")
-
-            # Step 2: Check if something was received from the aux instance if instance was created
-            if self.is_instance and not self.is_pausable:
-                received_message = self._receive_message(timeout_in_s=0)
-                # If yes, send it via the out queue
-                if received_message is not None:
-                    self.queue_out.put(received_message)
-
-            # Free up cpu usage when auxiliary is suspended
-            if not self.is_instance:
-                time.sleep(0.050)
-
-            # If auxiliary instance is created and is pausable
-            if self.is_instance and self.is_pausable:
-                self.wait_event.wait()
+            wait_time = self._run_step(wait_time)
         # Thread stop command was set
+        self._finalize()
+
+    def _run_step(
+        self, wait_time: Optional[float], receive_timeout: Optional[float] = None
+    ) -> Optional[float]:
+        """Execute one iteration of the auxiliary loop.
+
+        :param wait_time: maximum time in seconds to wait for a request,
+            None to block until a request is received
+        :param receive_timeout: maximum time in seconds to wait for a
+            message from the auxiliary instance, receive_timeout if None
+
+        :return: time in seconds to wait for a request before the next
+            iteration, 0 if a message was received, None if only a
+            request can require one
+        """
+        self.stats.loop_iterations += 1
+        self.stats.queue_in_depth.record(self.queue_in.qsize())
+        self.stats.queue_out_depth.record(self.queue_out.qsize())
+        # Step 1: Wait for a request & process it
+        request = self._wait_for_request(wait_time)
+        if request is not None:
+            self._process_request(request)
+
+        # Step 2: Check if something was received from the aux instance if instance was created
+        if self.is_instance and not self.is_pausable:
+            if receive_timeout is None:
+                receive_timeout = self.receive_timeout
+            t_start = time.perf_counter()
+            if self._poll_instance(receive_timeout):
+                return 0
+            # the channel returned before the end of the timeout: wait for
+            # a request during the remaining time instead of polling it again
+            return max(0, self.receive_timeout - (time.perf_counter() - t_start))
+        return None
+
+    def _finalize(self) -> None:
+        """Delete the auxiliary instance once the auxiliary is stopped."""
         log.info("{} was stopped".format(self))
+        if self._wakeup_supported:
+            self._wakeup_channel.set_wakeup(None)
+            self._wakeup_supported = False
         # Delete auxiliary external instance if not done
         if self.is_instance:
             self._delete_auxiliary_instance()
+        self._discard_pending_commands()
+        self._wakeup.close()
+
+    def _wait_for_request(self, timeout: Optional[float]) -> Any:
+        """Wait for the next request put in queue_in.
+
+        :param timeout: maximum time in seconds to wait for a request,
+            None to block until a request is received
+
+        :return: the received request, None if nothing was received
+            within the given time
+        """
+        try:
+            return self.queue_in.get(timeout != 0, timeout)
+        except queue.Empty:
+            return None
+
+    def _process_request(self, request: Any) -> None:
+        """Process a request received from queue_in.
+
+        The result of the request is set on the future submitted with
+        it, or put in queue_out if the request doesn't come with one.
+
+        :param request: request to process
+        """
+        future = None
+        if isinstance(request, tuple) and isinstance(
+            request[-1], concurrent.futures.Future
+        ):
+            future = request[-1]
+            # the caller stopped waiting before the request was processed
+            if not future.set_running_or_notify_cancel():
+                return
+            request = request[:-1] if len(request) > 2 else request[0]
+
+        if request == "create_auxiliary_instance" and not self.is_instance:
+            # Call the internal instance creation method
+            return_code = self._create_auxiliary_instance()
+            # Based on the result set status:
+            self.is_instance = return_code
+            # Enqueue the result for the request caller
+            self._set_result(future, return_code)
+        elif request == "delete_auxiliary_instance" and self.is_instance:
+            # Call the internal instance delete method
+            return_code = self._delete_auxiliary_instance()
+            # Based on the result set status:
+            self.is_instance = not return_code
+            # the acknowledgements in flight will never be received
+            self._discard_pending_commands()
+            # Enqueue the result for the request caller
+            self._set_result(future, return_code)
+        elif (
+            isinstance(request, tuple) and self.is_instance and request[0] == "command"
+        ):
+            # If the instance is created, send the requested command
+            # to the instance via the internal method
+            _, cmd, data = request
+            self.stats.commands += 1
+            if future is not None and self.is_pipelined and isinstance(cmd, Message):
+                self._send_pipelined_command(cmd, data, future)
+            else:
+                t_start = time.perf_counter()
+                cmd_response = self._run_command(cmd, data)
+                self.stats.run_command_time.record(time.perf_counter() - t_start)
+                if cmd_response is not None or future is not None:
+                    self._set_result(future, cmd_response)
+        elif request == "abort" and self.is_instance:
+            self._set_result(future, self._abort_command())
+        else:
+            # A request was received but could not be processed
+            log.warning(f"Unknown request '{request}', will not be processed!")
+            log.warning(f"Aux status: {self.__dict__}")
+            if future is not None:
+                future.set_result(False)
+
+    def _set_result(self, future: Optional[concurrent.futures.Future], result: Any):
+        """Give the result of a request back to its caller.
+
+        :param future: future submitted with the request, if any
+        :param result: result of the request
+        """
+        if future is None:
+            self._forward_message(result)
+        else:
+            future.set_result(result)
+
+    def _forward_message(self, message: MsgType) -> None:
+        """Put a received message in queue_out for the test code.
+
+        If queue_out is full and its overflow policy is block, the
+        auxiliary thread waits until the test code reads a message or
+        the auxiliary is stopped. If the policy is fail, the message is
+        dropped, counted in the queue_out metrics and reported as an
+        error, the auxiliary goes on receiving.
+
+        :param message: message to forward
+        """
+        while True:
+            try:
+                # wake up regularly to not block a stopped auxiliary
+                self.queue_out.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                if self.queue_out.overflow_policy is OverflowPolicy.FAIL:
+                    log.error(
+                        "%s queue_out is full, message dropped (%d dropped so far)",
+                        self,
+                        self.queue_out.dropped,
+                    )
+                    return
+                if self.stop_event.is_set():
+                    return
+
+    @property
+    def queue_metrics(self) -> Tuple[QueueMetrics, QueueMetrics]:
+        """Depth metrics of queue_in and queue_out."""
+        return self.queue_in.metrics, self.queue_out.metrics
+
+    def _send_pipelined_command(
+        self, cmd: Message, data: Any, future: concurrent.futures.Future
+    ) -> None:
+        """Send a command and register it until its acknowledgement is
+        received.
+
+        A copy of the command carrying a token allocated by the auxiliary
+        is sent, so that it doesn't match another command in flight. The
+        given command is left untouched, it can be sent by several
+        auxiliaries concurrently.
+
+        :param cmd: command to send
+        :param data: payload data for the command
+        :param future: future resolved with the command acknowledgement
+        """
+        if any(pending[0] is cmd for pending in self._pending_commands.values()):
+            log.error(f"command {cmd} is already in flight")
+            future.set_result(False)
+            return
+        token = self.token_allocator.allocate()
+        if token is None:
+            log.error(f"{self} has too many commands in flight")
+            future.set_result(False)
+            return
+        # the token is released however the command ends
+        future.add_done_callback(lambda _: self.token_allocator.release(token))
+        sent_cmd = copy.copy(cmd)
+        sent_cmd.msg_token = token
+        self._pending_commands[token] = (cmd, sent_cmd, future, time.perf_counter())
+        if (
+            not self._send_command(sent_cmd, data)
+            and self._pending_commands.pop(token, None) is not None
+        ):
+            future.set_result(False)
+
+    def _dispatch_response(self, message: MsgType) -> bool:
+        """Resolve the pipelined command acknowledged by the given
+        message, if any.
+
+        :param message: received message
+
+        :return: True if the message acknowledged an in flight command
+        """
+        if (
+            not self._pending_commands
+            or not isinstance(message, Message)
+            or message.msg_type != MessageType.ACK
+        ):
+            return False
+        pending = self._pending_commands.pop(message.msg_token, None)
+        if pending is None:
+            return False
+        _, sent_cmd, future, t_sent = pending
+        self.stats.ack_wait.record(time.perf_counter() - t_sent)
+        future.set_result(
+            sent_cmd.check_if_ack_message_is_matching(message)
+            and message.sub_type == MessageAckType.ACK
+        )
+        return True
+
+    def _poll_instance(self, timeout: float) -> bool:
+        """Receive a message from the auxiliary instance and forward it
+        via queue_out.
+
+        :param timeout: maximum time in seconds to wait for a message
+
+        :return: True if a message was received
+        """
+        received_message = self._timed_receive_message(timeout)
+        # If yes, route it to the command it acknowledges or send it via the out queue
+        if received_message is not None:
+            if not self._dispatch_response(received_message):
+                self._forward_message(received_message)
+            return True
+        return False
+
+    def _timed_receive_message(self, timeout: float) -> Optional[MsgType]:
+        """Receive a message from the auxiliary instance and record the
+        reception statistics.
+
+        A submitted request interrupts the wait on the channels supporting
+        the wake-up, the other channels are waited on for at most
+        request_check_interval at once.
+
+        :param timeout: maximum time in seconds to wait for a message
+
+        :return: the received message, None if nothing was received
+        """
+        interruptible = self._attach_wakeup()
+        slice_max = timeout if interruptible else self.request_check_interval
+        t_start = time.perf_counter()
+        deadline = t_start + timeout
+        while True:
+            t_receive = time.perf_counter()
+            self._wakeup.clear()
+            if not self.queue_in.empty():
+                # a request is pending, only check for a received message
+                slice_timeout = 0
+            else:
+                slice_timeout = max(0, min(slice_max, deadline - t_receive))
+            received_message = self._receive_message(timeout_in_s=slice_timeout)
+            now = time.perf_counter()
+            if (
+                received_message is not None
+                or now >= deadline
+                or not self.queue_in.empty()
+                # the channel doesn't wait, let the caller wait for a request
+                or (not interruptible and now - t_receive < slice_timeout / 2)
+            ):
+                break
+        self.stats.receive_message_time.record(now - t_start)
+        if received_message is None:
+            self.stats.empty_receives += 1
+        return received_message
+
+    def _attach_wakeup(self) -> bool:
+        """Register the wake-up in the channel of the auxiliary, once.
+
+        :return: True if a submitted request interrupts the wait on the
+            channel
+        """
+        channel = getattr(self, "channel", None)
+        if channel is not self._wakeup_channel:
+            if self._wakeup_supported:
+                self._wakeup_channel.set_wakeup(None)
+            self._wakeup_channel = channel
+            self._wakeup_supported = (
+                isinstance(channel, CChannel)
+                and channel.set_wakeup(self._wakeup) is True
+            )
+        return self._wakeup_supported
 
     @abc.abstractmethod
     def _create_auxiliary_instance(self) -> bool:
@@ -355,6 +824,19 @@ class AuxiliaryInterface(threading.Thread, metaclass=abc.ABCMeta):
         """
         pass
 
+    def _send_command(self, cmd_message: Message, cmd_data: bytes = None) -> bool:
+        """Send a command without waiting for its acknowledgement.
+
+        Only needed by pipelined auxiliaries, the acknowledgement is then
+        matched by token among the messages returned by _receive_message.
+
+        :param cmd_message: command in form of a message to send
+        :param cmd_data: payload data for the command
+
+        :return: True - Successfully sent / False - Failed sending
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def _abort_command(self) -> bool:
         """Abort the sent command."""
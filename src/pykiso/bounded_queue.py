@@ -0,0 +1,182 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Bounded Queue
+*************
+
+:module: bounded_queue
+
+:synopsis: FIFO queue with a maximum size, a policy applied when it is
+    full and depth metrics.
+
+The queues between the test code and the auxiliaries (and between a
+proxy auxiliary and its connectors) are unbounded by default. When a
+maximum size is given, the overflow policy defines what happens once
+the queue is full:
+
+- ``block``: wait until an item is removed (backpressure on the producer)
+- ``drop-oldest``: remove the oldest item to make room for the new one
+- ``drop-newest``: discard the new item
+- ``fail``: raise :py:class:`queue.Full`
+
+.. currentmodule:: bounded_queue
+
+"""
+
+import collections
+import enum
+import logging
+import queue
+import time
+from typing import Any, List, Optional, Union
+
+log = logging.getLogger(__name__)
+
+QueueMetrics = collections.namedtuple(
+    "QueueMetrics", ["size", "maxsize", "high_water_mark", "dropped"]
+)
+
+
+class OverflowPolicy(enum.Enum):
+    """Behavior of a full bounded queue when an item is put."""
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop-oldest"
+    DROP_NEWEST = "drop-newest"
+    FAIL = "fail"
+
+
+class BoundedQueue(queue.Queue):
+    """Queue applying an overflow policy once its maximum size is reached
+    and keeping track of its depth.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        overflow_policy: Union[OverflowPolicy, str] = OverflowPolicy.BLOCK,
+        name: str = None,
+    ):
+        """Initialize attributes.
+
+        :param maxsize: maximum number of items, 0 for an unbounded queue
+        :param overflow_policy: what to do when an item is put in the
+            full queue (block, drop-oldest, drop-newest or fail)
+        :param name: name used in the log messages
+
+        :raise ValueError: if the overflow policy is unknown
+        """
+        super().__init__(maxsize)
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.name = name
+        self.high_water_mark = 0
+        self.dropped = 0
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None):
+        """Put an item into the queue, applying the overflow policy if
+        the queue is full.
+
+        :param item: item to put
+        :param block: only used by the block policy, see
+            :py:meth:`queue.Queue.put`
+        :param timeout: only used by the block policy, see
+            :py:meth:`queue.Queue.put`
+
+        :raise queue.Full: if the queue is full and the policy is fail,
+            or if the policy is block and no room was made within time
+        """
+        if self.maxsize <= 0 or self.overflow_policy is OverflowPolicy.BLOCK:
+            return super().put(item, block, timeout)
+
+        with self.not_full:
+            if self._qsize() >= self.maxsize:
+                self._count_dropped()
+                if self.overflow_policy is OverflowPolicy.FAIL:
+                    raise queue.Full
+                if self.overflow_policy is OverflowPolicy.DROP_NEWEST:
+                    return
+                # drop-oldest: the removed item will never be processed
+                self._get()
+                self.unfinished_tasks -= 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def get_many(
+        self,
+        max_items: Optional[int] = None,
+        block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+        """Remove and return all the available items at once.
+
+        Only the first item is waited for, the queue lock is then taken
+        once for the whole batch instead of once per item.
+
+        :param max_items: maximum number of items to return, None for all
+        :param block: wait for the first item if the queue is empty
+        :param timeout: if block, maximum time in seconds to wait for the
+            first item, None to wait forever
+
+        :return: the removed items, empty if none was available within time
+
+        :raise ValueError: if timeout is negative
+        """
+        with self.not_empty:
+            if block:
+                if timeout is None:
+                    while not self._qsize():
+                        self.not_empty.wait()
+                elif timeout < 0:
+                    raise ValueError("'timeout' must be a non-negative number")
+                else:
+                    endtime = time.monotonic() + timeout
+                    while not self._qsize():
+                        remaining = endtime - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.not_empty.wait(remaining)
+            if max_items is None or max_items >= self._qsize():
+                items = list(self.queue)
+                self.queue.clear()
+            else:
+                items = [self._get() for _ in range(max_items)]
+            if items:
+                self.not_full.notify(len(items))
+            return items
+
+    def _put(self, item: Any) -> None:
+        """Put an item and update the high-water mark.
+
+        :param item: item to put
+        """
+        super()._put(item)
+        self.high_water_mark = max(self.high_water_mark, self._qsize())
+
+    def _count_dropped(self) -> None:
+        """Count a dropped item, only the first one is reported as a
+        warning to avoid flooding the logs.
+        """
+        self.dropped += 1
+        if self.dropped == 1:
+            log.warning(
+                f"queue {self.name or ''} is full (maxsize {self.maxsize}), "
+                f"applying overflow policy {self.overflow_policy.value}"
+            )
+
+    @property
+    def metrics(self) -> QueueMetrics:
+        """Current depth, configured maximum size, highest depth reached
+        and number of dropped items.
+        """
+        with self.mutex:
+            return QueueMetrics(
+                self._qsize(), self.maxsize, self.high_water_mark, self.dropped
+            )
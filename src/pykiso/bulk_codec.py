@@ -0,0 +1,217 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Bulk Message Codec
+******************
+
+:module: bulk_codec
+
+:synopsis: decode and encode large numbers of messages at once with
+    NumPy.
+
+Captures of the exchanged messages can be decoded into a NumPy
+structured array with one record per message, instead of creating one
+:py:class:`~pykiso.message.Message` per packet:
+
+.. code:: python
+
+    records = decode(capture)
+    logs = records[records["msg_type"] == MessageType.LOG]
+    failed_crc = records[~records["crc_valid"]]
+
+Only the packet boundaries are located one by one, the header fields
+and CRCs of all the packets are computed column-wise. The same applies
+to :py:func:`encode`, generating the packets of a batch of records.
+
+Only the standard message format is supported: extended messages and
+segments, see :py:class:`~pykiso.message.MessageFlag`, have to be
+handled with :py:class:`~pykiso.message.MessageReassembler`.
+
+This module requires NumPy, installed with ``pip install pykiso[numpy]``.
+
+.. currentmodule:: bulk_codec
+
+"""
+
+import sys
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from pykiso.checksum import crc16
+from pykiso.message import Message
+
+# record of a message, the offsets refer to the decoded capture
+MESSAGE_DTYPE = np.dtype(
+    [
+        ("offset", np.int64),
+        ("msg_type", np.uint8),
+        ("msg_token", np.uint8),
+        ("sub_type", np.uint8),
+        ("error_code", np.uint8),
+        ("test_suite", np.uint8),
+        ("test_case", np.uint8),
+        ("payload_offset", np.int64),
+        ("payload_length", np.uint16),
+        ("crc_valid", np.bool_),
+    ]
+)
+
+# position of the fields in the message header
+_HEADER_FIELDS = {
+    "msg_token": 1,
+    "sub_type": 2,
+    "error_code": 3,
+    "test_suite": 5,
+    "test_case": 6,
+}
+_PAYLOAD_LENGTH_POSITION = 7
+_PROTOCOL_VERSION_BITS = 1 << 6
+# header and crc bytes of a packet
+_FRAME_OVERHEAD = Message.header_size + Message.crc_byte_size
+# CRC of each byte value, see pykiso.checksum
+_CRC16_TABLE = np.array([crc16(bytes([value])) for value in range(256)], np.uint32)
+# the crc is packed in native byte order
+_CRC_LOW_BYTE = 0 if sys.byteorder == "little" else 1
+
+
+def _crc16_columns(
+    data: np.ndarray, starts: np.ndarray, lengths: np.ndarray
+) -> np.ndarray:
+    """Compute the CRC16 of several byte ranges at once.
+
+    :param data: unsigned bytes array
+    :param starts: start position of each range
+    :param lengths: number of bytes of each range
+
+    :return: the CRC of each range
+    """
+    # process the longest ranges first, so that the ranges still being
+    # computed at a given position are always the first ones
+    order = np.argsort(-lengths, kind="stable")
+    sorted_starts = starts[order]
+    sorted_lengths = lengths[order]
+    crc = np.zeros(len(starts), np.uint32)
+    max_length = int(sorted_lengths[0]) if len(sorted_lengths) else 0
+    # number of ranges longer than each position
+    active_counts = np.searchsorted(-sorted_lengths, -np.arange(max_length), "left")
+    for position, count in enumerate(active_counts):
+        current = crc[:count]
+        current_bytes = data[sorted_starts[:count] + position]
+        crc[:count] = ((current << 8) & 0xFFFF) ^ _CRC16_TABLE[
+            (current >> 8) ^ current_bytes
+        ]
+    result = np.empty(len(starts), np.uint16)
+    result[order] = crc
+    return result
+
+
+def decode(capture: Union[bytes, bytearray, memoryview, Sequence[bytes]]) -> np.ndarray:
+    """Decode the packets of a capture.
+
+    The capture is made of packets stored back to back. A trailing
+    incomplete packet is ignored.
+
+    :param capture: captured bytes, or list of packets which are then
+        concatenated
+
+    :return: array of MESSAGE_DTYPE records, one per packet
+    """
+    if not isinstance(capture, (bytes, bytearray, memoryview)):
+        capture = b"".join(capture)
+    view = memoryview(capture).cast("B")
+    data = np.frombuffer(view, np.uint8)
+
+    # locate the packets, each one depending on the previous length
+    offsets = []
+    position = 0
+    capture_end = len(view)
+    while position + _FRAME_OVERHEAD <= capture_end:
+        packet_end = (
+            position + _FRAME_OVERHEAD + view[position + _PAYLOAD_LENGTH_POSITION]
+        )
+        if packet_end > capture_end:
+            break
+        offsets.append(position)
+        position = packet_end
+    offsets = np.array(offsets, np.int64)
+
+    records = np.zeros(len(offsets), MESSAGE_DTYPE)
+    records["offset"] = offsets
+    records["msg_type"] = (data[offsets] >> 4) & 0x3
+    for name, field_position in _HEADER_FIELDS.items():
+        records[name] = data[offsets + field_position]
+    payload_lengths = data[offsets + _PAYLOAD_LENGTH_POSITION].astype(np.int64)
+    records["payload_offset"] = offsets + Message.header_size
+    records["payload_length"] = payload_lengths
+
+    crc_positions = offsets + Message.header_size + payload_lengths
+    received_crc = data[crc_positions + _CRC_LOW_BYTE].astype(np.uint16) | (
+        data[crc_positions + 1 - _CRC_LOW_BYTE].astype(np.uint16) << 8
+    )
+    records["crc_valid"] = (
+        _crc16_columns(data, offsets, crc_positions - offsets) == received_crc
+    )
+    return records
+
+
+def encode(records: np.ndarray, payloads: Optional[Sequence[bytes]] = None) -> bytes:
+    """Serialize a batch of messages into back to back packets.
+
+    Only the header fields of the records are used: the offsets and crc
+    columns of decoded records are ignored.
+
+    :param records: structured array with at least the header fields
+        of MESSAGE_DTYPE
+    :param payloads: serialized tlvs of each message, no payload if None
+
+    :return: the packets
+
+    :raise ValueError: if the number of payloads doesn't match the
+        number of records, or if a payload is longer than 255 bytes
+    """
+    count = len(records)
+    if payloads is None:
+        payload_lengths = np.zeros(count, np.int64)
+        payload_data = np.zeros(0, np.uint8)
+    else:
+        if len(payloads) != count:
+            raise ValueError(f"{len(payloads)} payloads given for {count} records")
+        payload_lengths = np.fromiter(map(len, payloads), np.int64, count)
+        if count and payload_lengths.max() > 255:
+            raise ValueError("payloads are limited to 255 bytes")
+        payload_data = np.frombuffer(b"".join(payloads), np.uint8)
+
+    packet_sizes = _FRAME_OVERHEAD + payload_lengths
+    offsets = np.zeros(count, np.int64)
+    np.cumsum(packet_sizes[:-1], out=offsets[1:])
+    packets = np.zeros(int(packet_sizes.sum()), np.uint8)
+
+    packets[offsets] = (
+        records["msg_type"].astype(np.uint8) << 4
+    ) | _PROTOCOL_VERSION_BITS
+    for name, field_position in _HEADER_FIELDS.items():
+        packets[offsets + field_position] = records[name]
+    packets[offsets + _PAYLOAD_LENGTH_POSITION] = payload_lengths
+
+    # copy each payload after its header
+    payload_starts = offsets + Message.header_size
+    if len(payload_data):
+        payload_positions = np.cumsum(payload_lengths) - payload_lengths
+        packets[
+            np.repeat(payload_starts - payload_positions, payload_lengths)
+            + np.arange(len(payload_data))
+        ] = payload_data
+
+    crc_positions = payload_starts + payload_lengths
+    crc = _crc16_columns(packets, offsets, crc_positions - offsets)
+    packets[crc_positions + _CRC_LOW_BYTE] = crc & 0xFF
+    packets[crc_positions + 1 - _CRC_LOW_BYTE] = crc >> 8
+    return packets.tobytes()
@@ -0,0 +1,91 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Checksum
+********
+
+:module: checksum
+
+:synopsis: CRC16 used by the messages and the serial connectors.
+
+The checksum is the CRC-16/XMODEM (polynomial 0x1021, initial value 0,
+no reflection). It is computed with the lookup table based
+implementation of :py:func:`binascii.crc_hqx`, over any bytes-like
+object (bytes, bytearray, memoryview) at once or incrementally:
+
+.. code:: python
+
+    crc = Crc16()
+    for chunk in chunks:
+        crc.update(chunk)
+    assert crc.value == crc16(b"".join(chunks))
+
+.. currentmodule:: checksum
+
+"""
+
+import binascii
+from typing import Iterable, Union
+
+# number of bytes of a checksum
+CRC16_SIZE = 2
+
+ByteData = Union[bytes, bytearray, memoryview, Iterable[int]]
+
+
+def crc16(data: ByteData, crc: int = 0) -> int:
+    """Compute the CRC16 of the given data.
+
+    :param data: bytes-like object, or iterable of integers in [0, 255]
+    :param crc: checksum of the preceding data, to continue a computation
+
+    :return: checksum of the data
+    """
+    try:
+        return binascii.crc_hqx(data, crc)
+    except TypeError:
+        # not a bytes-like object
+        return binascii.crc_hqx(bytes(data), crc)
+
+
+class Crc16:
+    """Incremental CRC16 computation, e.g. for frames received in
+    several chunks.
+    """
+
+    def __init__(self, data: ByteData = b""):
+        """Initialize attributes.
+
+        :param data: first data to checksum
+        """
+        self.value = crc16(data)
+
+    def update(self, data: ByteData) -> "Crc16":
+        """Add data to the checksum.
+
+        :param data: data following the already checksummed ones
+
+        :return: itself
+        """
+        self.value = crc16(data, self.value)
+        return self
+
+    def reset(self) -> None:
+        """Restart the computation from the initial value."""
+        self.value = 0
+
+    def digest(self, byteorder: str = "big") -> bytes:
+        """Return the checksum as bytes.
+
+        :param byteorder: "big" or "little"
+
+        :return: the checksum on CRC16_SIZE bytes
+        """
+        return self.value.to_bytes(CRC16_SIZE, byteorder)
@@ -19,13 +19,16 @@ Integration Test Framework
 
 
 """
+import atexit
 import collections
 import logging
+import logging.handlers
 import pprint
+import queue
 import sys
 import time
 from pathlib import Path
-from typing import NamedTuple, Optional
+from typing import List, NamedTuple, Optional
 
 import click
 
@@ -35,14 +38,71 @@ from .test_coordinator import test_execution
 from .test_setup.config_registry import ConfigRegistry
 from .types import PathType
 
-LogOptions = collections.namedtuple("LogOptions", "log_path log_level report_type")
+LogOptions = collections.namedtuple(
+    "LogOptions", "log_path log_level report_type async_logging", defaults=(False,)
+)
 
 # use to store the selected logging options
 log_options: Optional[NamedTuple] = None
 
+# writer thread of the asynchronous logging
+log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Put the log records in a queue without formatting them.
+
+    Contrary to :py:class:`logging.handlers.QueueHandler`, the message is
+    neither merged with its arguments nor formatted by the logging thread,
+    everything is done by the writer thread. The arguments of a log
+    record should therefore not be modified after the logging call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Keep the record as is, it is formatted by the writer thread.
+
+        :param record: record to enqueue
+
+        :return: the same record
+        """
+        return record
+
+
+def start_log_listener(handlers: List[logging.Handler]) -> logging.Handler:
+    """Start the writer thread performing the I/O of the given handlers.
+
+    A previously started writer thread is stopped first.
+
+    :param handlers: handlers called by the writer thread
+
+    :return: the handler to attach to the loggers
+    """
+    global log_listener
+    stop_log_listener()
+    log_queue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    log_listener.start()
+    return DeferredQueueHandler(log_queue)
+
+
+def stop_log_listener() -> None:
+    """Write all the pending log records and stop the writer thread."""
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+
+atexit.register(stop_log_listener)
+
 
 def initialize_logging(
-    log_path: PathType, log_level: str, report_type: str = None
+    log_path: PathType,
+    log_level: str,
+    report_type: str = None,
+    async_logging: bool = False,
 ) -> logging.Logger:
     """Initialize the logging.
 
@@ -52,6 +112,10 @@ def initialize_logging(
     :param log_path: path to the logfile
     :param log_level: any of DEBUG, INFO, WARNING, ERROR
     :param report_type: expected report type (junit, text,...)
+    :param async_logging: if True, the file and console handlers are
+        called by a dedicated writer thread, so that the logging threads
+        never wait for the I/O. The console output of a junit report
+        stays synchronous to be captured by the right test.
 
     :returns: configured Logger
     """
@@ -68,7 +132,9 @@ def initialize_logging(
 
     # update logging options
     global log_options
-    log_options = LogOptions(log_path, log_level, report_type)
+    log_options = LogOptions(log_path, log_level, report_type, async_logging)
+    # handlers called by the writer thread in case of asynchronous logging
+    async_handlers = []
 
     # if log_path is given create use a logging file handler
     if log_path is not None:
@@ -79,21 +145,26 @@ def initialize_logging(
         file_handler = logging.FileHandler(log_path, "w+")
         file_handler.setFormatter(log_format)
         file_handler.setLevel(levels[log_level])
-        root_logger.addHandler(file_handler)
+        async_handlers.append(file_handler)
     # if log_path is not given and report type is not junit just
     # instanciate a logging StreamHandler
     if log_path is None and report_type != "junit":
         stream_handler = logging.StreamHandler()
         stream_handler.setFormatter(log_format)
         stream_handler.setLevel(levels[log_level])
-        root_logger.addHandler(stream_handler)
+        async_handlers.append(stream_handler)
+    if async_logging and async_handlers:
+        root_logger.addHandler(start_log_listener(async_handlers))
+    else:
+        for handler in async_handlers:
+            root_logger.addHandler(handler)
     # if report_type is junit use sys.stdout as stream
     if report_type == "junit":
-        # reset all handler but keep FileHandler
+        # reset all handler but keep FileHandler (or the asynchronous one)
         root_logger.handlers = [
             handler
             for handler in root_logger.handlers
-            if isinstance(handler, logging.FileHandler)
+            if isinstance(handler, (logging.FileHandler, DeferredQueueHandler))
         ]
         stream_handler = logging.StreamHandler(sys.stdout)
         stream_handler.setFormatter(log_format)
@@ -154,12 +225,19 @@ def get_logging_options() -> LogOptions:
     default=True,
     help="default, test results are only displayed in the console",
 )
+@click.option(
+    "--async-logging",
+    is_flag=True,
+    default=False,
+    help="write the logs from a dedicated thread instead of the logging ones",
+)
 @click.version_option(__version__)
 def main(
     test_configuration_file: PathType,
     log_path: PathType = None,
     log_level: str = "INFO",
     report_type: str = "text",
+    async_logging: bool = False,
 ):
     """Embedded Integration Test Framework - CLI Entry Point.
 
@@ -167,9 +245,10 @@ def main(
     :param log_path: path to directory or file to write logs to
     :param log_level: any of DEBUG, INFO, WARNING, ERROR
     :param report_type: if "test", the standard report, if "junit", a junit report is generated
+    :param async_logging: write the logs from a dedicated thread
     """
     # Set the logging
-    logger = initialize_logging(log_path, log_level, report_type)
+    logger = initialize_logging(log_path, log_level, report_type, async_logging)
     # Get YAML configuration
     cfg_dict = parse_config(test_configuration_file)
     # Run tests
@@ -179,4 +258,5 @@ def main(
 
     exit_code = test_execution.execute(cfg_dict, report_type)
     ConfigRegistry.delete_aux_con()
+    stop_log_listener()
     sys.exit(exit_code)
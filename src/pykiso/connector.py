@@ -19,11 +19,18 @@ Interface Definition for Connectors, CChannels and Flasher
 
 
 """
+
 import abc
+import logging
 import pathlib
 import threading
+from typing import Optional
+
+from .message import Message, MessageReassembler
+from .types import BufferType, MsgType, PathType
+from .wakeup import Wakeup
 
-from .types import MsgType, PathType
+log = logging.getLogger(__name__)
 
 
 class Connector(abc.ABC):
@@ -70,10 +77,18 @@ class Connector(abc.ABC):
 class CChannel(Connector):
     """Abstract class for coordination channel."""
 
-    def __init__(self, **kwargs):
-        """constructor"""
+    def __init__(self, max_packet_size: Optional[int] = None, **kwargs):
+        """constructor
+
+        :param max_packet_size: if given, messages longer than this
+            number of bytes are sent in several segments and received
+            segments are reassembled, see
+            :py:meth:`pykiso.message.Message.serialize_segments`
+        """
         super().__init__(**kwargs)
         self._lock = threading.RLock()
+        self.max_packet_size = max_packet_size
+        self._reassembler = MessageReassembler()
 
     def open(self) -> None:
         """Open a thread-safe channel.
@@ -100,11 +115,16 @@ class CChannel(Connector):
         :raise ConnectionRefusedError: when lock acquire failed
         """
         # TODO should blocking be a parameter?
-        if self._lock.acquire(blocking=False):
-            self._cc_send(msg=msg, raw=raw, **kwargs)
-        else:
+        if not self._lock.acquire(blocking=False):
             raise ConnectionRefusedError
-        self._lock.release()
+        try:
+            if self.max_packet_size and not raw and isinstance(msg, Message):
+                for packet in msg.serialize_segments(self.max_packet_size):
+                    self._cc_send(msg=packet, raw=True, **kwargs)
+            else:
+                self._cc_send(msg=msg, raw=raw, **kwargs)
+        finally:
+            self._lock.release()
 
     def cc_receive(self, timeout: float = 0.1, raw: bool = False):
         """Read a thread-safe message on the channel and send an acknowledgement.
@@ -119,13 +139,58 @@ class CChannel(Connector):
         """
         received_message = None
         if self._lock.acquire(blocking=False):
-            # Store received message
-            received_message = self._cc_receive(timeout=timeout, raw=raw)
+            try:
+                if self.max_packet_size and not raw:
+                    received_message = self._receive_segmented(timeout)
+                else:
+                    # Store received message
+                    received_message = self._cc_receive(timeout=timeout, raw=raw)
+            finally:
+                self._lock.release()
         else:
             raise ConnectionRefusedError
-        self._lock.release()
         return received_message
 
+    def _receive_segmented(self, timeout: float) -> Optional[Message]:
+        """Receive a raw packet and reassemble the segmented messages.
+
+        :param timeout: time in second to wait for reading a packet
+
+        :return: the complete message, None if none was completed
+        """
+        packet = self._cc_receive(timeout=timeout, raw=True)
+        if not packet:
+            return None
+        try:
+            return self._reassembler.add(packet)
+        except ValueError:
+            log.exception(f"invalid packet received via {self}")
+            return None
+
+    def cc_receive_into(self, buffer: BufferType, timeout: float = 0.1) -> int:
+        """Read thread-safe raw data from the channel directly into a
+        preallocated buffer.
+
+        Reusing the same buffer for every reception avoids allocating
+        new bytes objects at high message rates. The data can then be
+        interpreted with :py:meth:`pykiso.message.Message.parse_packet`
+        on a memoryview of the buffer.
+
+        :param buffer: writable buffer receiving the data
+        :param timeout: time in second to wait for reading data
+
+        :return: number of bytes written in the buffer, 0 if nothing was
+            received
+
+        :raise ConnectionRefusedError: when lock acquire failed
+        """
+        if self._lock.acquire(blocking=False):
+            try:
+                return self._cc_receive_into(buffer, timeout=timeout)
+            finally:
+                self._lock.release()
+        raise ConnectionRefusedError
+
     @abc.abstractmethod
     def _cc_open(self):
         """Open the channel."""
@@ -158,6 +223,142 @@ class CChannel(Connector):
         # TODO define exception to raise?
         pass
 
+    def set_wakeup(self, wakeup: Optional[Wakeup]) -> bool:
+        """Let a wake-up interrupt the receptions waiting on the channel.
+
+        Only channels waiting on a selector support it, a reception
+        interrupted by the wake-up returns as if nothing was received.
+
+        :param wakeup: wake-up to register, None to unregister it
+
+        :return: True if the channel supports the wake-up
+        """
+        return False
+
+    def _cc_receive_into(self, buffer: BufferType, timeout: float) -> int:
+        """How to receive raw data from the channel into a buffer.
+
+        By default, the data returned by _cc_receive in raw mode are
+        copied into the buffer. Channels able to write directly into
+        the buffer should override this method.
+
+        :param buffer: writable buffer receiving the data
+        :param timeout: time in second to wait for reading data
+
+        :return: number of bytes written in the buffer, 0 if nothing was
+            received
+        """
+        data = self._cc_receive(timeout=timeout, raw=True)
+        if not data:
+            return 0
+        view = memoryview(buffer)
+        if len(data) > len(view):
+            log.warning(
+                f"{len(data)} bytes received via {self}, truncated to the "
+                f"buffer size {len(view)}"
+            )
+            data = data[: len(view)]
+        view[: len(data)] = data
+        return len(data)
+
+
+class AsyncCChannel(Connector):
+    """Abstract class for coordination channel running on an asyncio
+    event loop.
+
+    All channel operations are coroutines and must be awaited from the
+    event loop the channel was opened on.
+    """
+
+    def __init__(self, **kwargs):
+        """constructor"""
+        super().__init__(**kwargs)
+        self._is_open = False
+
+    def __enter__(self):
+        raise TypeError(f"{self} must be used with 'async with'")
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, typ, value, traceback):
+        await self.close()
+        if value is not None:
+            raise value
+
+    async def open(self) -> None:
+        """Open the channel.
+
+        :raise ConnectionRefusedError: when the channel is already open
+        """
+        if self._is_open:
+            raise ConnectionRefusedError
+        await self._cc_open()
+        self._is_open = True
+
+    async def close(self) -> None:
+        """Close the channel."""
+        await self._cc_close()
+        self._is_open = False
+
+    async def cc_send(self, msg: MsgType, raw: bool = False, **kwargs) -> None:
+        """Send a message on the channel.
+
+        :param msg: message to send
+        :param raw: send raw message without further work
+
+        :raise ConnectionRefusedError: when the channel is not open
+        """
+        if not self._is_open:
+            raise ConnectionRefusedError
+        await self._cc_send(msg=msg, raw=raw, **kwargs)
+
+    async def cc_receive(self, timeout: float = 0.1, raw: bool = False) -> MsgType:
+        """Read a message on the channel.
+
+        :param timeout: time in second to wait for reading a message
+        :param raw: should the message be returned raw or should it be interpreted as a
+            pykiso.Message?
+
+        :return: Message if successful, None else
+
+        :raise ConnectionRefusedError: when the channel is not open
+        """
+        if not self._is_open:
+            raise ConnectionRefusedError
+        return await self._cc_receive(timeout=timeout, raw=raw)
+
+    @abc.abstractmethod
+    async def _cc_open(self) -> None:
+        """Open the channel."""
+        pass
+
+    @abc.abstractmethod
+    async def _cc_close(self) -> None:
+        """Close the channel."""
+        pass
+
+    @abc.abstractmethod
+    async def _cc_send(self, msg: MsgType, raw: bool = False) -> None:
+        """Sends the message on the channel.
+
+        :param msg: Message to send out
+        :param raw: send raw message without further work (default: False)
+        """
+        pass
+
+    @abc.abstractmethod
+    async def _cc_receive(self, timeout: float, raw: bool = False) -> MsgType:
+        """How to receive something from the channel.
+
+        :param timeout: Time to wait in second for a message to be received
+        :param raw: send raw message without further work (default: False)
+
+        :return: message.Message() - If one received / None - If not
+        """
+        pass
+
 
 class Flasher(Connector):
     """Interface for devices that can flash firmware on our targets."""
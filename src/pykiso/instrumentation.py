@@ -0,0 +1,213 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Auxiliary Instrumentation
+*************************
+
+:module: instrumentation
+
+:synopsis: counters and histograms describing the activity of an
+    auxiliary thread.
+
+Every auxiliary records its command round-trip latency, acknowledgement
+wait time, queue depths, loop iterations, empty receptions and the time
+spent in its ``_run_command`` and ``_receive_message`` methods. The
+statistics of all configured auxiliaries are available at runtime via
+:py:meth:`pykiso.test_setup.config_registry.ConfigRegistry.get_auxes_stats`
+and logged as a summary at the end of the test execution.
+
+.. currentmodule:: instrumentation
+
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+# upper bounds of the duration buckets in seconds: 10us to ~84s
+DURATION_BOUNDS = tuple(10e-6 * 2**exponent for exponent in range(24))
+# upper bounds of the queue depth buckets
+DEPTH_BOUNDS = (0,) + tuple(2**exponent for exponent in range(20))
+
+
+class Histogram:
+    """Distribution of recorded values in fixed buckets.
+
+    Recording a value only costs a binary search among the bucket bounds,
+    percentiles are approximated by the upper bound of their bucket.
+    Values can be recorded and read from several threads.
+    """
+
+    def __init__(self, bounds: Sequence[float] = DURATION_BOUNDS):
+        """Initialize attributes.
+
+        :param bounds: sorted upper bounds of the buckets, the values
+            above the last bound are counted in an overflow bucket
+        """
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def record(self, value: float) -> None:
+        """Add a value to the distribution.
+
+        :param value: value to record
+        """
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean of the recorded values, None if nothing was recorded."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Approximate the given percentile of the recorded values.
+
+        :param percent: percentile to compute, between 0 and 100
+
+        :return: upper bound of the bucket containing the percentile
+            (the maximum for the overflow bucket), None if nothing was
+            recorded
+        """
+        with self._lock:
+            return self._percentile(percent)
+
+    def _percentile(self, percent: float) -> Optional[float]:
+        """Approximate a percentile, the lock must be held.
+
+        :param percent: percentile to compute, between 0 and 100
+
+        :return: see :py:meth:`percentile`
+        """
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        cumulated = 0
+        for index, bucket_count in enumerate(self.buckets):
+            cumulated += bucket_count
+            if bucket_count and cumulated >= rank:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+                break
+        return self.max
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Return the main figures of the distribution.
+
+        :return: count, mean, min, max, 50th and 99th percentiles
+        """
+        with self._lock:
+            return {
+                "count": self.count,
+                "mean": self.mean,
+                "min": self.min,
+                "max": self.max,
+                "p50": self._percentile(50),
+                "p99": self._percentile(99),
+            }
+
+
+class AuxiliaryStats:
+    """Runtime statistics of one auxiliary.
+
+    The counters are updated by the auxiliary thread only, reading them
+    from another thread gives a consistent enough view for monitoring.
+    The command latency is recorded by the thread resolving the command
+    future, which can be the caller thread, the histograms are thus
+    thread-safe.
+    """
+
+    def __init__(self):
+        """Initialize the counters and histograms."""
+        self.started_at = None
+        self.loop_iterations = 0
+        self.empty_receives = 0
+        self.commands = 0
+        self.command_latency = Histogram()
+        self.ack_wait = Histogram()
+        self.run_command_time = Histogram()
+        self.receive_message_time = Histogram()
+        self.queue_in_depth = Histogram(DEPTH_BOUNDS)
+        self.queue_out_depth = Histogram(DEPTH_BOUNDS)
+
+    def start(self) -> None:
+        """Mark the start of the auxiliary loop."""
+        self.started_at = time.perf_counter()
+
+    @property
+    def loop_rate(self) -> Optional[float]:
+        """Mean number of loop iterations per second since the start."""
+        if self.started_at is None:
+            return None
+        elapsed = time.perf_counter() - self.started_at
+        return self.loop_iterations / elapsed if elapsed else None
+
+    def snapshot(self) -> dict:
+        """Return all the statistics.
+
+        :return: counters and histogram figures by name
+        """
+        return {
+            "loop_iterations": self.loop_iterations,
+            "loop_rate": self.loop_rate,
+            "empty_receives": self.empty_receives,
+            "commands": self.commands,
+            "command_latency": self.command_latency.snapshot(),
+            "ack_wait": self.ack_wait.snapshot(),
+            "run_command_time": self.run_command_time.snapshot(),
+            "receive_message_time": self.receive_message_time.snapshot(),
+            "queue_in_depth": self.queue_in_depth.snapshot(),
+            "queue_out_depth": self.queue_out_depth.snapshot(),
+        }
+
+    def summary(self) -> str:
+        """Format the statistics on several lines.
+
+        :return: human readable statistics
+        """
+        lines = []
+        for name, value in self.snapshot().items():
+            if isinstance(value, dict):
+                if not value["count"]:
+                    continue
+                figures = ", ".join(
+                    f"{key}={_format_value(figure)}" for key, figure in value.items()
+                )
+                lines.append(f"{name}: {figures}")
+            else:
+                lines.append(f"{name}: {_format_value(value)}")
+        return "\n".join(lines)
+
+
+def _format_value(value: Optional[float]) -> str:
+    """Format a statistic value for the summary.
+
+    :param value: value to format
+
+    :return: the value with at most 6 significant digits, "-" for None
+    """
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
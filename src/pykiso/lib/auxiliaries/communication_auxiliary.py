@@ -59,10 +59,13 @@ class CommunicationAuxiliary(AuxiliaryInterface):
         :returns: raw message
         """
         log.debug(
-            f"retrieving message in {self} (blocking={blocking}, timeout={timeout_in_s})"
+            "retrieving message in %s (blocking=%s, timeout=%s)",
+            self,
+            blocking,
+            timeout_in_s,
         )
         msg = self.wait_and_get_report(blocking=blocking, timeout_in_s=timeout_in_s)
-        log.debug(f"retrieved message '{msg}' in {self}")
+        log.debug("retrieved message '%s' in %s", msg, self)
         return msg
 
     def _create_auxiliary_instance(self) -> bool:
@@ -110,7 +113,7 @@ class CommunicationAuxiliary(AuxiliaryInterface):
                     f"encountered error while sending message '{cmd_data}' to {self.channel}"
                 )
         elif isinstance(cmd_message, Message):
-            log.debug(f"ignored command '{cmd_message} in {self}'")
+            log.debug("ignored command '%s' in %s", cmd_message, self)
             return True
         else:
             log.warning(f"received unknown command '{cmd_message} in {self}'")
@@ -121,15 +124,15 @@ class CommunicationAuxiliary(AuxiliaryInterface):
         pass
 
     def _receive_message(self, timeout_in_s: float) -> bytes:
-        """No-op since it's handled in _run_command
+        """Receive a raw message from the communication channel.
 
-        :param timeout_in_s: not used
+        :param timeout_in_s: maximum time in second to wait for a message
 
         :return: received message
         """
         try:
-            rcv_data = self.channel.cc_receive(timeout=0, raw=True)
-            log.debug(f"received message '{rcv_data}' from {self.channel}")
+            rcv_data = self.channel.cc_receive(timeout=timeout_in_s, raw=True)
+            log.debug("received message '%s' from %s", rcv_data, self.channel)
             return rcv_data
         except Exception:
             log.exception(
@@ -129,6 +129,25 @@ class DUTAuxiliary(auxiliary.AuxiliaryInterface):
         log.info(f"Send test request: {cmd_message}")
         return self._send_and_wait_ack(cmd_message, 2, 2)
 
+    def _send_command(
+        self, cmd_message: message.Message, cmd_data: bytes = None
+    ) -> bool:
+        """Send a command without waiting for its acknowledgement, used
+        when the auxiliary is pipelined.
+
+        :param cmd_message: command in form of a message to send
+        :param cmd_data: payload data for the command
+
+        :return: True - Successfully sent / False - Failed sending
+        """
+        log.info(f"Send test request: {cmd_message}")
+        try:
+            self.channel.cc_send(msg=cmd_message)
+        except Exception:
+            log.exception(f"Unable to send test request {cmd_message}")
+            return False
+        return True
+
     def _abort_command(self) -> bool:
         """Send an abort command and reset the auxiliary if needed.
 
@@ -157,7 +176,10 @@ class DUTAuxiliary(auxiliary.AuxiliaryInterface):
 
         # Read message on the channel
         received_message = self.channel.cc_receive(timeout_in_s)
-        if received_message is not None:
+        if (
+            received_message is not None
+            and received_message.msg_type != message.MessageType.ACK
+        ):
             # Send ack
             self.channel._cc_send(
                 msg=received_message.generate_ack_message(message.MessageAckType.ACK)
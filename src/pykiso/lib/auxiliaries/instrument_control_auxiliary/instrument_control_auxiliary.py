@@ -19,8 +19,8 @@ Instrument Control Auxiliary
 .. currentmodule:: instrument_control_auxiliary
 
 """
+import concurrent.futures
 import logging
-import queue
 import re
 import time
 from typing import List, Tuple, Union
@@ -202,7 +202,7 @@ class InstrumentControlAuxiliary(AuxiliaryInterface):
     def stop(self) -> None:
         """Stop the auxiliary thread"""
         self.wait_event.set()
-        self.stop_event.set()
+        super().stop()
 
     def _create_auxiliary_instance(self) -> bool:
         """Open the connector.
@@ -275,19 +275,17 @@ class InstrumentControlAuxiliary(AuxiliaryInterface):
         """
         response_received = None
 
-        if self.lock.acquire():
+        with self.lock:
             self.wait_event.set()
             # Trigger the internal requests
-            self.queue_in.put(("command", cmd_message, cmd_data))
-            # Wait until the test request was received
+            log.debug(f"message to encode '{cmd_data}' in {self}")
+            future = self.submit_command(cmd_message, cmd_data)
+            # Wait until the test request was executed
             try:
-                log.debug(f"message to encode '{cmd_data}' in {self}")
-                response_received = self.queue_out.get(blocking, timeout_in_s)
-            except queue.Empty:
+                response_received = future.result(timeout_in_s if blocking else 0)
+            except concurrent.futures.TimeoutError:
                 log.error("no reply received or command not executed within time")
-            # Release the above lock
             self.wait_event.clear()
-            self.lock.release()
         return response_received
 
     def _run_command(
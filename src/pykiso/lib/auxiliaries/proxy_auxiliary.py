@@ -49,6 +49,7 @@ auxiliaries. This auxiliary is only usable through proxy connector.
 """
 
 import logging
+import queue
 import sys
 import time
 from pathlib import Path
@@ -56,6 +57,7 @@ from typing import List, Optional, Tuple
 
 from pykiso import CChannel
 from pykiso.auxiliary import AuxiliaryInterface
+from pykiso.lib.connectors.cc_proxy import CCProxy
 from pykiso.test_setup.config_registry import ConfigRegistry
 from pykiso.test_setup.dynamic_loader import PACKAGE
 
@@ -83,6 +85,10 @@ class ProxyAuxiliary(AuxiliaryInterface):
         self.logger = ProxyAuxiliary._init_trace(activate_trace, trace_dir, trace_name)
         self.proxy_channels = self.get_proxy_con(aux_list)
         super().__init__(**kwargs)
+        # forward the commands as soon as they are sent
+        for conn in self.proxy_channels:
+            if isinstance(conn, CCProxy):
+                conn.on_send = self.wake
 
     @staticmethod
     def _init_trace(
@@ -242,19 +248,33 @@ class ProxyAuxiliary(AuxiliaryInterface):
         """
         for conn in self.proxy_channels:
             if conn != con_use:
-                conn.queue_out.put([message, remote_id])
+                self._put_in_queue_out(conn, [message, remote_id])
+
+    @staticmethod
+    def _put_in_queue_out(conn: CChannel, item: list) -> None:
+        """Populate the queue out of a proxy connector.
+
+        :param conn: proxy connector to populate
+        :param item: message and its source or remote id
+        """
+        try:
+            conn.queue_out.put(item)
+        except queue.Full:
+            log.error(f"queue out of {conn.name} is full, message lost")
 
     def _abort_command(self) -> None:
         """Not Used."""
         return True
 
-    def _receive_message(self, timeout_in_s: float = 0) -> None:
+    def _receive_message(self, timeout_in_s: float = 0) -> Optional[bytes]:
         """When no request are sent this method is called by AuxiliaryInterface run
         method. At each message received, this method will populate each
         proxy connectors queue out.
 
         :param timeout_in_s: maximum amount of time in second to wait
             for a message.
+
+        :return: received raw data if any, otherwise None
         """
         try:
             received_data, source = self.channel.cc_receive(
@@ -262,52 +282,31 @@ class ProxyAuxiliary(AuxiliaryInterface):
             )
             # if data are received, populate connected proxy connectors queue out
             if received_data is not None:
-                self.logger.debug(
-                    f"raw data : {received_data.hex()} || source : {source} || channel : {self.channel.name}"
-                )
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
+                        "raw data : %s || source : %s || channel : %s",
+                        received_data.hex(),
+                        source,
+                        self.channel.name,
+                    )
                 for conn in self.proxy_channels:
-                    conn.queue_out.put([received_data, source])
+                    self._put_in_queue_out(conn, [received_data, source])
+            return received_data
         except Exception:
             log.exception(
                 f"encountered error while receiving message via {self.channel}"
             )
 
-    def run(self) -> None:
-        """Run function of the auxiliary thread """
-
-        while not self.stop_event.is_set():
-            # Step 1: Check if a request is available & process it
-            request = ""
-            # Check if a request was received
-            if not self.queue_in.empty():
-                request = self.queue_in.get_nowait()
-            # Process the request
-            if request == "create_auxiliary_instance" and not self.is_instance:
-                # Call the internal instance creation method
-                return_code = self._create_auxiliary_instance()
-                # Based on the result set status:
-                self.is_instance = return_code
-                # Enqueue the result for the request caller
-                self.queue_out.put(return_code)
-            elif request == "delete_auxiliary_instance" and self.is_instance:
-                # Call the internal instance delete method
-                return_code = self._delete_auxiliary_instance()
-                # Based on the result set status:
-                self.is_instance = not return_code
-                # Enqueue the result for the request caller
-                self.queue_out.put(return_code)
-            elif request != "":
-                # A request was received but could not be processed
-                log.warning(f"Unknown request '{request}', will not be processed!")
-                log.warning(f"Aux status: {self.__dict__}")
-
-            # Step 2: Send stack command and propagate them to others connected auxiliaires
-            # and check if something was received if instance was created
-            if self.is_instance:
-                self._run_command()
-                self._receive_message(timeout_in_s=0)
-        # Thread stop command was set
-        log.info("{} was stopped".format(self))
-        # Delete auxiliary external instance if not done
-        if self.is_instance:
-            self._delete_auxiliary_instance()
+    def _poll_instance(self, timeout: float) -> bool:
+        """Send stacked commands, propagate them to others connected
+        auxiliaries and check if something was received.
+
+        The wait for a message is interrupted by the proxy connectors
+        as soon as a command is sent.
+
+        :param timeout: maximum time in seconds to wait for a message
+
+        :return: True if a message was received
+        """
+        self._run_command()
+        return self._timed_receive_message(timeout) is not None
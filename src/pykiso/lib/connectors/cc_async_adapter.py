@@ -0,0 +1,431 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Asynchronous Channel Adapters
+*****************************
+
+:module: cc_async_adapter
+
+:synopsis: adapters running the existing CChannels on an asyncio event
+    loop.
+
+The socket based connectors (:py:class:`CCUdp`, :py:class:`CCUdpServer`
+and :py:class:`CCTcpip`) are natively driven by the event loop, while
+any other CChannel is polled without waiting by a thread shared with
+other adapters, see :py:class:`~pykiso.worker_pool.PinnedExecutorPool`.
+
+.. code:: python
+
+    channel = to_async_channel(CCUdp(dest_ip="127.0.0.1", dest_port=5005))
+    async with channel:
+        await channel.cc_send(msg)
+        response = await channel.cc_receive(timeout=1)
+
+.. currentmodule:: cc_async_adapter
+
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import socket
+from typing import Any, Callable, Optional, Union
+
+from pykiso.connector import AsyncCChannel, CChannel
+from pykiso.message import Message
+from pykiso.types import MsgType
+from pykiso.worker_pool import get_adapter_executors
+
+from .cc_tcp_ip import CCTcpip
+from .cc_udp import CCUdp
+from .cc_udp_server import CCUdpServer
+
+log = logging.getLogger(__name__)
+
+
+def _is_empty(received: Any) -> bool:
+    """Tell if a channel reception returned nothing.
+
+    :param received: value returned by _cc_receive
+
+    :return: True for None, or for a tuple starting with None like the
+        one returned by CCProxy
+    """
+    if isinstance(received, tuple):
+        return not received or received[0] is None
+    return received is None
+
+
+class CCAsyncAdapter(AsyncCChannel):
+    """Run any blocking CChannel on an event loop."""
+
+    # polling interval right after the reception started, doubled while idle
+    MIN_POLL_INTERVAL = 0.001
+    # longest polling interval while nothing is received
+    MAX_POLL_INTERVAL = 0.01
+
+    def __init__(self, channel: CChannel, executor: concurrent.futures.Executor = None):
+        """Initialize attributes.
+
+        :param channel: blocking channel to adapt
+        :param executor: executor used to run the blocking channel
+            methods. By default a single thread shared with other
+            adapters is used, since most of the channels are not
+            thread-safe.
+        """
+        super().__init__(name=channel.name)
+        self.channel = channel
+        self._shared_executors = get_adapter_executors() if executor is None else None
+        self.executor = executor or self._shared_executors.acquire()
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking method of the wrapped channel in the executor."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _cc_open(self) -> None:
+        """Open the wrapped channel."""
+        await self._call(self.channel._cc_open)
+
+    async def _cc_close(self) -> None:
+        """Close the wrapped channel and release the shared executor."""
+        await self._call(self.channel._cc_close)
+        if self._shared_executors is not None:
+            self._shared_executors.release(self.executor)
+            self._shared_executors = None
+
+    async def _cc_send(self, msg: MsgType, raw: bool = False, **kwargs) -> None:
+        """Send a message with the wrapped channel.
+
+        :param msg: message to send
+        :param raw: send raw message without further work
+        """
+        await self._call(self.channel._cc_send, msg=msg, raw=raw, **kwargs)
+
+    async def _cc_receive(self, timeout: float = 0.1, raw: bool = False) -> MsgType:
+        """Receive a message with the wrapped channel.
+
+        The wrapped channel is polled without waiting, so that the
+        executor is never blocked. The polling interval doubles while
+        nothing is received.
+
+        :param timeout: time in second to wait for reading a message
+        :param raw: should the message be returned raw or should it be
+            interpreted as a pykiso.Message?
+
+        :return: the received message
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        poll_interval = self.MIN_POLL_INTERVAL
+        while True:
+            received = await self._call(self.channel._cc_receive, timeout=0, raw=raw)
+            remaining = deadline - loop.time()
+            if not _is_empty(received) or remaining <= 0:
+                return received
+            await asyncio.sleep(min(poll_interval, remaining))
+            poll_interval = min(2 * poll_interval, self.MAX_POLL_INTERVAL)
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    """Store the received datagrams in a queue."""
+
+    def __init__(self, datagrams: asyncio.Queue):
+        self.datagrams = datagrams
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        self.datagrams.put_nowait((data, addr))
+
+    def error_received(self, exc: Exception) -> None:
+        log.error(f"encountered error on datagram endpoint: {exc}")
+
+
+class CCAsyncUdp(AsyncCChannel):
+    """Drive the socket of a CCUdp or CCUdpServer with the event loop."""
+
+    def __init__(self, channel: Union[CCUdp, CCUdpServer]):
+        """Initialize attributes.
+
+        :param channel: UDP channel to adapt
+        """
+        super().__init__(name=channel.name)
+        self.channel = channel
+        self.is_server = isinstance(channel, CCUdpServer)
+        self.transport = None
+        self.datagrams = None
+
+    async def _cc_open(self) -> None:
+        """Open the wrapped channel socket and attach it to the event
+        loop.
+        """
+        self.channel._cc_open()
+        self.datagrams = asyncio.Queue()
+        loop = asyncio.get_event_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(self.datagrams), sock=self.channel.udp_socket
+        )
+
+    async def _cc_close(self) -> None:
+        """Close the transport and the wrapped channel socket."""
+        self.transport.close()
+        self.transport = None
+        self.channel._cc_close()
+
+    async def _cc_send(self, msg: Union[Message, bytes], raw: bool = False) -> None:
+        """Send a message using the udp socket.
+
+        :param msg: message to send, should be Message type or bytes.
+        :param raw: if raw is True simply send it as it is, otherwise apply serialization
+        """
+        if not raw:
+            msg = msg.serialize()
+        if self.is_server:
+            address = self.channel.address
+        else:
+            address = (self.channel.dest_ip, self.channel.dest_port)
+        self.transport.sendto(msg, address)
+
+    async def _cc_receive(
+        self, timeout: float = 0.0000001, raw: bool = False
+    ) -> Union[Message, bytes, None]:
+        """Wait for a datagram.
+
+        :param timeout: time in second to wait for a datagram
+        :param raw: if raw is True return raw bytes, otherwise Message type like
+
+        :return: Message or raw bytes if successful, otherwise None
+        """
+        try:
+            msg_received, address = await asyncio.wait_for(
+                self.datagrams.get(), timeout
+            )
+        except asyncio.TimeoutError:
+            return None
+        # keep track of the sender like the wrapped channel does
+        if self.is_server:
+            self.channel.address = address
+        else:
+            self.channel.source_addr = address
+        if not raw:
+            msg_received = Message.parse_packet(msg_received)
+        return msg_received
+
+
+class CCAsyncTcpip(AsyncCChannel):
+    """Drive the socket of a CCTcpip with the event loop.
+
+    The received bytes are split into frames by the framing of the
+    wrapped channel, and a lost connection is reestablished like the
+    wrapped channel does.
+    """
+
+    def __init__(self, channel: CCTcpip, connect_timeout: float = 3):
+        """Initialize attributes.
+
+        :param channel: TCP channel to adapt
+        :param connect_timeout: time in second to wait for the connection
+        """
+        super().__init__(name=channel.name)
+        self.channel = channel
+        self.connect_timeout = connect_timeout
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self) -> None:
+        """Connect the wrapped channel socket using the event loop.
+
+        :raise OSError: if the connection failed
+        :raise asyncio.TimeoutError: if the connection timed out
+        """
+        channel = self.channel
+        if channel._socket_closed:
+            channel.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            channel._socket_closed = False
+        loop = asyncio.get_event_loop()
+        sock = channel.socket
+        sock.setblocking(False)
+        await asyncio.wait_for(
+            loop.sock_connect(sock, (channel.dest_ip, channel.dest_port)),
+            self.connect_timeout,
+        )
+        channel._connection_made()
+        self.reader, self.writer = await asyncio.open_connection(sock=sock)
+
+    async def _ensure_connected(self) -> bool:
+        """Reconnect a lost connection, if the reconnection delay of the
+        wrapped channel elapsed.
+
+        :return: True if the socket is connected
+        """
+        if self.writer is not None:
+            return True
+        if not self.channel._start_reconnection():
+            return False
+        try:
+            await self._connect()
+        except (OSError, asyncio.TimeoutError) as e:
+            self.channel._reconnection_failed(e)
+            return False
+        return True
+
+    def _close_stream(self) -> None:
+        """Close the stream, and with it the underlying socket."""
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    def _connection_lost(self, reason: str) -> None:
+        """Close the stream of a lost connection.
+
+        :param reason: cause of the disconnection, logged
+        """
+        self._close_stream()
+        self.channel._connection_lost(reason)
+
+    async def _cc_open(self) -> None:
+        """Connect the wrapped channel socket using the event loop."""
+        log.info(
+            f"Connection to socket at address {self.channel.dest_ip} port {self.channel.dest_port}"
+        )
+        self.channel._next_reconnect_time = 0.0
+        await self._connect()
+
+    async def _cc_close(self) -> None:
+        """Close the stream and the underlying socket."""
+        self._close_stream()
+        self.channel._cc_close()
+
+    async def _write(self, data: bytes) -> None:
+        """Write data and wait until they are sent.
+
+        :param data: bytes to send
+
+        :raise ConnectionError: if the connection is lost
+        :raise socket.timeout: if the data could not be sent in time,
+            they stay buffered by the transport
+        """
+        self.writer.write(data)
+        try:
+            await asyncio.wait_for(self.writer.drain(), self.channel.socket_timeout)
+        except asyncio.TimeoutError:
+            raise socket.timeout("sending timed out") from None
+
+    async def _cc_send(
+        self, msg: Union[bytes, str, Message], raw: bool = False
+    ) -> None:
+        """Send a message via the socket.
+
+        Like :py:meth:`CCTcpip._cc_send`, the whole frame is sent again
+        once reconnected if the connection is lost.
+
+        :param msg: message to send
+        :param raw: is the message in a raw format (True) or is it a string (False)?
+
+        :raise ConnectionError: if the connection is lost and could not
+            be reestablished
+        :raise socket.timeout: if the frame could not be sent within
+            socket_timeout, it is not sent again
+        """
+        data = self.channel.framing.encode(msg, raw)
+        if not await self._ensure_connected():
+            raise ConnectionError(f"{self} is not connected")
+        try:
+            await self._write(data)
+        except ConnectionError as e:
+            self._connection_lost(repr(e))
+            if not await self._ensure_connected():
+                raise
+            # sent again on the new connection
+            try:
+                await self._write(data)
+            except ConnectionError as e:
+                self._connection_lost(repr(e))
+                raise
+
+    async def _read(self, timeout: Optional[float]) -> int:
+        """Read the available bytes into the framing buffer.
+
+        :param timeout: time in second to wait for data, forever if None
+
+        :return: number of bytes read, 0 if nothing was received
+        """
+        if timeout is not None:
+            timeout = max(timeout, 0)
+        if not await self._ensure_connected():
+            # wait as if nothing was received, instead of polling again
+            await asyncio.sleep(
+                self.channel.RECONNECT_DELAY if timeout is None else timeout
+            )
+            return 0
+        try:
+            data = await asyncio.wait_for(
+                self.reader.read(self.channel.max_msg_size), timeout
+            )
+        except asyncio.TimeoutError:
+            return 0
+        except ConnectionError as e:
+            self._connection_lost(repr(e))
+            return 0
+        if not data:
+            self._connection_lost("closed by peer")
+            return 0
+        self.channel.framing.feed(data)
+        return len(data)
+
+    async def _cc_receive(
+        self, timeout: float = 0.01, raw: bool = False
+    ) -> Union[bytes, str, Message, None]:
+        """Read a message from the socket.
+
+        An incomplete frame is kept until the next call.
+
+        :param timeout: time in second to wait for reading a message
+        :param raw: should the message be returned raw or should it be
+            decoded, as a string or as a pykiso.Message depending on the
+            framing?
+
+        :return: the received frame, an empty string, or None with the
+            message framing, if no frame was completed in time
+        """
+        framing = self.channel.framing
+        loop = asyncio.get_event_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            msg_received = framing.get(raw)
+            while msg_received is None:
+                remaining = None if deadline is None else deadline - loop.time()
+                if not await self._read(remaining):
+                    return framing.no_frame
+                msg_received = framing.get(raw)
+        except Exception:
+            log.exception(f"encountered error while receiving message via {self}")
+            return framing.no_frame
+        return msg_received
+
+
+def to_async_channel(
+    channel: CChannel, executor: Optional[concurrent.futures.Executor] = None
+) -> AsyncCChannel:
+    """Return the adapter running the given channel on an event loop.
+
+    :param channel: blocking channel to adapt
+    :param executor: executor used if the channel can't be natively
+        driven by the event loop
+
+    :return: the asynchronous channel
+    """
+    if isinstance(channel, (CCUdp, CCUdpServer)):
+        return CCAsyncUdp(channel)
+    if isinstance(channel, CCTcpip):
+        return CCAsyncTcpip(channel)
+    return CCAsyncAdapter(channel, executor)
@@ -15,6 +15,11 @@ Communication Channel Via lauterbach
 
 :synopsis: CChannel implementation for lauterbach(FDX)
 
+The FDX reception buffer is polled with an interval starting at
+MIN_POLL_INTERVAL and doubling up to max_poll_interval while nothing is
+received. The FDX channels are accessed under a lock, also held by
+:py:meth:`CCFdxLauterbach.reset_board` while the channels are reopened.
+
 .. currentmodule:: cc_fdx_lauterbach
 
 """
@@ -23,14 +28,19 @@ import ctypes
 import enum
 import logging
 import subprocess
+import threading
 import time
-from typing import Union
+from typing import List, Optional, Union
 
 from pykiso import connector
 from pykiso.message import Message
+from pykiso.types import BufferType
 
 log = logging.getLogger(__name__)
 
+# largest packet exchanged through a FDX channel
+FDX_MAX_SIZE = 4096
+
 
 class PracticeState(enum.IntEnum):
     """Available state for any scripts loaded into TRACE32."""
@@ -44,6 +54,9 @@ class PracticeState(enum.IntEnum):
 class CCFdxLauterbach(connector.CChannel):
     """Lauterbach connector using the FDX protocol."""
 
+    # polling interval right after a packet was received, doubled while idle
+    MIN_POLL_INTERVAL = 0.0005
+
     def __init__(
         self,
         t32_exc_path: str = None,
@@ -57,6 +70,7 @@ class CCFdxLauterbach(connector.CChannel):
         node: str = "localhost",
         packlen: str = "1024",
         device: int = 1,
+        max_poll_interval: float = 0.01,
         **kwargs,
     ):
         """Constructor: initialize attributes with configuration data.
@@ -72,6 +86,8 @@ class CCFdxLauterbach(connector.CChannel):
         :param node: node name (default localhost)
         :param packlen: data pack length for UDP communication (default 1024)
         :param device: configure device number given by Trace32 (default 1)
+        :param max_poll_interval: maximum time in seconds between two
+            polls of the FDX channel while nothing is received
         """
         self.t32_main_script_path = t32_main_script_path
         self.t32_reset_script_path = t32_reset_script_path
@@ -88,8 +104,13 @@ class CCFdxLauterbach(connector.CChannel):
         self.loadup_wait_time = 4
         self.fdxin = -1
         self.fdxout = -1
-        self.reset_flag = False
-        self.safe_reset_flag = False
+        self.max_poll_interval = max_poll_interval
+        # held while using the FDX channels and during the board reset
+        self._fdx_lock = threading.Lock()
+        # reception buffer reused for every poll, MaxSize = [0 ; 4096]
+        self._receive_buffer = ctypes.pointer(ctypes.create_string_buffer(FDX_MAX_SIZE))
+        # buffer reused to send every message, extended messages included
+        self._send_buffer = ctypes.pointer(ctypes.create_string_buffer(FDX_MAX_SIZE))
 
         # Initialize the super class
         super().__init__(**kwargs)
@@ -229,25 +250,36 @@ class CCFdxLauterbach(connector.CChannel):
         :param msg: message
         :param raw: boolean precising the message type (encoded or not)
 
-        :return: poll length
+        :return: poll length, 0 if the message exceeds FDX_MAX_SIZE
         """
-        log.debug(f"===> {msg}")
-        log.debug(f"Sent on channel {self.fdxout}")
-
-        # Encode message if it is raw
-        if not raw:
-            msg = msg.serialize()
-
-        # Create and fill the buffer with the message
-        buffer = ctypes.pointer(ctypes.create_string_buffer(len(msg)))
-        buffer.contents.raw = msg
+        log.debug("===> %s", msg)
+        log.debug("Sent on channel %s", self.fdxout)
 
-        # Send the message
-        poll_len = self.t32_api.T32_Fdx_SendPoll(self.fdxout, buffer, 1, len(msg))
+        if raw:
+            msg_len = len(msg)
+            if msg_len > FDX_MAX_SIZE:
+                log.error(
+                    f"cannot send {msg_len} bytes on {self.fdxout}, "
+                    f"the FDX channel is limited to {FDX_MAX_SIZE} bytes"
+                )
+                return 0
+            # Create and fill the buffer with the message
+            buffer = ctypes.pointer(ctypes.create_string_buffer(msg_len))
+            buffer.contents.raw = msg
+        else:
+            # Encode the message directly in the reused buffer
+            buffer = self._send_buffer
+            try:
+                msg_len = msg.serialize_into(buffer.contents)
+            except ValueError as e:
+                log.error(f"cannot send {msg} on {self.fdxout}: {e}")
+                return 0
+
+        # Send the message, waiting for a running board reset
+        with self._fdx_lock:
+            poll_len = self.t32_api.T32_Fdx_SendPoll(self.fdxout, buffer, 1, msg_len)
         if poll_len <= 0:
-            log.exception(
-                f"ERROR occurred while sending {len(msg)} bytes on {self.fdxout}"
-            )
+            log.error(f"ERROR occurred while sending {msg_len} bytes on {self.fdxout}")
         return poll_len
 
     def _cc_receive(
@@ -255,61 +287,124 @@ class CCFdxLauterbach(connector.CChannel):
     ) -> Union[Message, bytes, None]:
         """Receive message using the FDX channel.
 
+        :param timeout: time in second to wait for a message
         :param raw: boolean precising the message type
 
         :return: message
         """
-        # Add a small delay to allow other functions to execute
-        time.sleep(0.1)
-
-        received_msg = None
-        if self.reset_flag:
-            # If the Reset function is called, do not attempt to read messages
-            return received_msg
-
-        self.safe_reset_flag = False
-
-        # Get the current time to process the timeout
-        t_start = time.perf_counter()
-        # Ensure to enter into the while loop (at least one time) if timeout is set to 0
-        is_timeout = False
-        # Check if a message has been received within the timeout
-        while not is_timeout:
-            # Create the buffer
-            buffer = ctypes.pointer(
-                ctypes.create_string_buffer(4096)
-            )  # MaxSize = [0 ; 4096]
-
-            # Check if msg available
-            poll_len = self.t32_api.T32_Fdx_ReceivePoll(
-                self.fdxin,
-                buffer,
-                len(buffer.contents[0]),
-                int(len(buffer.contents) / len(buffer.contents[0])),
-            )
+        poll_len = self._receive_poll(self._receive_buffer, timeout)
+        if poll_len <= 0:
+            # No message received
+            return None
+        return self._decode_packet(poll_len, raw)
+
+    def cc_receive_batch(
+        self,
+        timeout: float = 0.1,
+        raw: bool = False,
+        max_count: Optional[int] = None,
+    ) -> List[Union[Message, bytes]]:
+        """Read all the packets available in the FDX channel in one call.
+
+        :param timeout: time in second to wait for the first packet
+        :param raw: if raw is True return raw bytes, otherwise Message
+            type like
+        :param max_count: maximum number of packets to read
+
+        :return: the received messages
+
+        :raise ConnectionRefusedError: when lock acquire failed
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ConnectionRefusedError
+        try:
+            messages = []
+            poll_len = self._receive_poll(self._receive_buffer, timeout)
+            while poll_len > 0:
+                messages.append(self._decode_packet(poll_len, raw))
+                if max_count is not None and len(messages) >= max_count:
+                    break
+                # the next packets are only read if already available
+                poll_len = self._receive_poll(self._receive_buffer, 0)
+            return messages
+        finally:
+            self._lock.release()
+
+    def _decode_packet(self, poll_len: int, raw: bool) -> Union[Message, bytes]:
+        """Decode the packet received in the reused reception buffer.
+
+        :param poll_len: number of bytes received
+        :param raw: if raw is True return raw bytes, otherwise Message
+            type like
+
+        :return: the received message
+        """
+        # parse the reused buffer in place instead of copying it
+        packet = memoryview(self._receive_buffer.contents)[:poll_len]
+        if raw:
+            return bytes(packet)
+        received_msg = Message.parse_packet(packet)
+        log.info(f"<=== {received_msg}")
+        return received_msg
+
+    def _cc_receive_into(self, buffer: BufferType, timeout: float = 0.1) -> int:
+        """Receive raw data from the FDX channel directly into a buffer.
+
+        :param buffer: writable buffer receiving the data
+        :param timeout: time in second to wait for reading data
+
+        :return: number of bytes written in the buffer, 0 if nothing was
+            received
+        """
+        view = memoryview(buffer)
+        target = ctypes.pointer((ctypes.c_char * view.nbytes).from_buffer(view))
+        return max(self._receive_poll(target, timeout), 0)
+
+    def _receive_poll(self, buffer: ctypes.pointer, timeout: float) -> int:
+        """Poll the FDX channel until data are written in the buffer.
+
+        :param buffer: pointer to the ctypes char array receiving the data
+        :param timeout: time in second to wait for data
+
+        :return: number of bytes received, 0 if nothing was received
+            within time, negative if the Trace32 API reported an error
+        """
+        deadline = time.perf_counter() + timeout
+        poll_interval = self.MIN_POLL_INTERVAL
+        width = len(buffer.contents[0])
+        max_count = len(buffer.contents) // width
+
+        # Poll at least once, even if the timeout is 0
+        while True:
+            # wait for a running board reset within the timeout
+            if not self._fdx_lock.acquire(
+                timeout=max(deadline - time.perf_counter(), 0)
+            ):
+                return 0
+            try:
+                poll_len = self.t32_api.T32_Fdx_ReceivePoll(
+                    self.fdxin, buffer, width, max_count
+                )
+            finally:
+                self._fdx_lock.release()
 
             # Check if T32 api got an error
             if poll_len < 0:
                 log.error(
                     f"ERROR occurred while listening channel {self.fdxin} with buffer: {buffer.contents.value}"
                 )
-                break
+                return poll_len
 
             # Check if a message has been received
-            elif poll_len > 0:
-                log.info(f"Message size: {poll_len}")
-                log.info(f"<=== {Message.parse_packet(buffer.contents.raw[:poll_len])}")
-                log.debug(f"Received on channel {self.fdxin}")
-                received_msg = Message.parse_packet(buffer.contents.raw[:poll_len])
-                break
-
-            # Exit the while loop once timeout is reached
-            if time.perf_counter() > (t_start + timeout):
-                is_timeout = True
-
-        self.safe_reset_flag = True
-        # No message received
-        return received_msg
+            if poll_len > 0:
+                log.debug("Received %d bytes on channel %s", poll_len, self.fdxin)
+                return poll_len
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return 0
+            time.sleep(min(poll_interval, remaining))
+            poll_interval = min(2 * poll_interval, self.max_poll_interval)
 
     def start(self) -> None:
         """Override clicking on "go" in the Trace32 application.
@@ -320,16 +415,17 @@ class CCFdxLauterbach(connector.CChannel):
         self.t32_api.T32_Go()
 
     def reset_board(self) -> None:
-        """Executes the board reset."""
+        """Executes the board reset.
 
-        log.debug(f"In Reset Function safety flag is: {self.safe_reset_flag}")
-        log.debug(f"In Reset Function reset flag is: {self.reset_flag}")
-
-        while not self.safe_reset_flag:
-            log.debug(f"Safety flag in while loop is: {self.safe_reset_flag}")
-            time.sleep(0.3)
+        The FDX channels are not used by the send and receive functions
+        until the reset is finished.
+        """
+        with self._fdx_lock:
+            self._reset_board()
+        log.debug("Reset finished")
 
-        self.reset_flag = True
+    def _reset_board(self) -> None:
+        """Reset the board and reopen the FDX channels."""
         log.debug("Do the board reset")
 
         self.t32_api.T32_Stop()
@@ -361,5 +457,3 @@ class CCFdxLauterbach(connector.CChannel):
             log.fatal("No FDXout buffer")
 
         self.t32_api.T32_Go()
-        self.reset_flag = False
-        log.debug("Reset finished")
@@ -28,6 +28,7 @@ import queue
 from typing import Tuple, Union
 
 from pykiso import Message
+from pykiso.bounded_queue import BoundedQueue, OverflowPolicy
 from pykiso.connector import CChannel
 
 ProxyReturn = Union[
@@ -40,23 +41,42 @@ log = logging.getLogger(__name__)
 class CCProxy(CChannel):
     """Proxy CChannel for multi auxiliary usage."""
 
-    def __init__(self, **kwargs):
-        """Initialize attributes."""
+    def __init__(
+        self, queue_maxsize: int = 0, queue_overflow_policy: str = "block", **kwargs
+    ):
+        """Initialize attributes.
+
+        :param queue_maxsize: maximum number of messages waiting in each
+            direction, 0 for unbounded queues
+        :param queue_overflow_policy: what to do with a message received
+            by the proxy auxiliary when queue_out is full (block,
+            drop-oldest, drop-newest or fail)
+        """
         super().__init__(**kwargs)
+        self.queue_maxsize = queue_maxsize
+        self.queue_overflow_policy = OverflowPolicy(queue_overflow_policy)
         self.queue_in = None
         self.queue_out = None
         self.timeout = 1
+        # called after each command put in queue_in, set by the proxy
+        # auxiliary to be woken up
+        self.on_send = None
+
+    def _create_queues(self) -> None:
+        """Create empty queues in both directions."""
+        self.queue_in = BoundedQueue(self.queue_maxsize, name=f"{self.name} in")
+        self.queue_out = BoundedQueue(
+            self.queue_maxsize, self.queue_overflow_policy, name=f"{self.name} out"
+        )
 
     def _cc_open(self) -> None:
         """Open proxy channel."""
-        self.queue_in = queue.Queue()
-        self.queue_out = queue.Queue()
+        self._create_queues()
         log.debug("Open proxy channel")
 
     def _cc_close(self) -> None:
         """Close proxy channel."""
-        self.queue_in = queue.Queue()
-        self.queue_out = queue.Queue()
+        self._create_queues()
         log.debug("Close proxy channel")
 
     def _cc_send(self, *args: tuple, **kwargs: dict) -> None:
@@ -65,22 +85,26 @@ class CCProxy(CChannel):
         :param args: tuple containing positionnal arguments
         :param kwargs: dictionary containing named arguments
         """
-        log.debug(f"put at proxy level: {args} {kwargs}")
+        log.debug("put at proxy level: %s %s", args, kwargs)
         self.queue_in.put((args, kwargs))
+        if self.on_send is not None:
+            self.on_send()
 
     def _cc_receive(self, timeout: float = 0.1, raw: bool = False) -> ProxyReturn:
         """Depopulate the queue out of the proxy connector.
 
-        :param timeout: not used
+        :param timeout: time in second to wait for a message, if None
+            the default channel timeout is used
         :param raw: not used
 
         :return: raw bytes and source when it exist. if queue timeout
             is reached return None
         """
+        timeout = self.timeout if timeout is None else timeout
 
         try:
-            raw_msg, source = self.queue_out.get(True, self.timeout)
-            log.debug(f"received at proxy level : {raw_msg} || source {source}")
+            raw_msg, source = self.queue_out.get(True, timeout)
+            log.debug("received at proxy level : %s || source %s", raw_msg, source)
             return raw_msg, source
         except queue.Empty:
             return None, None
@@ -17,6 +17,12 @@ Communication Channel Via segger j-link
     Additionally, RTT logs can be captured by setting the rtt_log_path parameter
     on the specified channel.
 
+The received bytes are read in bulk and split into messages by a
+:py:class:`~pykiso.message.MessageStreamDecoder`. When RTT logging is
+enabled, a single reader thread reads both the reception and the log
+buffers, otherwise the buffers are read by the receiving thread. In
+both cases the polling interval grows while the target is idle.
+
 .. currentmodule:: cc_rtt_segger
 
 """
@@ -30,7 +36,11 @@ from typing import Optional, Union
 import pylink
 
 from pykiso import connector
-from pykiso.message import Message
+from pykiso.message import (
+    MAX_EXTENDED_MESSAGE_SIZE,
+    Message,
+    MessageStreamDecoder,
+)
 
 log = logging.getLogger(__name__)
 
@@ -38,6 +48,9 @@ log = logging.getLogger(__name__)
 class CCRttSegger(connector.CChannel):
     """Channel using RTT to communicate through Segger J-Link debugger."""
 
+    # polling interval right after data was received, doubled while idle
+    MIN_POLL_INTERVAL = 0.0005
+
     def __init__(
         self,
         serial_number: int = None,
@@ -50,6 +63,8 @@ class CCRttSegger(connector.CChannel):
         rtt_log_path: Optional[str] = None,
         rtt_log_buffer_idx: int = 0,
         connection_timeout: int = 5,
+        rx_buffer_size: int = 1024,
+        max_poll_interval: float = 0.01,
         **kwargs,
     ):
         """Initialize attributes.
@@ -62,9 +77,21 @@ class CCRttSegger(connector.CChannel):
         :param rx_buffer_idx: buffer index used for reception
         :param verbose: boolean indicating if J-Link connection should be verbose in logging
         :param rtt_log_path: path to the folder where the RTT log file should be stored
-        :param rtt_log_buffer_idx: buffer index used for RTT logging
+        :param rtt_log_buffer_idx: buffer index used for RTT logging,
+            must differ from rx_buffer_idx when rtt_log_path is set
         :param connection_timeout: available time (in seconds) to open the connection
+        :param rx_buffer_size: maximum number of bytes read at once from
+            the reception buffer
+        :param max_poll_interval: maximum time in seconds between two
+            reads while the target is idle
+
+        :raise ValueError: if RTT logging is enabled on the reception
+            buffer
         """
+        if rtt_log_path is not None and rtt_log_buffer_idx == rx_buffer_idx:
+            raise ValueError(
+                f"RTT log buffer {rtt_log_buffer_idx} is the reception buffer"
+            )
         super().__init__(**kwargs)
         self.serial_number = serial_number
         self.chip_name = chip_name
@@ -76,9 +103,15 @@ class CCRttSegger(connector.CChannel):
         self.jlink = None
         self.connection_timeout = connection_timeout
         self.rtt_log_buffer_idx = rtt_log_buffer_idx
+        self.rx_buffer_size = rx_buffer_size
+        self.max_poll_interval = max_poll_interval
+        # received bytes not forming a complete message yet
+        self._decoder = MessageStreamDecoder(max_packet_size=MAX_EXTENDED_MESSAGE_SIZE)
+        # protects the buffers reads, notified when data was read
+        self._data_available = threading.Condition()
         # initialize rtt logging specific parameters
         self._is_running = False
-        self.rtt_log_thread = threading.Thread(target=self.receive_log)
+        self.rtt_log_thread = None
         self.rtt_log_path = rtt_log_path
         if self.rtt_log_path is not None:
             self.rtt_log_buffer_size = 0
@@ -159,7 +192,16 @@ class CCRttSegger(connector.CChannel):
                     self.rtt_log_buffer_idx = 0
                 self.rtt_log_buffer_size = 1024
             finally:
+                if self.rtt_log_buffer_idx == self.rx_buffer_idx:
+                    # only after falling back to the buffer 0
+                    log.warning(
+                        f"RTT log buffer {self.rtt_log_buffer_idx} is the reception "
+                        "buffer, its data are not logged"
+                    )
                 self._is_running = True
+                self.rtt_log_thread = threading.Thread(
+                    target=self.receive_log, daemon=True
+                )
                 self.rtt_log_thread.start()
                 log.info("RTT logging started")
 
@@ -168,6 +210,10 @@ class CCRttSegger(connector.CChannel):
 
         if self.jlink is not None:
             self._is_running = False
+            if self.rtt_log_thread is not None:
+                self.rtt_log_thread.join()
+                self.rtt_log_thread = None
+            self._decoder.reset()
             self.jlink.rtt_stop()
             self.jlink.close()
             log.info("RTT communication closed")
@@ -184,13 +230,49 @@ class CCRttSegger(connector.CChannel):
             msg = list(msg)
             bytes_written = self.jlink.rtt_write(self.tx_buffer_idx, msg)
             log.debug(
-                f"===> message sent (RTT): on buffer {self.tx_buffer_idx}:{msg}, number of bytes written : {bytes_written}"
+                "===> message sent (RTT): on buffer %d:%s, number of bytes written : %s",
+                self.tx_buffer_idx,
+                msg,
+                bytes_written,
             )
         except Exception:
             log.exception(
                 f"ERROR occurred while sending {len(msg)} bytes on buffer number {self.tx_buffer_idx}"
             )
 
+    def _read_buffers(self) -> bool:
+        """Read the available bytes of the reception buffer and, if RTT
+        logging is running on another buffer, of the log buffer.
+
+        Must be called with _data_available acquired.
+
+        :return: True if bytes were read
+        """
+        data = self.jlink.rtt_read(self.rx_buffer_idx, self.rx_buffer_size)
+        if data:
+            self._decoder.feed(bytes(data))
+        if not self._is_running or self.rtt_log_buffer_idx == self.rx_buffer_idx:
+            return bool(data)
+        log_data = self.jlink.rtt_read(
+            self.rtt_log_buffer_idx, self.rtt_log_buffer_size
+        )
+        if log_data:
+            self.rtt_log.debug(bytes(log_data).decode(errors="replace"))
+        return bool(data or log_data)
+
+    def _next_message(self, raw: bool) -> Union[Message, bytes, None]:
+        """Return the oldest complete message read from the target.
+
+        :param raw: return the raw packet instead of a Message
+
+        :return: the message, None if none is complete
+
+        :raise ValueError: if the packet contains unknown types or tags
+        """
+        if raw:
+            return self._decoder.get_packet()
+        return self._decoder.get_message()
+
     def _cc_receive(
         self, timeout: float = 0.1, raw: bool = False
     ) -> Union[Message, bytes, None]:
@@ -201,53 +283,69 @@ class CCRttSegger(connector.CChannel):
 
         :return: Message or raw bytes if successful, otherwise None
         """
-        is_timeout = False
-        t_start = time.perf_counter()
+        deadline = time.perf_counter() + timeout
+        poll_interval = self.MIN_POLL_INTERVAL
 
-        # rtt_read is not a blocking method due to this fact a while loop is used
-        # to act like a blocking ones.
-        while not is_timeout:
+        # rtt_read is not a blocking method, the buffers are polled until
+        # a message is complete
+        while True:
+            received = False
             try:
-                # Read the message header
-                msg_received = self.jlink.rtt_read(
-                    self.rx_buffer_idx, Message().header_size
-                )
-
-                # if a message is received
-                if msg_received:
-                    # Read the payload and CRC
-                    msg_received += self.jlink.rtt_read(
-                        self.rx_buffer_idx,
-                        msg_received[-1] + Message().crc_byte_size,
-                    )
-
-                    # Parse the bytes list into bytes string
-                    msg_received = bytes(msg_received)
-                    log.debug(
-                        f"<=== message received (RTT) on buffer {self.rx_buffer_idx}:{msg_received}, number of bytes read : {len(msg_received)}"
-                    )
-                    if not raw:
-                        msg_received = Message.parse_packet(msg_received)
-                    break
+                with self._data_available:
+                    msg_received = self._next_message(raw)
+                    remaining = deadline - time.perf_counter()
+                    # the reader thread, if any, reads the buffers
+                    if msg_received is None and not self._is_running:
+                        received = self._read_buffers()
+                        msg_received = self._next_message(raw)
+                    elif msg_received is None and remaining > 0:
+                        self._data_available.wait(remaining)
+                        msg_received = self._next_message(raw)
             except Exception:
                 log.exception(
                     f"encountered error while receiving message via {self} on buffer {self.rx_buffer_idx}"
                 )
                 return None
 
-            # Exit the while loop once timeout is reached
-            if time.perf_counter() > (t_start + timeout):
-                is_timeout = True
-                msg_received = None
-
-        return msg_received
+            if msg_received is not None:
+                log.debug(
+                    "<=== message received (RTT) on buffer %d:%s",
+                    self.rx_buffer_idx,
+                    msg_received,
+                )
+                return msg_received
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return None
+            if not self._is_running:
+                # the rest of a partially read message is expected soon
+                if received:
+                    poll_interval = self.MIN_POLL_INTERVAL
+                time.sleep(min(poll_interval, remaining))
+                poll_interval = min(2 * poll_interval, self.max_poll_interval)
 
     def receive_log(self) -> None:
-        """Receive RTT log messages from the corresponding RTT buffer."""
-        while self._is_running:
-            # receive at most rtt_log_buffer_size of RTT logs
-            log_msg = self.jlink.rtt_read(
-                self.rtt_log_buffer_idx, self.rtt_log_buffer_size
-            )
-            if log_msg:
-                self.rtt_log.debug(bytes(log_msg).decode())
+        """Read the RTT buffers until the channel is closed.
+
+        The received messages are made available to _cc_receive and the
+        RTT logs are written to the log file. The polling interval grows
+        while nothing is received.
+        """
+        poll_interval = self.MIN_POLL_INTERVAL
+        while True:
+            try:
+                with self._data_available:
+                    received = self._read_buffers()
+                    if received:
+                        self._data_available.notify_all()
+            except Exception:
+                log.exception(f"encountered error while reading RTT buffers via {self}")
+                received = False
+            # read the buffers at least once, even if closed right away
+            if not self._is_running:
+                break
+            if received:
+                poll_interval = self.MIN_POLL_INTERVAL
+            else:
+                time.sleep(poll_interval)
+                poll_interval = min(2 * poll_interval, self.max_poll_interval)
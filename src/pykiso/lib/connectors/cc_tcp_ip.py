@@ -15,86 +15,534 @@ Communication Channel via socket
 
 :synopsis: connector for communication via socket
 
+The received bytes are buffered and split into frames by the
+configured framing:
+
+- no framing: the bytes received so far are returned as they arrive
+- ``delimiter``: frames end with a delimiter, e.g. SCPI responses
+- ``length``: frames are prefixed by their big endian length
+- ``message``: frames are serialized :py:class:`~pykiso.message.Message`
+
+A lost connection is reestablished on the next send or receive, after
+a delay doubled after each failed attempt.
+
 .. currentmodule:: cc_socket
 
 """
+
 import logging
+import select
+import selectors
 import socket
-from typing import Union
+import struct
+import time
+from typing import Optional, Union
 
 from pykiso import CChannel
+from pykiso.message import (
+    MAX_EXTENDED_MESSAGE_SIZE,
+    Message,
+    MessageStreamDecoder,
+)
+from pykiso.types import BufferType
+from pykiso.wakeup import Wakeup
 
 log = logging.getLogger(__name__)
 
 
+class Framing:
+    """Stream without framing: the received bytes are returned as they
+    arrive and the sent data are not modified.
+    """
+
+    # value returned when no frame is complete
+    no_frame = ""
+
+    def __init__(self):
+        """Initialize attributes."""
+        self._buffer = bytearray()
+
+    def feed(self, data: Union[bytes, memoryview]) -> None:
+        """Add received bytes.
+
+        :param data: chunk of the byte stream
+        """
+        self._buffer += data
+
+    def has_pending(self) -> bool:
+        """Tell if received bytes are buffered.
+
+        :return: True if bytes were fed and not returned yet
+        """
+        return bool(self._buffer)
+
+    def _next_frame(self) -> Optional[bytes]:
+        """Extract the oldest complete frame.
+
+        :return: the frame content, None if none is complete
+        """
+        if not self._buffer:
+            return None
+        frame = bytes(self._buffer)
+        self._buffer.clear()
+        return frame
+
+    def _frame(self, data: bytes) -> bytes:
+        """Add the framing to sent data.
+
+        :param data: data to send
+
+        :return: the framed data
+        """
+        return data
+
+    def get(self, raw: bool = False) -> Union[bytes, str, None]:
+        """Return the oldest complete frame.
+
+        :param raw: return the frame bytes instead of a decoded string
+
+        :return: the frame, None if none is complete
+        """
+        frame = self._next_frame()
+        if frame is None or raw:
+            return frame
+        return frame.decode().strip()
+
+    def encode(self, msg: Union[bytes, str], raw: bool = False) -> bytes:
+        """Convert a message into framed bytes.
+
+        :param msg: message to send
+        :param raw: the message is bytes instead of a string
+
+        :return: the bytes to send
+        """
+        if msg is not None and not raw:
+            msg = msg.encode()
+        return self._frame(msg)
+
+    def reset(self) -> None:
+        """Discard the buffered bytes."""
+        self._buffer.clear()
+
+
+class DelimiterFraming(Framing):
+    """Frames terminated by a delimiter."""
+
+    def __init__(self, delimiter: Union[bytes, str] = b"\n"):
+        """Initialize attributes.
+
+        :param delimiter: end of each frame
+        """
+        super().__init__()
+        if isinstance(delimiter, str):
+            delimiter = delimiter.encode()
+        self.delimiter = delimiter
+
+    def _next_frame(self) -> Optional[bytes]:
+        end = self._buffer.find(self.delimiter)
+        if end < 0:
+            return None
+        frame = bytes(self._buffer[:end])
+        del self._buffer[: end + len(self.delimiter)]
+        return frame
+
+    def _frame(self, data: bytes) -> bytes:
+        return data + self.delimiter
+
+
+class LengthPrefixFraming(Framing):
+    """Frames prefixed by their length in big endian."""
+
+    _PREFIX_FORMATS = {1: ">B", 2: ">H", 4: ">I"}
+
+    def __init__(self, prefix_size: int = 4):
+        """Initialize attributes.
+
+        :param prefix_size: number of bytes of the length, 1, 2 or 4
+
+        :raise ValueError: if the prefix size is not supported
+        """
+        super().__init__()
+        if prefix_size not in self._PREFIX_FORMATS:
+            raise ValueError(f"length prefix of {prefix_size} bytes not supported")
+        self._prefix = struct.Struct(self._PREFIX_FORMATS[prefix_size])
+
+    def _next_frame(self) -> Optional[bytes]:
+        if len(self._buffer) < self._prefix.size:
+            return None
+        (length,) = self._prefix.unpack_from(self._buffer)
+        end = self._prefix.size + length
+        if len(self._buffer) < end:
+            return None
+        frame = bytes(self._buffer[self._prefix.size : end])
+        del self._buffer[:end]
+        return frame
+
+    def _frame(self, data: bytes) -> bytes:
+        return self._prefix.pack(len(data)) + data
+
+
+class MessageFraming(Framing):
+    """Frames made of serialized pykiso messages."""
+
+    no_frame = None
+
+    def __init__(self):
+        """Initialize attributes."""
+        super().__init__()
+        self.decoder = MessageStreamDecoder(max_packet_size=MAX_EXTENDED_MESSAGE_SIZE)
+
+    def feed(self, data: Union[bytes, memoryview]) -> None:
+        self.decoder.feed(data)
+
+    def has_pending(self) -> bool:
+        return self.decoder.has_pending()
+
+    def get(self, raw: bool = False) -> Union[bytes, Message, None]:
+        """Return the oldest complete message.
+
+        :param raw: return the raw packet instead of a Message
+
+        :return: the message, None if none is complete
+
+        :raise ValueError: if the packet contains unknown types or tags
+        """
+        if raw:
+            return self.decoder.get_packet()
+        return self.decoder.get_message()
+
+    def encode(self, msg: Union[bytes, Message], raw: bool = False) -> bytes:
+        if raw:
+            return msg
+        return msg.serialize()
+
+    def reset(self) -> None:
+        self.decoder.reset()
+
+
 class CCTcpip(CChannel):
     """Connector channel used to communicate via socket """
 
-    def __init__(self, dest_ip: str, dest_port: int, max_msg_size: int = 256, **kwargs):
+    # delay before the first reconnection attempt, doubled on each failure
+    RECONNECT_DELAY = 0.5
+    MAX_RECONNECT_DELAY = 8
+
+    def __init__(
+        self,
+        dest_ip: str,
+        dest_port: int,
+        max_msg_size: int = 256,
+        framing: Optional[str] = None,
+        delimiter: str = "\n",
+        length_prefix_size: int = 4,
+        tcp_nodelay: bool = True,
+        keepalive: bool = False,
+        reconnect: bool = True,
+        socket_timeout: float = 3,
+        **kwargs,
+    ):
         """Initialize channel settings.
 
         :param dest_ip: destination ip address
         :param dest_port: destination port
         :param max_msg_size: the maximum amount of data to be received
             at once
+        :param framing: None, "delimiter", "length" or "message", see
+            the module documentation
+        :param delimiter: end of the frames with the delimiter framing
+        :param length_prefix_size: number of bytes of the frame length
+            with the length framing
+        :param tcp_nodelay: send the small messages right away instead
+            of waiting to group them (TCP_NODELAY)
+        :param keepalive: detect dead connections while idle
+            (SO_KEEPALIVE)
+        :param reconnect: reconnect automatically when the connection
+            is lost
+        :param socket_timeout: time in second to wait for the connection
+            and for sending data
+
+        :raise ValueError: if the framing is unknown
         """
         super().__init__(**kwargs)
         self.dest_ip = dest_ip
         self.dest_port = int(dest_port)
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.max_msg_size = max_msg_size
+        self.tcp_nodelay = tcp_nodelay
+        self.keepalive = keepalive
+        self.reconnect = reconnect
+        self.socket_timeout = socket_timeout
+        if framing is None:
+            self.framing = Framing()
+        elif framing == "delimiter":
+            self.framing = DelimiterFraming(delimiter)
+        elif framing == "length":
+            self.framing = LengthPrefixFraming(length_prefix_size)
+        elif framing == "message":
+            self.framing = MessageFraming()
+        else:
+            raise ValueError(f"unknown framing {framing}")
+        # reception buffer reused for every read
+        self._receive_buffer = bytearray(max_msg_size)
+        self._selector = None
+        self._wakeup = None
+        self._connected = False
+        # a closed socket cannot be connected again
+        self._socket_closed = False
+        self._reconnect_delay = self.RECONNECT_DELAY
+        self._next_reconnect_time = 0.0
+
+    def _connect(self) -> None:
+        """Connect the socket and configure it.
+
+        :raise OSError: if the connection failed
+        """
+        self.socket.settimeout(self.socket_timeout)
+        self.socket.connect((self.dest_ip, self.dest_port))
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.socket, selectors.EVENT_READ)
+        if self._wakeup is not None:
+            self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._connection_made()
+
+    def _connection_made(self) -> None:
+        """Configure the newly connected socket and reset the framing
+        and the reconnection delay.
+        """
+        if self.tcp_nodelay:
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.keepalive:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self.framing.reset()
+        self._connected = True
+        self._reconnect_delay = self.RECONNECT_DELAY
+
+    def _disconnect(self) -> None:
+        """Close the socket, a new one is needed to reconnect."""
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        self.socket.close()
+        self._connected = False
+        self._socket_closed = True
+
+    def _ensure_connected(self) -> bool:
+        """Reconnect a lost connection, if the reconnection delay elapsed.
+
+        :return: True if the socket is connected
+        """
+        if self._connected:
+            return True
+        if not self._start_reconnection():
+            return False
+        try:
+            self._connect()
+        except OSError as e:
+            self._reconnection_failed(e)
+            return False
+        return True
+
+    def _start_reconnection(self) -> bool:
+        """Create a new socket if the reconnection delay elapsed.
+
+        :return: True if a reconnection has to be attempted
+        """
+        if not self.reconnect or time.monotonic() < self._next_reconnect_time:
+            return False
+        log.info(
+            f"Reconnection to socket at address {self.dest_ip} port {self.dest_port}"
+        )
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket_closed = False
+        return True
+
+    def _reconnection_failed(self, error: Exception) -> None:
+        """Close the socket of a failed reconnection and double the delay
+        before the next attempt.
+
+        :param error: cause of the failure, logged
+        """
+        self.socket.close()
+        self._socket_closed = True
+        log.warning(
+            f"reconnection via {self} failed ({error}), next attempt in "
+            f"{self._reconnect_delay} s"
+        )
+        self._next_reconnect_time = time.monotonic() + self._reconnect_delay
+        self._reconnect_delay = min(2 * self._reconnect_delay, self.MAX_RECONNECT_DELAY)
+
+    def _connection_lost(self, reason: str) -> None:
+        """Close the socket of a lost connection.
+
+        :param reason: cause of the disconnection, logged
+        """
+        log.warning(f"connection via {self} lost: {reason}")
+        self._disconnect()
+        self._next_reconnect_time = 0.0
 
     def _cc_open(self) -> None:
         """Connect to socket with configured port and IP address."""
         log.info(
             f"Connection to socket at address {self.dest_ip} port {self.dest_port}"
         )
-        self.socket.settimeout(3)
-        self.socket.connect((self.dest_ip, self.dest_port))
+        if self._socket_closed:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket_closed = False
+        self._next_reconnect_time = 0.0
+        self._connect()
 
     def _cc_close(self) -> None:
         """ Close UDP socket."""
         log.info(
             f"Disconnect from socket at address {self.dest_ip}, port {self.dest_port}"
         )
-        self.socket.close()
+        self._disconnect()
+        # no reconnection until the channel is opened again
+        self._next_reconnect_time = float("inf")
+
+    def set_wakeup(self, wakeup: Optional[Wakeup]) -> bool:
+        if self._selector is not None:
+            if self._wakeup is not None:
+                self._selector.unregister(self._wakeup)
+            if wakeup is not None:
+                self._selector.register(wakeup, selectors.EVENT_READ)
+        self._wakeup = wakeup
+        return True
 
     def _cc_send(self, msg: bytes or str, raw: bool = False) -> None:
         """Send a message via socket.
 
+        If the connection is lost, the whole frame is sent again once
+        reconnected, even if part of it was written on the lost
+        connection: the peer receives the frame twice if the lost
+        connection delivered it.
+
         :param msg: message to send
         :param raw: is the message in a raw format (True) or is it a string (False)?
+
+        :raise ConnectionError: if the connection is lost and could not
+            be reestablished
+        :raise socket.timeout: if the frame could not be sent within
+            socket_timeout, part of it may have been written and it is
+            not sent again
         """
-        if msg is not None and raw is False:
-            msg = msg.encode()
+        data = self.framing.encode(msg, raw)
 
-        log.debug(f"Sending {msg} via socket to {self.dest_ip}")
-        self.socket.send(msg)
+        log.debug("Sending %s via socket to %s", data, self.dest_ip)
+        if not self._ensure_connected():
+            raise ConnectionError(f"{self} is not connected")
+        try:
+            self.socket.sendall(data)
+        except ConnectionError as e:
+            self._connection_lost(repr(e))
+            if not self._ensure_connected():
+                raise
+            # sent again on the new connection
+            try:
+                self.socket.sendall(data)
+            except ConnectionError as e:
+                self._connection_lost(repr(e))
+                raise
 
-    def _cc_receive(self, timeout=0.01, raw: bool = False) -> Union[bytes, str]:
-        """Read message from socket.
+    def _wait_readable(self, timeout: Optional[float]) -> bool:
+        """Wait for received data.
 
-        :param timeout: time in second to wait for reading a message
-        :param raw: should the message be returned raw or should it be interpreted as a
-            pykiso.Message?
+        :param timeout: time in second to wait, forever if None
 
-        :return: Message if successful, otherwise none
+        :return: True if data can be read, False if the timeout elapsed
+            or the wake-up was set
         """
-        self.socket.settimeout(timeout)
+        if timeout is not None:
+            timeout = max(timeout, 0)
+        if not self._ensure_connected():
+            # wait as if nothing was received, instead of polling again
+            delay = self.RECONNECT_DELAY if timeout is None else timeout
+            if self._wakeup is not None:
+                select.select([self._wakeup], [], [], delay)
+            else:
+                time.sleep(delay)
+            return False
+        events = self._selector.select(timeout)
+        return any(key.fileobj is self.socket for key, _ in events)
+
+    def _read(self, timeout: Optional[float]) -> int:
+        """Read the available bytes into the framing buffer.
+
+        :param timeout: time in second to wait for data, forever if None
 
-        msg_received = ""
+        :return: number of bytes read, 0 if nothing was received
+        """
+        if not self._wait_readable(timeout):
+            return 0
         try:
-            msg_received = self.socket.recv(self.max_msg_size)
+            nbytes = self.socket.recv_into(self._receive_buffer)
+        except ConnectionError as e:
+            self._connection_lost(repr(e))
+            return 0
+        if not nbytes:
+            self._connection_lost("closed by peer")
+            return 0
+        self.framing.feed(memoryview(self._receive_buffer)[:nbytes])
+        return nbytes
+
+    def _cc_receive(
+        self, timeout=0.01, raw: bool = False
+    ) -> Union[bytes, str, Message, None]:
+        """Read message from socket.
 
-            if not raw:
-                msg_received = msg_received.decode().strip()
+        An incomplete frame is kept until the next call.
 
-            log.debug(f"Socket at {self.dest_ip} received: {msg_received}")
-        except socket.timeout:
-            log.exception(
-                f"encountered timeout error while receiving message via {self}"
-            )
+        :param timeout: time in second to wait for reading a message
+        :param raw: should the message be returned raw or should it be
+            decoded, as a string or as a pykiso.Message depending on the
+            framing?
+
+        :return: the received frame, an empty string, or None with the
+            message framing, if no frame was completed in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            msg_received = self.framing.get(raw)
+            while msg_received is None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not self._read(remaining):
+                    return self.framing.no_frame
+                msg_received = self.framing.get(raw)
         except Exception:
             log.exception(f"encountered error while receiving message via {self}")
+            return self.framing.no_frame
 
+        log.debug("Socket at %s received: %s", self.dest_ip, msg_received)
         return msg_received
+
+    def _cc_receive_into(self, buffer: BufferType, timeout: float = 0.01) -> int:
+        """Read data from the socket directly into a buffer.
+
+        Without framing, the data are received directly into the buffer,
+        otherwise a complete frame is copied into it.
+
+        :param buffer: writable buffer receiving the data
+        :param timeout: time in second to wait for reading data
+
+        :return: number of bytes written in the buffer, 0 if nothing was
+            received
+        """
+        if type(self.framing) is not Framing:
+            return super()._cc_receive_into(buffer, timeout)
+
+        nbytes = 0
+        try:
+            if self.framing.has_pending():
+                # bytes buffered by a previous _cc_receive
+                return super()._cc_receive_into(buffer, timeout)
+            if self._wait_readable(timeout):
+                nbytes = self.socket.recv_into(buffer)
+                if not nbytes:
+                    self._connection_lost("closed by peer")
+            log.debug("Socket at %s received %d bytes", self.dest_ip, nbytes)
+        except ConnectionError as e:
+            self._connection_lost(repr(e))
+        except Exception:
+            log.exception(f"encountered error while receiving message via {self}")
+
+        return nbytes
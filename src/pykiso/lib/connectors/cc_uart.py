@@ -19,39 +19,177 @@ Communication Channel Via Uart
 
 """
 
+import collections
+import logging
 import struct
 import time
+from typing import Optional, Union
 
 import serial
 
 from pykiso import connector, message
-
-
-class IncompleteCCMsgError(Exception):
-    def __init__(self, value):
-        self.value = value
-
-    def __str__(self):
-        return repr(self.value)
+from pykiso.checksum import crc16
+from pykiso.types import BufferType
+
+log = logging.getLogger(__name__)
+
+
+# start bit, 8 data bits and stop bit sent per byte
+BITS_PER_CHARACTER = 10
+
+
+def slip_encode(packet: Union[bytes, bytearray]) -> bytes:
+    """Encode a packet into a SLIP frame sent in a single write.
+
+    :param packet: CRC and message to send
+
+    :return: the START byte followed by the escaped packet
+    """
+    return SlipDecoder.START + bytes(packet).replace(b"\xdb", b"\xdb\xdd").replace(
+        b"\xc0", b"\xdb\xdc"
+    )
+
+
+class SlipDecoder:
+    """Incremental decoder of the SLIP frames sent by the device.
+
+    A frame starts with the START byte and is followed by a 2 bytes big
+    endian CRC, the message header and the payload, without end
+    delimiter. The header takes 8 bytes, or 9 bytes with a 2 bytes
+    payload length for the messages flagged as extended. The received
+    bytes are buffered until a frame is complete, so a frame can be
+    split over several reads. A START byte in the middle of a frame
+    discards the incomplete frame.
+    """
+
+    START = b"\xc0"
+    ESC = b"\xdb"
+    # CRC and message header
+    FRAME_HEADER_SIZE = 10
+    EXT_FRAME_HEADER_SIZE = 11
+    # payload length of the extended message header
+    _EXT_LENGTH_STRUCT = struct.Struct("=H")
+
+    def __init__(self):
+        """Initialize attributes."""
+        # escaped bytes received since the last frame start
+        self._buffer = bytearray()
+        self._packets = collections.deque()
+        # number of frames dropped because of an invalid CRC
+        self.dropped_frames = 0
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        """Add received bytes and extract the complete frames.
+
+        :param data: bytes read from the serial port
+
+        :return: number of packets ready to be read
+        """
+        buffer = self._buffer
+        buffer += data
+        while True:
+            start = buffer.find(self.START)
+            if start < 0:
+                # no frame in progress
+                buffer.clear()
+                break
+            next_start = buffer.find(self.START, start + 1)
+            frame_end = len(buffer) if next_start < 0 else next_start
+            frame = self._unescape(buffer[start + 1 : frame_end])
+            frame_size = self._frame_size(frame)
+            if frame_size is not None:
+                if len(frame) >= frame_size:
+                    self._add_frame(frame[:frame_size])
+                    # the bytes up to the next frame are ignored
+                    del buffer[:frame_end]
+                    continue
+            if next_start < 0:
+                # wait for the rest of the frame
+                del buffer[:start]
+                break
+            # incomplete frame interrupted by a new one
+            del buffer[:next_start]
+        return len(self._packets)
+
+    def _frame_size(self, frame: bytearray) -> Optional[int]:
+        """Compute the size of a frame from its header.
+
+        :param frame: unescaped beginning of the frame
+
+        :return: size of the frame, CRC included, None if its header is
+            not complete yet
+        """
+        if len(frame) < self.FRAME_HEADER_SIZE:
+            return None
+        if not frame[2] & message.MessageFlag.EXTENDED:
+            return self.FRAME_HEADER_SIZE + frame[self.FRAME_HEADER_SIZE - 1]
+        if len(frame) < self.EXT_FRAME_HEADER_SIZE:
+            return None
+        (payload_length,) = self._EXT_LENGTH_STRUCT.unpack_from(
+            frame, self.FRAME_HEADER_SIZE - 1
+        )
+        return self.EXT_FRAME_HEADER_SIZE + payload_length
+
+    def _unescape(self, escaped: bytearray) -> bytearray:
+        """Revert the SLIP escaping of a frame.
+
+        :param escaped: frame bytes as received, a trailing escape byte
+            waiting for its second byte is ignored
+
+        :return: the original bytes
+        """
+        if escaped.endswith(self.ESC):
+            del escaped[-1:]
+        if self.ESC not in escaped:
+            return escaped
+        return escaped.replace(b"\xdb\xdc", b"\xc0").replace(b"\xdb\xdd", b"\xdb")
+
+    def _add_frame(self, frame: bytearray) -> None:
+        """Check the CRC of a complete frame and store its packet.
+
+        :param frame: unescaped frame, CRC included
+        """
+        (expected_crc,) = struct.unpack_from(">H", frame)
+        packet = bytes(frame[2:])
+        if crc16(packet) != expected_crc:
+            log.debug("CRC check failed on received frame, frame dropped")
+            self.dropped_frames += 1
+            return
+        self._packets.append(packet)
+
+    def get_packet(self) -> Optional[bytes]:
+        """Return the oldest complete packet.
+
+        :return: the packet without its CRC, None if none is complete
+        """
+        if self._packets:
+            return self._packets.popleft()
+        return None
+
+    def reset(self) -> None:
+        """Discard the buffered bytes and packets."""
+        self._buffer.clear()
+        self._packets.clear()
 
 
 class CCUart(connector.CChannel):
     """UART implementation of the coordination channel."""
 
-    headerSize = 8
-    payloadLengthIndex = 7
-
-    WAITING_FOR_START = 0
-    RECEIVING_HEADER = 1
-    RECEIVING_PAYLOAD = 2
-    RECEIVED_DONE = 3
-
-    START = 0xC0
-    ESC = 0xDB
-    ESC_START = 0xDC
-    ESC_ESC = 0xDD
-
-    def __init__(self, serialPort, baudrate=9600, **kwargs):
+    def __init__(
+        self,
+        serialPort,
+        baudrate=9600,
+        frame_gap: Optional[float] = None,
+        **kwargs,
+    ):
+        """Initialize attributes.
+
+        :param serialPort: name of the serial port
+        :param baudrate: baud rate of the serial port
+        :param frame_gap: idle time in seconds kept on the line between
+            two sent frames, the duration of two characters at the baud
+            rate by default
+        """
         # Initialize the super class
         super().__init__(**kwargs)
         # Initialize the serial connection
@@ -59,14 +197,24 @@ class CCUart(connector.CChannel):
         self.serial.port = serialPort
         self.serial.baudrate = baudrate
         self.serial.paritiy = serial.PARITY_NONE
+        if frame_gap is None:
+            frame_gap = 2 * BITS_PER_CHARACTER / baudrate
+        self.frame_gap = frame_gap
+        # time at which the line is free for the next frame
+        self._next_frame_time = 0.0
+        # keeps the incomplete frames between two receptions
+        self._slip_decoder = SlipDecoder()
 
     def _cc_open(self):
+        self._slip_decoder.reset()
         self.serial.open()
 
     def _cc_close(self):
         self.serial.close()
 
-    def _cc_send(self, msg):
+    def _cc_send(self, msg, raw=False):
+        if raw:
+            raise NotImplementedError()
         rawPacket = msg.serialize()
         # Use CRC to verify content
         crc = self._calculate_crc32(rawPacket)
@@ -76,93 +224,80 @@ class CCUart(connector.CChannel):
     def _cc_receive(self, timeout=0.00001, raw=False):
         if raw:
             raise NotImplementedError()
-        self.serial.timeout = timeout
-
-        receivingState = self.WAITING_FOR_START
-        bytesToRead = 10
-        rawPacket = []
-
-        while bytesToRead > 0:
-            singleByteRead = self.serial.read(1)
-
-            if 0 == len(singleByteRead):
+        rawPacket = self._receive_packet(timeout)
+        if rawPacket is None:
+            return None
+        return message.Message.parse_packet(memoryview(rawPacket))
+
+    def _cc_receive_into(self, buffer: BufferType, timeout: float = 0.00001) -> int:
+        """Read a packet, without its SLIP escaping and CRC, into a buffer.
+
+        :param buffer: writable buffer receiving the packet
+        :param timeout: time in second to wait for each byte
+
+        :return: number of bytes written in the buffer, 0 if nothing was
+            received
+        """
+        rawPacket = self._receive_packet(timeout)
+        if rawPacket is None:
+            return 0
+        view = memoryview(buffer)
+        nbytes = min(len(rawPacket), len(view))
+        view[:nbytes] = rawPacket[:nbytes]
+        return nbytes
+
+    def _receive_packet(self, timeout):
+        """Read and check a SLIP encoded packet.
+
+        The bytes waiting in the serial input buffer are read at once
+        and fed to the SLIP decoder, which keeps an incomplete frame
+        until the next call.
+
+        :param timeout: time in second to wait for each block of bytes
+
+        :return: the packet without its CRC, None if nothing valid was
+            received
+        """
+        # setting the timeout reconfigures the port, only do it on change
+        if self.serial.timeout != timeout:
+            self.serial.timeout = timeout
+
+        rawPacket = self._slip_decoder.get_packet()
+        while rawPacket is None:
+            data = self.serial.read(max(self.serial.in_waiting, 1))
+            if not data:
                 return None
-
-            if self.WAITING_FOR_START == receivingState:
-                if self.START == singleByteRead[0]:
-                    receivingState = self.RECEIVING_HEADER
-            else:
-                if self.START == singleByteRead[0]:
-                    bytesToRead = 10
-                    rawPacket = []
-                    receivingState = self.RECEIVING_HEADER
-                    # TODO: dei9bue something went wrong
-                else:
-                    bytesToRead -= 1
-
-                    if self.ESC == singleByteRead[0]:
-                        singleByteRead = self.serial.read(1)
-
-                        if self.ESC_START == singleByteRead[0]:
-                            rawPacket.append(self.START)
-                        elif self.ESC_ESC == singleByteRead[0]:
-                            rawPacket.append(self.ESC)
-                    else:
-                        rawPacket.append(singleByteRead[0])
-
-                if 0 == bytesToRead:
-                    if self.RECEIVING_HEADER == receivingState:
-                        bytesToRead = singleByteRead[0]
-                        if bytesToRead:
-                            receivingState = self.RECEIVING_PAYLOAD
-                        else:
-                            receivingState = self.RECEIVED_DONE
-                    elif self.RECEIVING_PAYLOAD == receivingState:
-                        receivingState = self.RECEIVED_DONE
-
-            if receivingState == self.RECEIVED_DONE:
-
-                expectedCRC = ((rawPacket[0] & 0xFF) << 8) + (rawPacket[1] & 0xFF)
-                rawPacket = rawPacket[2 : len(rawPacket)]
-                calculatedCRC = self._calculate_crc32(rawPacket)
-
-                if calculatedCRC != expectedCRC:
-                    return None
-        # Reception was a success, we need now to convert the list into a array of bytes
-        binary_message = b"".join(struct.pack("B", value) for value in rawPacket)
-        return message.Message.parse_packet(binary_message)
+            self._slip_decoder.feed(data)
+            rawPacket = self._slip_decoder.get_packet()
+        return rawPacket
 
     def _send_using_slip(self, rawPacket):
-        self.serial.write(self.START.to_bytes(1, byteorder="big"))
-
-        for aByte in rawPacket:
-            if aByte == self.START:
-                self.serial.write(self.ESC.to_bytes(1, byteorder="big"))
-                self.serial.write(self.ESC_START.to_bytes(1, byteorder="big"))
-            elif aByte == self.ESC:
-                self.serial.write(self.ESC.to_bytes(1, byteorder="big"))
-                self.serial.write(self.ESC_ESC.to_bytes(1, byteorder="big"))
-            else:
-                self.serial.write(aByte.to_bytes(1, byteorder="big"))
-
-        time.sleep(0.01)
-        self.serial.flushOutput()
-        return
+        """Send a packet as a SLIP frame in a single write.
+
+        :param rawPacket: CRC and message to send
+        """
+        frame = slip_encode(rawPacket)
+        self._pace_frame(len(frame))
+        self.serial.write(frame)
+
+    def _pace_frame(self, frame_size: int) -> None:
+        """Wait until the previous frame was transmitted and followed by
+        the frame gap.
+
+        The transmission time of a frame is derived from the baud rate,
+        so frames are only delayed when sent faster than the line rate.
+
+        :param frame_size: number of bytes of the frame to send
+        """
+        now = time.perf_counter()
+        if now < self._next_frame_time:
+            time.sleep(self._next_frame_time - now)
+            now = self._next_frame_time
+        self._next_frame_time = (
+            now
+            + frame_size * BITS_PER_CHARACTER / self.serial.baudrate
+            + self.frame_gap
+        )
 
     def _calculate_crc32(self, buffer):
-        crc = 0
-
-        CRC_BIT_SHIFT_4 = 4
-        CRC_BIT_SHIFT_5 = 5
-        CRC_BIT_SHIFT_8 = 8
-        CRC_BIT_SHIFT_12 = 12
-        CRC_BYTE_MASK = 0xFF
-
-        for aByte in buffer:
-            crc = ((crc >> (CRC_BIT_SHIFT_8)) | (crc << (CRC_BIT_SHIFT_8))) & 0xFFFF
-            crc = (crc ^ (aByte & CRC_BYTE_MASK)) & 0xFFFF
-            crc = (crc ^ (crc & (CRC_BYTE_MASK)) >> (CRC_BIT_SHIFT_4)) & 0xFFFF
-            crc = (crc ^ ((crc << (CRC_BIT_SHIFT_12)) & 0xFFFF)) & 0xFFFF
-            crc = (crc ^ (crc & (CRC_BYTE_MASK)) << (CRC_BIT_SHIFT_5)) & 0xFFFF
-
-        return crc & 0xFFFF
+        return crc16(buffer)
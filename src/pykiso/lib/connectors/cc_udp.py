@@ -22,22 +22,191 @@ Communication Channel Via Udp
 """
 
 import logging
+import selectors
 import socket
-from typing import Union
+import time
+from typing import List, Optional, Tuple, Union
 
 from pykiso import Message, connector
+from pykiso.types import BufferType
+from pykiso.wakeup import Wakeup
 
 log = logging.getLogger(__name__)
 
+# largest payload of a datagram
+MAX_DATAGRAM_SIZE = 65535
+
+
+class DatagramSocket:
+    """Non-blocking UDP socket waiting for the datagrams with a selector.
+
+    The socket timeout is never changed: the timeout given to each
+    reception is only applied when no datagram is already queued. The
+    received datagrams are read into a buffer reused for every
+    reception. A datagram that cannot be sent right away is sent once
+    the socket is writable again. A registered wake-up interrupts the
+    wait for a datagram.
+    """
+
+    def __init__(
+        self,
+        udp_socket: socket.socket,
+        max_msg_size: int = MAX_DATAGRAM_SIZE,
+        receive_buffer_size: Optional[int] = None,
+        wakeup: Optional[Wakeup] = None,
+    ):
+        """Initialize attributes.
+
+        :param udp_socket: socket to drive, set to non-blocking mode
+        :param max_msg_size: size of the largest received datagram, the
+            bytes exceeding it are discarded
+        :param receive_buffer_size: SO_RCVBUF size of the socket, the
+            system default if None
+        :param wakeup: wake-up interrupting the wait for a datagram
+        """
+        self.socket = udp_socket
+        self.socket.setblocking(False)
+        if receive_buffer_size is not None:
+            self.socket.setsockopt(
+                socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer_size
+            )
+        self._buffer = bytearray(max_msg_size)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.socket, selectors.EVENT_READ)
+        self._write_selector = selectors.DefaultSelector()
+        self._write_selector.register(self.socket, selectors.EVENT_WRITE)
+        self._wakeup = None
+        self.set_wakeup(wakeup)
+
+    def set_wakeup(self, wakeup: Optional[Wakeup]) -> None:
+        """Replace the wake-up interrupting the wait for a datagram.
+
+        :param wakeup: wake-up to register, None to unregister it
+        """
+        if self._wakeup is not None:
+            self._selector.unregister(self._wakeup)
+        self._wakeup = wakeup
+        if wakeup is not None:
+            self._selector.register(wakeup, selectors.EVENT_READ)
+
+    def _wait(self, timeout: Optional[float]) -> bool:
+        """Wait for the socket to be readable.
+
+        :param timeout: time in second to wait, forever if None
+
+        :return: True if the socket is readable, False if the timeout
+            elapsed or the wake-up was set
+        """
+        if timeout is not None and timeout <= 0:
+            return False
+        events = self._selector.select(timeout)
+        return any(key.fileobj is self.socket for key, _ in events)
+
+    def receive_into(
+        self, buffer: BufferType, timeout: Optional[float]
+    ) -> Optional[Tuple[int, tuple]]:
+        """Read a datagram into a buffer.
+
+        :param buffer: writable buffer receiving the datagram
+        :param timeout: time in second to wait if no datagram is queued
+
+        :return: number of bytes received and sender address, None if
+            no datagram was received
+        """
+        try:
+            return self.socket.recvfrom_into(buffer)
+        except BlockingIOError:
+            if not self._wait(timeout):
+                return None
+        try:
+            return self.socket.recvfrom_into(buffer)
+        except BlockingIOError:
+            return None
+
+    def receive(self, timeout: Optional[float]) -> Optional[Tuple[bytes, tuple]]:
+        """Read a datagram.
+
+        :param timeout: time in second to wait if no datagram is queued
+
+        :return: datagram and sender address, None if no datagram was
+            received
+        """
+        received = self.receive_into(self._buffer, timeout)
+        if received is None:
+            return None
+        nbytes, address = received
+        return bytes(memoryview(self._buffer)[:nbytes]), address
+
+    def receive_all(
+        self, timeout: Optional[float], max_count: Optional[int] = None
+    ) -> List[Tuple[bytes, tuple]]:
+        """Read the queued datagrams, waiting for the first one only.
+
+        :param timeout: time in second to wait if no datagram is queued
+        :param max_count: maximum number of datagrams to read, all the
+            queued ones if None
+
+        :return: datagrams and sender addresses, in reception order
+        """
+        datagrams = []
+        datagram = self.receive(timeout)
+        while datagram is not None:
+            datagrams.append(datagram)
+            if max_count is not None and len(datagrams) >= max_count:
+                break
+            datagram = self.receive(0)
+        return datagrams
+
+    def send(self, data: bytes, address: tuple, timeout: Optional[float] = None) -> int:
+        """Send a datagram, waiting for room in the socket send buffer.
+
+        :param data: datagram to send
+        :param address: destination address
+        :param timeout: time in second to wait for the socket to be
+            writable, forever if None
+
+        :return: number of bytes sent
+
+        :raise socket.timeout: if the socket stayed full until the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.socket.sendto(data, address)
+            except BlockingIOError:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise socket.timeout(
+                            f"datagram not sent to {address} in {timeout} seconds"
+                        ) from None
+                self._write_selector.select(remaining)
+
+    def close(self) -> None:
+        """Stop waiting on the socket, it is closed by its owner."""
+        self._selector.close()
+        self._write_selector.close()
+
 
 class CCUdp(connector.CChannel):
     """UDP implementation of the coordination channel."""
 
-    def __init__(self, dest_ip: str, dest_port: int, **kwargs):
+    def __init__(
+        self,
+        dest_ip: str,
+        dest_port: int,
+        max_msg_size: int = MAX_DATAGRAM_SIZE,
+        receive_buffer_size: Optional[int] = None,
+        **kwargs,
+    ):
         """Initialize attributes.
 
         :param dest_ip: destination ip address
         :param dest_port: destination port
+        :param max_msg_size: size of the largest received datagram
+        :param receive_buffer_size: SO_RCVBUF size of the socket in
+            bytes, the system default if None
         """
         # Initialize the super class
         super().__init__(**kwargs)
@@ -46,17 +215,34 @@ class CCUdp(connector.CChannel):
         self.dest_port = dest_port
         self.udp_socket = None
         self.source_addr = None
-        # Define the max length
-        self.max_msg_size = 256
+        self.max_msg_size = max_msg_size
+        self.receive_buffer_size = receive_buffer_size
+        self._datagram_socket = None
+        self._wakeup = None
 
     def _cc_open(self) -> None:
         """Open the udp socket."""
         self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._datagram_socket = DatagramSocket(
+            self.udp_socket,
+            self.max_msg_size,
+            self.receive_buffer_size,
+            self._wakeup,
+        )
 
     def _cc_close(self) -> None:
         """Close the udp socket."""
+        if self._datagram_socket is not None:
+            self._datagram_socket.close()
+            self._datagram_socket = None
         self.udp_socket.close()
 
+    def set_wakeup(self, wakeup: Optional[Wakeup]) -> bool:
+        self._wakeup = wakeup
+        if self._datagram_socket is not None:
+            self._datagram_socket.set_wakeup(wakeup)
+        return True
+
     def _cc_send(self, msg: bytes or Message, raw: bool = False) -> None:
         """Send message using udp socket
 
@@ -66,34 +252,97 @@ class CCUdp(connector.CChannel):
         if not raw:
             msg = msg.serialize()
 
-        self.udp_socket.sendto(msg, (self.dest_ip, self.dest_port))
+        self._datagram_socket.send(msg, (self.dest_ip, self.dest_port))
 
     def _cc_receive(
         self, timeout: float = 0.0000001, raw: bool = False
     ) -> Union[Message, bytes, None]:
         """Read message from socket.
 
-        :param timeout: timeout applied on receive event
+        :param timeout: time in second to wait if no datagram is queued
         :param raw: if raw is True return raw bytes, otherwise Message type like
 
         :return: Message or raw bytes if successful, otherwise None
         """
-        self.udp_socket.settimeout(timeout)
-
         try:
-            msg_received, self.source_addr = self.udp_socket.recvfrom(self.max_msg_size)
+            datagram = self._datagram_socket.receive(timeout)
+            if datagram is None:
+                return None
+            msg_received, self.source_addr = datagram
 
             if not raw:
                 msg_received = Message.parse_packet(msg_received)
-        # catch the errors linked to the socket timeout without blocking
-        except BlockingIOError:
-            log.debug(f"encountered error while receiving message via {self}")
-            return None
-        except socket.timeout:
-            log.debug(f"encountered error while receiving message via {self}")
-            return None
         except BaseException:
             log.exception(f"encountered error while receiving message via {self}")
             return None
 
         return msg_received
+
+    def cc_receive_batch(
+        self,
+        timeout: float = 0.1,
+        raw: bool = False,
+        max_count: Optional[int] = None,
+    ) -> List[Union[Message, bytes]]:
+        """Read all the queued datagrams in one call.
+
+        :param timeout: time in second to wait if no datagram is queued
+        :param raw: if raw is True return raw bytes, otherwise Message
+            type like
+        :param max_count: maximum number of datagrams to read
+
+        :return: the received messages, the invalid ones are skipped
+
+        :raise ConnectionRefusedError: when lock acquire failed
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ConnectionRefusedError
+        try:
+            datagrams = self._datagram_socket.receive_all(timeout, max_count)
+        finally:
+            self._lock.release()
+        if datagrams:
+            self.source_addr = datagrams[-1][1]
+        return decode_datagrams(datagrams, raw, self)
+
+    def _cc_receive_into(self, buffer: BufferType, timeout: float = 0.0000001) -> int:
+        """Read a datagram from the socket directly into a buffer.
+
+        :param buffer: writable buffer receiving the datagram, the bytes
+            exceeding its size are discarded
+        :param timeout: time in second to wait if no datagram is queued
+
+        :return: number of bytes written in the buffer, 0 if nothing was
+            received
+        """
+        try:
+            received = self._datagram_socket.receive_into(buffer, timeout)
+        except BaseException:
+            log.exception(f"encountered error while receiving message via {self}")
+            return 0
+        if received is None:
+            return 0
+        nbytes, self.source_addr = received
+        return nbytes
+
+
+def decode_datagrams(
+    datagrams: List[Tuple[bytes, tuple]], raw: bool, channel: connector.CChannel
+) -> List[Union[Message, bytes]]:
+    """Parse a batch of received datagrams, shared by the UDP channels.
+
+    :param datagrams: datagrams and sender addresses
+    :param raw: return the raw datagrams
+    :param channel: receiving channel, used for logging
+
+    :return: the datagrams or the valid messages they contain
+    """
+    if raw:
+        return [data for data, _ in datagrams]
+    messages = []
+    for data, _ in datagrams:
+        try:
+            messages.append(Message.parse_packet(data))
+        except Exception:
+            log.exception(f"encountered error while receiving message via {channel}")
+    return messages
@@ -23,11 +23,19 @@ Communication Channel via UDP server
     sent to the wrong client
 
 """
+
 import logging
 import socket
-from typing import Union
+from typing import List, Optional, Union
 
 from pykiso import Message, connector
+from pykiso.lib.connectors.cc_udp import (
+    MAX_DATAGRAM_SIZE,
+    DatagramSocket,
+    decode_datagrams,
+)
+from pykiso.types import BufferType
+from pykiso.wakeup import Wakeup
 
 log = logging.getLogger(__name__)
 
@@ -35,29 +43,57 @@ log = logging.getLogger(__name__)
 class CCUdpServer(connector.CChannel):
     """Connector channel used to set up an UDP server."""
 
-    def __init__(self, dest_ip: str, dest_port: int, **kwargs):
+    def __init__(
+        self,
+        dest_ip: str,
+        dest_port: int,
+        max_msg_size: int = MAX_DATAGRAM_SIZE,
+        receive_buffer_size: Optional[int] = None,
+        **kwargs,
+    ):
         """Initialize attributes.
 
         :param dest_ip: destination port
         :param dest_port: destination port
+        :param max_msg_size: size of the largest received datagram
+        :param receive_buffer_size: SO_RCVBUF size of the socket in
+            bytes, the system default if None
         """
         super().__init__(**kwargs)
         self.dest_ip = dest_ip
         self.dest_port = dest_port
         self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.address = None
-        self.max_msg_size = 256
+        self.max_msg_size = max_msg_size
+        self.receive_buffer_size = receive_buffer_size
+        self._datagram_socket = None
+        self._wakeup = None
 
     def _cc_open(self) -> None:
         """Bind UDP socket with configured port and IP address."""
         log.info(f"UDP socket open at address: {self.address}")
         self.udp_socket.bind((self.dest_ip, self.dest_port))
+        self._datagram_socket = DatagramSocket(
+            self.udp_socket,
+            self.max_msg_size,
+            self.receive_buffer_size,
+            self._wakeup,
+        )
 
     def _cc_close(self) -> None:
         """ Close UDP socket."""
         log.info(f"UDP socket closed at address: {self.address}")
+        if self._datagram_socket is not None:
+            self._datagram_socket.close()
+            self._datagram_socket = None
         self.udp_socket.close()
 
+    def set_wakeup(self, wakeup: Optional[Wakeup]) -> bool:
+        self._wakeup = wakeup
+        if self._datagram_socket is not None:
+            self._datagram_socket.set_wakeup(wakeup)
+        return True
+
     def _cc_send(self, msg: bytes or Message, raw: bool = False) -> None:
         """Send back a UDP message to the previous sender.
 
@@ -66,39 +102,81 @@ class CCUdpServer(connector.CChannel):
         if not raw:
             msg = msg.serialize()
 
-        log.debug(f"UDP server send: {msg} at {self.address}")
-        self.udp_socket.sendto(msg, self.address)
+        log.debug("UDP server send: %s at %s", msg, self.address)
+        self._datagram_socket.send(msg, self.address)
 
     def _cc_receive(
         self, timeout=0.0000001, raw: bool = False
     ) -> Union[Message, bytes, None]:
         """Read message from UDP socket.
 
-        :param timeout: timeout applied on receive event
+        :param timeout: time in second to wait if no datagram is queued
         :param raw: should the message be returned raw or should it be interpreted as a
             pykiso.Message?
 
         :return: Message if successful, otherwise none
         """
-
-        self.udp_socket.settimeout(timeout)
-
         try:
-            msg_received, self.address = self.udp_socket.recvfrom(self.max_msg_size)
+            datagram = self._datagram_socket.receive(timeout)
+            if datagram is None:
+                return None
+            msg_received, self.address = datagram
 
             if not raw:
                 msg_received = Message.parse_packet(msg_received)
 
-            log.debug(f"UDP server receives: {msg_received} at {self.address}")
-        # catch the errors linked to the socket timeout without blocking
-        except BlockingIOError:
-            log.debug(f"encountered error while receiving message via {self}")
-            return None
-        except socket.timeout:
-            log.debug(f"encountered error while receiving message via {self}")
-            return None
+            log.debug("UDP server receives: %s at %s", msg_received, self.address)
         except BaseException:
             log.exception(f"encountered error while receiving message via {self}")
             return None
 
         return msg_received
+
+    def cc_receive_batch(
+        self,
+        timeout: float = 0.1,
+        raw: bool = False,
+        max_count: Optional[int] = None,
+    ) -> List[Union[Message, bytes]]:
+        """Read all the queued datagrams in one call.
+
+        The responses are sent to the sender of the last datagram.
+
+        :param timeout: time in second to wait if no datagram is queued
+        :param raw: should the messages be returned raw or should they
+            be interpreted as pykiso.Message?
+        :param max_count: maximum number of datagrams to read
+
+        :return: the received messages, the invalid ones are skipped
+
+        :raise ConnectionRefusedError: when lock acquire failed
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ConnectionRefusedError
+        try:
+            datagrams = self._datagram_socket.receive_all(timeout, max_count)
+        finally:
+            self._lock.release()
+        if datagrams:
+            self.address = datagrams[-1][1]
+        return decode_datagrams(datagrams, raw, self)
+
+    def _cc_receive_into(self, buffer: BufferType, timeout: float = 0.0000001) -> int:
+        """Read a datagram from the socket directly into a buffer.
+
+        :param buffer: writable buffer receiving the datagram, the bytes
+            exceeding its size are discarded
+        :param timeout: time in second to wait if no datagram is queued
+
+        :return: number of bytes written in the buffer, 0 if nothing was
+            received
+        """
+        try:
+            received = self._datagram_socket.receive_into(buffer, timeout)
+        except BaseException:
+            log.exception(f"encountered error while receiving message via {self}")
+            return 0
+        if received is None:
+            return 0
+        nbytes, self.address = received
+        return nbytes
@@ -23,39 +23,27 @@ Communication Channel Via Usb
 
 import serial
 
+from pykiso.checksum import Crc16
 from pykiso.lib.connectors import cc_uart
 
 
 class CCUsb(cc_uart.CCUart):
-    def __init__(self, serial_port):
-        super().__init__(serial_port, baudrate=9600)
+    def __init__(self, serial_port, **kwargs):
+        super().__init__(serial_port, baudrate=9600, **kwargs)
 
     def _cc_send(self, msg, raw=False):
         if raw:
             raise NotImplementedError()
         raw_packet = msg.serialize()
-        crc = self._calculate_crc32(raw_packet)
-
-        raw_packet.insert(0, ((crc >> 8) & 0xFF))
-        raw_packet.insert(1, (crc & 0xFF))
-        self._send_using_slip(raw_packet)
-
-    def _send_using_slip(self, raw_packet):
-        slip_raw_packet = []
-        slip_raw_packet.append(self.START)
-
-        for a_byte in raw_packet:
-            if a_byte == self.START:
-                slip_raw_packet.append(self.ESC)
-                slip_raw_packet.append(self.ESC_START)
-            elif a_byte == self.ESC:
-                slip_raw_packet.append(self.ESC)
-                slip_raw_packet.append(self.ESC_ESC)
-            else:
-                slip_raw_packet.append(a_byte)
-        self.serial.write(bytearray(slip_raw_packet))
-        self.serial.flushOutput()
-        return
+        crc = Crc16(raw_packet)
+        self._send_using_slip(crc.digest() + raw_packet)
+
+    def _pace_frame(self, frame_size: int) -> None:
+        """Send the frames right away, a USB link is not limited by its
+        nominal baud rate.
+
+        :param frame_size: number of bytes of the frame to send
+        """
 
     #################### todo TO DELETE IF NOT NEEDED ANYMORE #######################
 
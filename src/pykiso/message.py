@@ -21,18 +21,67 @@ pykiso Control Message Protocol
 
 from __future__ import annotations
 
+import collections.abc
 import enum
 import itertools
 import logging
 import struct
-from typing import Dict, Optional, Union
+import threading
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+from .checksum import CRC16_SIZE, crc16
+
+# number of distinct message tokens
+TOKEN_COUNT = 256
 
 msg_cnt = itertools.cycle(
-    range(256)
+    range(TOKEN_COUNT)
 )  # Will be used as token. It increases each time a Message is created
 
 log = logging.getLogger(__name__)
 
+# precompiled layouts of the serialized message parts:
+# msg_type | msg_token | sub_type | error_code | reserved | test_suite | test_case | payload_length
+_HEADER_STRUCT = struct.Struct("BBBBBBBB")
+# extended format: payload_length on 2 bytes
+_EXT_HEADER_STRUCT = struct.Struct("=BBBBBBBH")
+# tlv_type | tlv_size, tlv_size on 2 bytes in the extended format
+_TLV_HEADER_STRUCT = struct.Struct("BB")
+_TLV_LENGTH_STRUCT = struct.Struct("B")
+_EXT_TLV_HEADER_STRUCT = struct.Struct("=BH")
+_EXT_TLV_LENGTH_STRUCT = struct.Struct("=H")
+# integer tlv value, TODO check endianness later on
+_TLV_INT_STRUCT = struct.Struct("H")
+_CRC_STRUCT = struct.Struct("H")
+# protocol version stored in the upper bits of the msg_type byte
+_PROTOCOL_VERSION_BITS = 1 << 6
+# largest serialized message: header, 255 bytes of payload and crc
+MAX_MESSAGE_SIZE = _HEADER_STRUCT.size + 255 + _CRC_STRUCT.size
+MAX_EXTENDED_MESSAGE_SIZE = _EXT_HEADER_STRUCT.size + 0xFFFF + _CRC_STRUCT.size
+
+
+class MessageFlag(enum.IntFlag):
+    """Flags stored in the lower bits of the msg_type byte."""
+
+    # payload and tlv lengths on 2 bytes
+    EXTENDED = 0x1
+    # part of a message sent in several packets, always extended
+    SEGMENT = 0x2
+    # a segment followed by other ones
+    MORE_SEGMENTS = 0x4
+
+
+_EXTENDED_BIT = int(MessageFlag.EXTENDED)
+_SEGMENT_BIT = int(MessageFlag.SEGMENT)
+_MORE_SEGMENTS_BIT = int(MessageFlag.MORE_SEGMENTS)
+# flag combinations of the valid packets
+_VALID_FLAGS = (
+    0,
+    MessageFlag.EXTENDED,
+    MessageFlag.EXTENDED | MessageFlag.SEGMENT,
+    MessageFlag.EXTENDED | MessageFlag.SEGMENT | MessageFlag.MORE_SEGMENTS,
+)
+
 
 @enum.unique
 class MessageType(enum.IntEnum):
@@ -106,14 +155,124 @@ type_sub_type_dict = {
     MessageType.LOG: MessageLogType,
 }
 
+# enum lookup tables used to decode the received headers and tags
+_MESSAGE_TYPE_TABLE = {member.value: member for member in MessageType}
+_SUB_TYPE_TABLES = {
+    msg_type: {member.value: member for member in sub_types}
+    for msg_type, sub_types in type_sub_type_dict.items()
+}
+_TLV_TAG_TABLE = {member.value: member for member in TlvKnownTags}
+# first and third header bytes of the valid packets
+_VALID_TYPE_BYTES = {
+    (msg_type << 4 | _PROTOCOL_VERSION_BITS | flags, sub_type)
+    for msg_type, sub_types in type_sub_type_dict.items()
+    for sub_type in sub_types
+    for flags in _VALID_FLAGS
+}
+
+
+def _iter_tlvs(
+    payload: Union[bytes, memoryview], extended: bool = False
+) -> Iterator[Tuple[int, int, int]]:
+    """Locate the tlvs of a payload.
+
+    A tlv without complete length is ignored, a truncated value is kept.
+
+    :param payload: tlv part of a packet
+    :param extended: tlv lengths are on 2 bytes
+
+    :return: tag, start and end position of each value
+    """
+    payload_end = len(payload)
+    position = 0
+    if extended:
+        while position + 2 < payload_end:
+            start = position + 3
+            (length,) = _EXT_TLV_LENGTH_STRUCT.unpack_from(payload, position + 1)
+            tag = payload[position]
+            position = start + length
+            yield tag, start, min(position, payload_end)
+    else:
+        while position + 1 < payload_end:
+            start = position + 2
+            position = start + payload[position + 1]
+            yield payload[start - 2], start, min(position, payload_end)
+
+
+class TlvView(collections.abc.Mapping):
+    """Read-only tlv dictionary of a received message, decoded on access.
+
+    The view keeps a reference on the received payload: the tlvs are
+    only located when the dictionary is first accessed, and each value
+    is copied into a bytes object when it is looked up. Unknown tags
+    are kept as integers.
+    """
+
+    __slots__ = ("_payload", "_extended", "_offsets")
+
+    def __init__(self, payload: memoryview, extended: bool = False):
+        """Initialize attributes.
+
+        :param payload: tlv part of a received packet
+        :param extended: tlv lengths are on 2 bytes
+        """
+        self._payload = payload
+        self._extended = extended
+        self._offsets = None
+
+    def _index(self) -> Dict[Union[int, TlvKnownTags], Tuple[int, int]]:
+        """Locate the tlv values in the payload on first call.
+
+        :return: start and end position of each value, by tag
+        """
+        if self._offsets is None:
+            self._offsets = {
+                _TLV_TAG_TABLE.get(tag, tag): (start, end)
+                for tag, start, end in _iter_tlvs(self._payload, self._extended)
+            }
+        return self._offsets
+
+    def __getitem__(self, tag: Union[int, TlvKnownTags]) -> bytes:
+        start, end = self._index()[tag]
+        return bytes(self._payload[start:end])
+
+    def __iter__(self) -> Iterator[Union[int, TlvKnownTags]]:
+        return iter(self._index())
+
+    def __len__(self) -> int:
+        return len(self._index())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)})"
+
 
 class Message:
     """A message who fit testApp protocol.
 
     The created message is a tlv style message with the following format:
     TYPE: msg_type | message_token | sub_type | errorCode |
+
+    Unless given explicitly, the token of a created message is the next
+    value of the global :py:data:`msg_cnt` counter. Parsed messages and
+    acknowledgements keep the token of the packet or acknowledged
+    message without consuming one.
     """
 
+    __slots__ = (
+        "msg_type",
+        "msg_token",
+        "sub_type",
+        "error_code",
+        "test_suite",
+        "test_case",
+        "tlv_dict",
+    )
+
+    # protocol constants
+    header_size = _HEADER_STRUCT.size
+    crc_byte_size = _CRC_STRUCT.size
+    reserved = 0
+
     def __init__(
         self,
         msg_type: Union[int, MessageType] = 0,
@@ -122,6 +281,7 @@ class Message:
         test_suite: int = 0,
         test_case: int = 0,
         tlv_dict: Optional[Dict] = None,
+        msg_token: Optional[int] = None,
     ):
         """Create a generic message.
 
@@ -145,15 +305,14 @@ class Message:
 
         :param tlv_dict: Dictionary containing tlvs elements in the form {'type':'value', ...}
         :type tlv_dict: dict
+
+        :param msg_token: Token value, taken from the global counter if None
+        :type msg_token: integer
         """
         self.msg_type = msg_type
-        global msg_cnt
-        self.crc_byte_size = 2
-        self.header_size = 8
-        self.msg_token = next(msg_cnt)
+        self.msg_token = next(msg_cnt) if msg_token is None else msg_token
         self.sub_type = sub_type
         self.error_code = error_code
-        self.reserved = 0
         self.test_suite = test_suite
         self.test_case = test_case
         self.tlv_dict = tlv_dict
@@ -184,120 +343,301 @@ class Message:
                 | test_section (1b) | test_suite (1b) | test_case (1b) | payload_length (1b) |
                 | tlv_type (1b)     | tlv_size (1b)   | ...            | crc_checksum (2b)
 
+        If the payload or a tlv value is longer than 255 bytes, the
+        message is serialized in the extended format: the EXTENDED flag
+        is set in the msg_type byte, payload_length and tlv_size are
+        then on 2 bytes.
+
         :return: bytes representing the Message object
         """
-        raw_packet = b""
+        payload, extended = self._encode_payload()
+        if extended:
+            header_struct = _EXT_HEADER_STRUCT
+            first_byte = self.msg_type << 4 | _PROTOCOL_VERSION_BITS | _EXTENDED_BIT
+        else:
+            header_struct = _HEADER_STRUCT
+            first_byte = self.msg_type << 4 | _PROTOCOL_VERSION_BITS
+        raw_packet = (
+            header_struct.pack(
+                first_byte,
+                self.msg_token,
+                self.sub_type,
+                self.error_code,
+                self.reserved,
+                self.test_suite,
+                self.test_case,
+                len(payload),
+            )
+            + payload
+        )
+        # Add crc to raw_packet
+        return raw_packet + _CRC_STRUCT.pack(crc16(raw_packet))
 
-        raw_packet += struct.pack(
-            "BBBBBBB",
-            ((int(self.msg_type) << 4) | (1 << 6)),
+    def serialize_into(
+        self, buffer: Union[bytearray, memoryview], offset: int = 0
+    ) -> int:
+        """Serialize message into a caller-supplied buffer.
+
+        Connectors sending from a reused buffer avoid allocating a new
+        bytes object for each message.
+
+        :param buffer: writable buffer receiving the raw packet
+        :param offset: position of the raw packet in the buffer
+
+        :return: number of bytes written
+
+        :raise ValueError: if the raw packet doesn't fit in the buffer
+        """
+        payload, extended = self._encode_payload()
+        if extended:
+            header_struct = _EXT_HEADER_STRUCT
+            first_byte = self.msg_type << 4 | _PROTOCOL_VERSION_BITS | _EXTENDED_BIT
+        else:
+            header_struct = _HEADER_STRUCT
+            first_byte = self.msg_type << 4 | _PROTOCOL_VERSION_BITS
+        crc_start = offset + header_struct.size + len(payload)
+        view = memoryview(buffer)
+        if view.format != "B":
+            view = view.cast("B")
+        if len(view) < crc_start + _CRC_STRUCT.size:
+            raise ValueError(
+                f"{crc_start + _CRC_STRUCT.size - offset} bytes message doesn't "
+                f"fit in the buffer at offset {offset}"
+            )
+        header_struct.pack_into(
+            view,
+            offset,
+            first_byte,
             self.msg_token,
-            int(self.sub_type),
+            self.sub_type,
             self.error_code,
             self.reserved,
             self.test_suite,
             self.test_case,
+            len(payload),
         )
+        if payload:
+            view[crc_start - len(payload) : crc_start] = payload
+        _CRC_STRUCT.pack_into(view, crc_start, crc16(view[offset:crc_start]))
+        return crc_start + _CRC_STRUCT.size - offset
 
-        # Calculate and convert the dictionaries tlv elements into bytes
-        if self.tlv_dict is not None:
-            payload = b""
-            for key, value in self.tlv_dict.items():
-                # Check first if it the dict is conform
-                parsed_key = b""
-                if isinstance(key, TlvKnownTags):
-                    parsed_key = struct.pack("B", int(key))
-                else:
-                    log.warning("{} is not a supported format".format(key))
-                parsed_value = b""
-                if isinstance(value, str):  # If string given
-                    parsed_value = parsed_value.join(
-                        [struct.pack("B", ord(val)) for val in value]
-                    )
-                elif isinstance(value, int):
-                    parsed_value = struct.pack(
-                        "H", value
-                    )  # TODO check endianness later on
-                elif isinstance(value, bytes):
-                    parsed_value = value
-                else:
-                    log.warning("{} is not a supported format".format(value))
-                # Add the TLV element:
-                payload += parsed_key
-                payload += struct.pack("B", len(parsed_value))
-                payload += parsed_value
-            # Add the tlvs elements within the raw_packet
-            raw_packet += struct.pack("B", len(payload))
-            raw_packet += payload
-        else:
-            # Add the payload length to 0
-            raw_packet += struct.pack("B", 0)
+    def serialize_segments(self, max_packet_size: int) -> List[bytes]:
+        """Serialize message into packets of limited size.
 
-        # Add crc to raw_packet
-        raw_packet += struct.pack("H", self.get_crc(raw_packet, self.crc_byte_size))
+        A message fitting in a single packet is serialized as usual.
+        Otherwise, its payload is serialized in the extended format and
+        split over several segments, each one being a packet with the
+        message header, the SEGMENT flag and the MORE_SEGMENTS flag
+        except for the last one. The segments are reassembled by a
+        :py:class:`MessageReassembler`.
+
+        :param max_packet_size: maximum size in bytes of a packet
+
+        :return: the packets to send in order
 
-        return raw_packet
+        :raise ValueError: if a segment cannot carry any payload byte
+        """
+        raw_packet = self.serialize()
+        if len(raw_packet) <= max_packet_size:
+            return [raw_packet]
+        segment_size = max_packet_size - _EXT_HEADER_STRUCT.size - _CRC_STRUCT.size
+        if segment_size < 1:
+            raise ValueError(f"packets of {max_packet_size} bytes are too small")
+        payload = self._serialize_payload(extended=True)
+        first_byte = (
+            self.msg_type << 4 | _PROTOCOL_VERSION_BITS | _EXTENDED_BIT | _SEGMENT_BIT
+        )
+        packets = []
+        for start in range(0, len(payload), segment_size):
+            segment = payload[start : start + segment_size]
+            more_segments = start + segment_size < len(payload)
+            raw_packet = (
+                _EXT_HEADER_STRUCT.pack(
+                    first_byte | _MORE_SEGMENTS_BIT if more_segments else first_byte,
+                    self.msg_token,
+                    self.sub_type,
+                    self.error_code,
+                    self.reserved,
+                    self.test_suite,
+                    self.test_case,
+                    len(segment),
+                )
+                + segment
+            )
+            packets.append(raw_packet + _CRC_STRUCT.pack(crc16(raw_packet)))
+        return packets
+
+    def _encode_payload(self) -> Tuple[bytes, bool]:
+        """Convert the tlv elements into bytes, in the extended format
+        only if they don't fit in the standard one.
+
+        :return: the serialized tlvs and True if the extended format is
+            used
+        """
+        if not self.tlv_dict:
+            return b"", False
+        try:
+            payload = self._serialize_payload()
+            if len(payload) <= 0xFF:
+                return payload, False
+        except struct.error:
+            # a tlv value is longer than 255 bytes
+            pass
+        return self._serialize_payload(extended=True), True
+
+    def _serialize_payload(self, extended: bool = False) -> bytes:
+        """Convert the tlv elements into bytes.
+
+        :param extended: serialize the tlv lengths on 2 bytes
+
+        :return: the serialized tlvs, empty if there is none
+        """
+        if not self.tlv_dict:
+            return b""
+        if extended:
+            tlv_header_struct = _EXT_TLV_HEADER_STRUCT
+            tlv_length_struct = _EXT_TLV_LENGTH_STRUCT
+        else:
+            tlv_header_struct = _TLV_HEADER_STRUCT
+            tlv_length_struct = _TLV_LENGTH_STRUCT
+        parts = []
+        for key, value in self.tlv_dict.items():
+            # Check first if it the dict is conform
+            is_known_tag = isinstance(key, TlvKnownTags)
+            if not is_known_tag:
+                log.warning("{} is not a supported format".format(key))
+            if isinstance(value, str):  # If string given
+                raw_value = value.encode("latin-1")
+            elif isinstance(value, int):
+                raw_value = _TLV_INT_STRUCT.pack(value)
+            elif isinstance(value, bytes):
+                raw_value = value
+            else:
+                log.warning("{} is not a supported format".format(value))
+                raw_value = b""
+            # Add the TLV element, without tag if it is not supported
+            if is_known_tag:
+                parts.append(tlv_header_struct.pack(key, len(raw_value)))
+            else:
+                parts.append(tlv_length_struct.pack(len(raw_value)))
+            parts.append(raw_value)
+        return b"".join(parts)
 
     @classmethod
-    def parse_packet(cls, raw_packet: bytes) -> Message:
+    def parse_packet(
+        cls, raw_packet: Union[bytes, bytearray, memoryview], lazy: bool = False
+    ) -> Message:
         """Factory function to create a Message object from raw data.
 
+        No message token is consumed by the parsing. The packet can be
+        given as a memoryview on a reception buffer, no intermediate
+        copy of it is then made.
+
+        In lazy mode, the tlv_dict is a :py:class:`TlvView` referencing
+        the packet: its values are bytes, only extracted when accessed.
+        The packet must then not be modified as long as the message is
+        in use. Otherwise, the tlv values are lists of integers.
+
         :param raw_packet: array of a received message
+        :param lazy: decode the tlvs on access only
 
         :return: itself
         """
-        msg = cls()
-
-        if (not isinstance(raw_packet, bytes)) and (
-            len(raw_packet) < (msg.header_size + msg.crc_byte_size)
-        ):
+        view = memoryview(raw_packet)
+        if view.format != "B":
+            # index the buffer as unsigned bytes whatever its format
+            view = view.cast("B")
+        header_size = cls.header_size
+        crc_byte_size = cls.crc_byte_size
+        if len(view) < header_size + crc_byte_size:
             log.error("Packet is not understandable")
 
         # Check the CRC
-        crc = cls.get_crc(raw_packet[: -msg.crc_byte_size], msg.crc_byte_size)
-        if crc != struct.unpack("H", raw_packet[-msg.crc_byte_size :])[0]:
-            log.error(
-                f"CRC check failed {crc} != {struct.unpack('H', raw_packet[-msg.crc_byte_size:])[0]}"
-            )
+        crc = crc16(view[:-crc_byte_size])
+        (received_crc,) = _CRC_STRUCT.unpack_from(view, len(view) - crc_byte_size)
+        if crc != received_crc:
+            log.error(f"CRC check failed {crc} != {received_crc}")
 
-        unpack_header = struct.unpack("BBBBBBB", raw_packet[:7])
+        return cls._decode(view, lazy)
 
-        msg.msg_type = (MessageType)(int((unpack_header[0] & 0x30) >> 4))
-        msg.msg_token = int(unpack_header[1])
+    @classmethod
+    def _decode(cls, view: memoryview, lazy: bool = False) -> Message:
+        """Create a Message object from a packet whose size and CRC are
+        already checked.
+
+        :param view: unsigned bytes view on the packet
+        :param lazy: decode the tlvs on access only
+
+        :return: the decoded message
+        """
+        first_byte = view[0]
+        if first_byte & _SEGMENT_BIT:
+            raise ValueError("message segments have to be reassembled first")
+        extended = bool(first_byte & _EXTENDED_BIT)
+        header_struct = _EXT_HEADER_STRUCT if extended else _HEADER_STRUCT
+        (
+            msg_type,
+            msg_token,
+            sub_type,
+            error_code,
+            _,  # reserved
+            test_suite,
+            test_case,
+            payload_length,
+        ) = header_struct.unpack_from(view)
+
+        # Create the message without consuming a token
+        msg = cls.__new__(cls)
+        msg.msg_type = _MESSAGE_TYPE_TABLE[(msg_type & 0x30) >> 4]
+        msg.msg_token = msg_token
         # Because the sub-type depend on the type:
-        msg.sub_type = (type_sub_type_dict[msg.msg_type])(int(unpack_header[2]))
-        msg.error_code = int(unpack_header[3])
-        msg.reserved = int(unpack_header[4])
-        msg.test_suite = int(unpack_header[5])
-        msg.test_case = int(unpack_header[6])
-        payload_length = int(raw_packet[7])
+        try:
+            msg.sub_type = _SUB_TYPE_TABLES[msg.msg_type][sub_type]
+        except KeyError:
+            raise ValueError(
+                f"{sub_type} is not a valid {type_sub_type_dict[msg.msg_type].__name__}"
+            ) from None
+        msg.error_code = error_code
+        msg.test_suite = test_suite
+        msg.test_case = test_case
+        msg.tlv_dict = None
         # Create payload based on known tlvs
         if payload_length != 0:
-            msg.tlv_dict = {}
-            for tag, value in cls._parse_tlv(
-                raw_packet[msg.header_size : -msg.crc_byte_size]
-            ):
-                msg.tlv_dict[TlvKnownTags(tag)] = value
+            payload = view[header_struct.size : -cls.crc_byte_size]
+            if lazy:
+                msg.tlv_dict = TlvView(payload, extended)
+            else:
+                try:
+                    msg.tlv_dict = {
+                        _TLV_TAG_TABLE[tag]: value
+                        for tag, value in cls._parse_tlv(payload, extended)
+                    }
+                except KeyError as e:
+                    raise ValueError(f"{e} is not a valid TlvKnownTags") from None
 
         return msg
 
     @classmethod
-    def _parse_tlv(cls, tlv_packet: bytes) -> tuple:
+    def _parse_tlv(
+        cls, tlv_packet: Union[bytes, memoryview], extended: bool = False
+    ) -> tuple:
         """Generator used to parse TLV formatted bytes array.
 
         :param tlv_packet: raw TLV formatted bytes array
+        :param extended: tlv lengths are on 2 bytes
 
         :return: tuple containing the extract tag(int) and value(list)
         """
-        tlv_iterator = iter(tlv_packet)
-        while True:
-            try:
-                tag = int(next(itertools.islice(tlv_iterator, 1)))
-                length = int(next(itertools.islice(tlv_iterator, 1)))
-                value = [val for val in itertools.islice(tlv_iterator, length)]
-                yield (tag, value)
-            except StopIteration:
-                break
+        if extended:
+            for tag, start, end in _iter_tlvs(tlv_packet, extended):
+                yield (tag, list(tlv_packet[start:end]))
+            return
+        packet_end = len(tlv_packet)
+        position = 0
+        while position + 1 < packet_end:
+            start = position + 2
+            position = start + tlv_packet[position + 1]
+            yield (tlv_packet[start - 2], list(tlv_packet[start:position]))
 
     def generate_ack_message(self, ack_type: int) -> Union[Message, None]:
         """Generate acknowledgement to send out.
@@ -316,8 +656,8 @@ class Message:
             error_code=0,
             test_suite=self.test_suite,
             test_case=self.test_case,
+            msg_token=self.msg_token,
         )
-        ack_message.msg_token = self.msg_token
         # Return the ack message
         return ack_message
 
@@ -367,6 +707,8 @@ class Message:
 
         :return: CRC checksum
         """
+        if crc_byte_size == CRC16_SIZE:
+            return crc16(serialized_msg)
 
         crc = 0
         crc_mask = 255
@@ -379,3 +721,271 @@ class Message:
             crc ^= (crc << 12) & crc_size
             crc ^= ((crc & crc_mask) << 5) & crc_size
         return crc
+
+
+class TokenAllocator:
+    """Allocate message tokens without reusing the ones still in flight.
+
+    An allocator is owned by each auxiliary, so that the tokens of its
+    commands don't depend on the messages created elsewhere. A token is
+    in flight from its allocation until it is released, once the
+    matching acknowledgement is received or not awaited anymore.
+    """
+
+    def __init__(self, window: int = TOKEN_COUNT):
+        """Initialize attributes.
+
+        :param window: maximum number of tokens in flight at a time
+
+        :raise ValueError: if window is not between 1 and TOKEN_COUNT
+        """
+        if not 1 <= window <= TOKEN_COUNT:
+            raise ValueError(f"window must be between 1 and {TOKEN_COUNT}")
+        self.window = window
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        self._next_token = 0
+
+    def allocate(self) -> Optional[int]:
+        """Mark the next token not in flight as in flight.
+
+        :return: the allocated token, None if the window is full
+        """
+        with self._lock:
+            if len(self._in_flight) >= self.window:
+                return None
+            token = self._next_token
+            while token in self._in_flight:
+                token = (token + 1) % TOKEN_COUNT
+            self._in_flight.add(token)
+            self._next_token = (token + 1) % TOKEN_COUNT
+            return token
+
+    def release(self, token: int) -> None:
+        """Make a token available again.
+
+        :param token: token previously allocated
+        """
+        with self._lock:
+            self._in_flight.discard(token)
+
+    @property
+    def in_flight(self) -> FrozenSet[int]:
+        """Tokens currently allocated."""
+        with self._lock:
+            return frozenset(self._in_flight)
+
+
+class MessageReassembler:
+    """Rebuild the messages received in several segments, see
+    :py:meth:`Message.serialize_segments`.
+
+    The segments are buffered by message token, so that segmented
+    messages with different tokens can be received interleaved. The
+    other packets are parsed right away.
+    """
+
+    def __init__(self, lazy: bool = False):
+        """Initialize attributes.
+
+        :param lazy: decode the tlvs of the returned messages on access
+            only, see :py:meth:`Message.parse_packet`
+        """
+        self.lazy = lazy
+        # payload received so far, by message token
+        self._payloads: Dict[int, bytearray] = {}
+
+    def add(self, raw_packet: Union[bytes, bytearray, memoryview]) -> Optional[Message]:
+        """Add a received packet.
+
+        :param raw_packet: raw packet, segment or complete message
+
+        :return: the complete message, None while segments are missing
+
+        :raise ValueError: if the packet contains unknown types or tags
+        """
+        view = memoryview(raw_packet)
+        if view.format != "B":
+            view = view.cast("B")
+        if not len(view) or not view[0] & _SEGMENT_BIT:
+            return Message.parse_packet(view, self.lazy)
+        if len(view) < _EXT_HEADER_STRUCT.size + _CRC_STRUCT.size:
+            raise ValueError(f"segment of {len(view)} bytes is too short")
+        (received_crc,) = _CRC_STRUCT.unpack_from(view, len(view) - _CRC_STRUCT.size)
+        if crc16(view[: -_CRC_STRUCT.size]) != received_crc:
+            log.error(
+                "CRC check failed on segment of message %d, message dropped", view[1]
+            )
+            self._payloads.pop(view[1], None)
+            return None
+        return self._add_segment(view)
+
+    def _add_segment(self, view: memoryview) -> Optional[Message]:
+        """Buffer the payload of a segment with a valid CRC.
+
+        :param view: the raw segment
+
+        :return: the complete message if it is the last segment
+        """
+        token = view[1]
+        payload = self._payloads.setdefault(token, bytearray())
+        payload += view[_EXT_HEADER_STRUCT.size : -_CRC_STRUCT.size]
+        if len(payload) > 0xFFFF:
+            log.error("segmented message %d exceeds 65535 bytes, dropped", token)
+            del self._payloads[token]
+            return None
+        if view[0] & _MORE_SEGMENTS_BIT:
+            return None
+        del self._payloads[token]
+        raw_packet = (
+            _EXT_HEADER_STRUCT.pack(
+                view[0] & ~(_SEGMENT_BIT | _MORE_SEGMENTS_BIT), *view[1:7], len(payload)
+            )
+            + payload
+        )
+        raw_packet += _CRC_STRUCT.pack(crc16(raw_packet))
+        return Message._decode(memoryview(raw_packet), self.lazy)
+
+    def reset(self) -> None:
+        """Discard the segments of the incomplete messages."""
+        self._payloads.clear()
+
+
+class MessageStreamDecoder:
+    """Extract the messages of a byte stream received in arbitrary
+    chunks.
+
+    Received chunks are appended to an internal buffer with
+    :py:meth:`feed`, which splits it into complete packets: a chunk can
+    contain several packets and a packet can be split over several
+    chunks. A packet is only accepted if its message type and sub-type
+    are known, its size doesn't exceed max_packet_size and its CRC is
+    valid, otherwise the decoder drops the first byte and
+    resynchronizes on the next candidate header.
+
+    .. code:: python
+
+        decoder = MessageStreamDecoder()
+        decoder.feed(sock.recv(4096))
+        for msg in decoder:
+            handle(msg)
+    """
+
+    def __init__(self, lazy: bool = False, max_packet_size: int = MAX_MESSAGE_SIZE):
+        """Initialize attributes.
+
+        :param lazy: decode the tlvs of the returned messages on access
+            only, see :py:meth:`Message.parse_packet`
+        :param max_packet_size: size of the largest accepted packet, up
+            to MAX_EXTENDED_MESSAGE_SIZE to receive extended messages
+            in one piece. A larger size delays the resynchronization
+            on a corrupted header announcing a long payload.
+        """
+        self.lazy = lazy
+        self.max_packet_size = max_packet_size
+        # received bytes not belonging to a complete packet yet
+        self._buffer = bytearray()
+        self._packets = collections.deque()
+        self._reassembler = MessageReassembler(lazy)
+        # number of bytes dropped to resynchronize on a packet
+        self.dropped_bytes = 0
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        """Add received bytes and extract the complete packets.
+
+        :param data: chunk of the byte stream
+
+        :return: number of packets ready to be read
+        """
+        buffer = self._buffer
+        buffer += data
+        header_size = Message.header_size
+        crc_byte_size = Message.crc_byte_size
+        start = 0
+        end = len(buffer)
+        with memoryview(buffer) as view:
+            while end - start >= header_size + crc_byte_size:
+                # skip the bytes that cannot start a packet
+                if (buffer[start], buffer[start + 2]) not in _VALID_TYPE_BYTES:
+                    start += 1
+                    self.dropped_bytes += 1
+                    continue
+                if buffer[start] & _EXTENDED_BIT:
+                    (payload_length,) = _EXT_TLV_LENGTH_STRUCT.unpack_from(
+                        buffer, start + header_size - 1
+                    )
+                    crc_start = start + _EXT_HEADER_STRUCT.size + payload_length
+                else:
+                    crc_start = start + header_size + buffer[start + header_size - 1]
+                if crc_start + crc_byte_size - start > self.max_packet_size:
+                    start += 1
+                    self.dropped_bytes += 1
+                    continue
+                if crc_start + crc_byte_size > end:
+                    # wait for the rest of the packet
+                    break
+                (received_crc,) = _CRC_STRUCT.unpack_from(buffer, crc_start)
+                if crc16(view[start:crc_start]) != received_crc:
+                    log.debug("CRC check failed on received stream, resynchronizing")
+                    start += 1
+                    self.dropped_bytes += 1
+                    continue
+                self._packets.append(bytes(view[start : crc_start + crc_byte_size]))
+                start = crc_start + crc_byte_size
+        # forget the decoded bytes
+        del buffer[:start]
+        return len(self._packets)
+
+    def has_pending(self) -> bool:
+        """Tell if complete packets or the beginning of a packet are
+        buffered.
+
+        :return: True if fed bytes were not returned yet
+        """
+        return bool(self._packets or self._buffer)
+
+    def get_packet(self) -> Optional[bytes]:
+        """Return the oldest complete packet.
+
+        :return: the raw packet, None if none is complete
+        """
+        if self._packets:
+            return self._packets.popleft()
+        return None
+
+    def get_message(self) -> Optional[Message]:
+        """Return the oldest complete message.
+
+        The segments of a message are consumed until its last one is
+        received.
+
+        :return: the decoded message, None if none is complete
+
+        :raise ValueError: if the packet contains unknown types or tags
+        """
+        while self._packets:
+            view = memoryview(self._packets.popleft())
+            if view[0] & _SEGMENT_BIT:
+                msg = self._reassembler._add_segment(view)
+                if msg is not None:
+                    return msg
+            else:
+                return Message._decode(view, self.lazy)
+        return None
+
+    def reset(self) -> None:
+        """Discard the buffered bytes, packets and segments."""
+        self._buffer.clear()
+        self._packets.clear()
+        self._reassembler.reset()
+
+    def __len__(self) -> int:
+        """Return the number of packets ready to be read."""
+        return len(self._packets)
+
+    def __iter__(self) -> Iterator[Message]:
+        """Yield the complete messages until none is left."""
+        msg = self.get_message()
+        while msg is not None:
+            yield msg
+            msg = self.get_message()
@@ -38,6 +38,9 @@ class BasicTest(unittest.TestCase):
 
     msg_handler: Type[TestCaseMsgHandler] = TestCaseMsgHandler
     response_timeout: int = 10
+    # send the commands to all auxiliaries at once and wait for their
+    # reports together
+    concurrent_interaction: bool = False
 
     def __init__(
         self,
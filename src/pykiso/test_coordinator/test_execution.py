@@ -33,6 +33,7 @@ from typing import Dict
 
 import xmlrunner
 
+from ..test_setup.config_registry import ConfigRegistry
 from . import test_suite
 from .test_xml_result import XmlTestResult
 
@@ -82,6 +83,18 @@ def failure_and_error_handling(result):
     return exit_code
 
 
+def log_auxiliary_stats() -> None:
+    """Log the runtime statistics of all the created auxiliaries."""
+    try:
+        auxes = ConfigRegistry.get_all_auxes()
+    except AttributeError:
+        # no auxiliary was registered
+        return
+    for alias, aux in auxes.items():
+        if hasattr(aux, "stats"):
+            log.info(f"statistics of auxiliary {alias}:\n{aux.stats.summary()}")
+
+
 def execute(config: Dict, report_type: str = "text"):
 
     """create test environment base on config
@@ -122,4 +135,5 @@ def execute(config: Dict, report_type: str = "text"):
         log.exception(f'Issue detected in the test-suite: {config["test_suite_list"]}!')
         exit_code = ExitCode.ONE_OR_MORE_TESTS_RAISED_UNEXPECTED_EXCEPTION
     finally:
+        log_auxiliary_stats()
         return int(exit_code)
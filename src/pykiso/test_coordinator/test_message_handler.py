@@ -33,15 +33,18 @@ provide shorthands for the specialised communication from
 """
 
 import collections
+import concurrent.futures
 import logging
 from contextlib import contextmanager
-from typing import Callable, List
+from typing import Callable, List, Optional, Tuple
 
 from pykiso import message
+from pykiso.auxiliary import AuxiliaryInterface
 
 __all__ = [
     "report_analysis",
     "handle_basic_interaction",
+    "handle_concurrent_interaction",
     "TestCaseMsgHandler",
     "TestSuiteMsgHandler",
 ]
@@ -66,6 +69,7 @@ def handle_basic_interaction(
     cmd_sub_type: message.MessageCommandType,
     timeout_cmd: int,
     timeout_resp: int,
+    concurrent: bool = False,
 ) -> List[report_analysis]:
     """Handle default communication mechanism between test manager and device under
     test as follow:
@@ -90,10 +94,18 @@ def handle_basic_interaction(
     :param cmd_sub_type: message command sub-type (Test case run, setup,....)
     :param timeout_cmd: timeout in seconds for auxiliary run_command
     :param timeout_resp: timeout in seconds for auxiliary wait_and_get_report
+    :param concurrent: if True, see :py:func:`handle_concurrent_interaction`
 
     :return: tuple containing current auxiliary, reported message, logging method to use,
         and pre-defined log message.
     """
+    if concurrent:
+        with handle_concurrent_interaction(
+            test_entity, cmd_sub_type, timeout_cmd, timeout_resp
+        ) as responses:
+            yield responses
+        return
+
     responses = []
     # send command and check if DUT response is correctly received
     with Command.send(
@@ -108,32 +120,77 @@ def handle_basic_interaction(
                 )
 
             # wait for DUT log and report and evaluate the response
-            # while loop to wait for reports while getting the logs
             else:
-                report_received = False
-                while not report_received:
-                    received_msg = cmd_execution.current_auxiliary.wait_and_get_report(
-                        blocking=True, timeout_in_s=timeout_resp
-                    )
-                    if received_msg is None:
-                        info_to_print = (
-                            f"No report received from DUT for auxiliairy : {cmd_execution.current_auxiliary} command :{cmd_execution.sent_command}!",
-                        )
-                        test_entity.cleanup_and_skip(
-                            cmd_execution.current_auxiliary, info_to_print
-                        )
-                        break
-                    if received_msg.get_message_type() == message.MessageType.REPORT:
-                        report_received = True
-                    responses.append(
-                        Command.evaluate_message(
-                            cmd_execution.current_auxiliary, received_msg
-                        )
+                reports, info_to_print = Report.collect(cmd_execution, timeout_resp)
+                responses.extend(reports)
+                if info_to_print is not None:
+                    test_entity.cleanup_and_skip(
+                        cmd_execution.current_auxiliary, info_to_print
                     )
 
     yield responses
 
 
+@contextmanager
+def handle_concurrent_interaction(
+    test_entity: Callable,
+    cmd_sub_type: message.MessageCommandType,
+    timeout_cmd: int,
+    timeout_resp: int,
+) -> List[report_analysis]:
+    """Same communication mechanism as :py:func:`handle_basic_interaction`,
+    but the command is sent to all the auxiliaries at once and their
+    acknowledgements and reports are awaited together.
+
+    The interaction then lasts as long as the slowest device under test
+    instead of the sum of all of them.
+
+    :param test_entity: test instance in use (BaseTestSuite, BasicTest,...)
+    :param cmd_sub_type: message command sub-type (Test case run, setup,....)
+    :param timeout_cmd: timeout in seconds for all auxiliaries run_command
+    :param timeout_resp: timeout in seconds for auxiliary wait_and_get_report
+
+    :return: tuple containing current auxiliary, reported message, logging method to use,
+        and pre-defined log message, ordered by auxiliary.
+    """
+    responses = []
+    with Command.send(
+        cmd_sub_type=cmd_sub_type,
+        test_entity=test_entity,
+        timeout_cmd=timeout_cmd,
+        concurrent=True,
+    ) as cmd_responses:
+
+        for cmd_execution in cmd_responses:
+            if not cmd_execution.valid:
+                info_to_print = f"No response received from DUT for auxiliairy : {cmd_execution.current_auxiliary} command : {cmd_execution.sent_command}!"
+                test_entity.cleanup_and_skip(
+                    cmd_execution.current_auxiliary, info_to_print
+                )
+
+        # wait for all DUT logs and reports at the same time
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(len(cmd_responses), 1)
+        ) as executor:
+            collected_reports = list(
+                executor.map(
+                    lambda cmd_execution: Report.collect(cmd_execution, timeout_resp),
+                    cmd_responses,
+                )
+            )
+
+        for cmd_execution, (reports, info_to_print) in zip(
+            cmd_responses, collected_reports
+        ):
+            responses.extend(reports)
+            if info_to_print is not None:
+                test_entity.cleanup_and_skip(
+                    cmd_execution.current_auxiliary, info_to_print
+                )
+
+    yield responses
+
+
 class Command:
     """Encapsulate message command handling"""
 
@@ -144,6 +201,7 @@ class Command:
         test_entity: Callable,
         cmd_sub_type: message.MessageCommandType,
         timeout_cmd: int,
+        concurrent: bool = False,
     ):
         """Used to send a specific message command to device under test for
         all current auxiliaries in use.
@@ -151,6 +209,8 @@ class Command:
         :param test_entity: test instance in use (BaseTestSuite, BasicTest,...)
         :param cmd_sub_type: message command sub-type (Test case run, setup,....)
         :param timeout_cmd: timeout in second apply on auxiliary run_command
+        :param concurrent: if True, send the command to all auxiliaries
+            at once and wait for all their acknowledgements together
 
         :return: generator with namedtuple containing run_command verdict,
             command sent, and current auxiliary in use.
@@ -163,17 +223,26 @@ class Command:
             test_case=test_entity.test_case_id,
         )
         responses = []
+        pending = []
         for aux in test_entity.test_auxiliary_list:
-            if not aux.stop_event.is_set():
-                _response = aux.run_command(
-                    cmd, blocking=True, timeout_in_s=timeout_cmd
-                )
-                responses.append(cmd_response(_response, cmd, aux))
-            else:
+            if aux.stop_event.is_set():
                 log.fatal(f"Auxiliary {aux} is stopped")
                 test_entity.fail(
                     f"Auxiliary {aux} is stopped: test suite id: {test_entity.test_suite_id}, test case id: {test_entity.test_case_id}"
                 )
+            elif concurrent:
+                pending.append((aux, aux.run_command_async(cmd)))
+            else:
+                _response = aux.run_command(
+                    cmd, blocking=True, timeout_in_s=timeout_cmd
+                )
+                responses.append(cmd_response(_response, cmd, aux))
+        if pending:
+            results = AuxiliaryInterface.gather(
+                [future for _, future in pending], timeout_in_s=timeout_cmd
+            )
+            for (aux, _), _response in zip(pending, results):
+                responses.append(cmd_response(_response, cmd, aux))
         yield responses
 
     @classmethod
@@ -199,6 +268,31 @@ class Command:
 
 
 class Report:
+    @classmethod
+    def collect(
+        cls, cmd_execution: cmd_response, timeout: int
+    ) -> Tuple[List[report_analysis], Optional[str]]:
+        """Wait for the logs and the report of a device under test after a
+        command was acknowledged.
+
+        :param cmd_execution: response to the command sent to the auxiliary
+        :param timeout: timeout in second apply on auxiliary wait_and_get_report
+
+        :return: the evaluated messages received until the report, and
+            the reason to skip the test if the report was not received
+            within time, otherwise None
+        """
+        aux = cmd_execution.current_auxiliary
+        responses = []
+        while True:
+            received_msg = aux.wait_and_get_report(blocking=True, timeout_in_s=timeout)
+            if received_msg is None:
+                info_to_print = f"No report received from DUT for auxiliairy : {aux} command :{cmd_execution.sent_command}!"
+                return responses, info_to_print
+            responses.append(Command.evaluate_message(aux, received_msg))
+            if received_msg.get_message_type() == message.MessageType.REPORT:
+                return responses, None
+
     @classmethod
     @contextmanager
     def wait(cls, auxiliaries, timeout: int):
@@ -274,6 +368,7 @@ class TestCaseMsgHandler:
             message.MessageCommandType.TEST_CASE_SETUP,
             timeout_cmd,
             timeout_resp,
+            concurrent=test_entity.concurrent_interaction,
         ) as received_messages:
 
             yield received_messages
@@ -297,6 +392,7 @@ class TestCaseMsgHandler:
             message.MessageCommandType.TEST_CASE_TEARDOWN,
             timeout_cmd,
             timeout_resp,
+            concurrent=test_entity.concurrent_interaction,
         ) as received_messages:
 
             yield received_messages
@@ -320,6 +416,7 @@ class TestCaseMsgHandler:
             message.MessageCommandType.TEST_CASE_RUN,
             timeout_cmd,
             timeout_resp,
+            concurrent=test_entity.concurrent_interaction,
         ) as received_messages:
 
             yield received_messages
@@ -352,6 +449,7 @@ class TestSuiteMsgHandler:
             message.MessageCommandType.TEST_SUITE_SETUP,
             timeout_cmd,
             timeout_resp,
+            concurrent=test_entity.concurrent_interaction,
         ) as received_messages:
 
             yield received_messages
@@ -374,6 +472,7 @@ class TestSuiteMsgHandler:
             message.MessageCommandType.TEST_SUITE_TEARDOWN,
             timeout_cmd,
             timeout_resp,
+            concurrent=test_entity.concurrent_interaction,
         ) as received_messages:
 
             yield received_messages
@@ -43,6 +43,9 @@ log = logging.getLogger(__name__)
 class BaseTestSuite(unittest.TestCase):
 
     response_timeout = 10
+    # send the commands to all auxiliaries at once and wait for their
+    # reports together
+    concurrent_interaction = False
 
     def __init__(
         self,
@@ -125,6 +128,7 @@ class BaseTestSuite(unittest.TestCase):
             cmd_sub_type=test_command,
             timeout_cmd=5,
             timeout_resp=timeout_resp,
+            concurrent=self.concurrent_interaction,
         ) as report_infos:
 
             # Unlock all auxiliaries
@@ -21,6 +21,7 @@ Config Registry
 
 from typing import Any, Dict
 
+from ..worker_pool import configure_worker_pool, shutdown_worker_pool
 from .dynamic_loader import DynamicImportLinker
 
 
@@ -37,6 +38,8 @@ class ConfigRegistry:
         """
         ConfigRegistry._linker = DynamicImportLinker()
         ConfigRegistry._linker.install()
+        if config.get("worker_pool") is not None:
+            configure_worker_pool(**config["worker_pool"])
         for connector, con_details in config["connectors"].items():
             cfg = con_details.get("config") or dict()
             ConfigRegistry._linker.provide_connector(
@@ -55,6 +58,8 @@ class ConfigRegistry:
     def delete_aux_con(cls) -> None:
         """deregister the import hooks, close all running threads, delete all instances."""
         ConfigRegistry._linker.uninstall()
+        # wait for the auxiliaries executed by the worker pool to stop
+        shutdown_worker_pool()
 
     @classmethod
     def get_all_auxes(cls) -> dict:
@@ -80,6 +85,19 @@ class ConfigRegistry:
             if isinstance(inst, aux_type)
         }
 
+    @classmethod
+    def get_auxes_stats(cls) -> Dict[str, dict]:
+        """Return the runtime statistics of all created auxiliaries.
+
+        :return: dictionary with alias as keys and statistics snapshot as
+            values
+        """
+        return {
+            alias: inst.stats.snapshot()
+            for alias, inst in cls.get_all_auxes().items()
+            if hasattr(inst, "stats")
+        }
+
     @classmethod
     def get_auxes_alias(cls) -> list:
         """return all created auxiliaries alias.
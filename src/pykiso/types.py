@@ -18,3 +18,4 @@ from . import message
 
 PathType = typing.Union[str, pathlib.Path]
 MsgType = typing.Union[message.Message, bytes, str]
+BufferType = typing.Union[bytearray, memoryview]
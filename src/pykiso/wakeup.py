@@ -0,0 +1,74 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Selectable Wake-up
+******************
+
+:module: wakeup
+
+:synopsis: event interrupting a selector wait from another thread.
+
+An auxiliary waiting for a message on a socket based channel is woken
+up when a request is submitted: the channel registers the wake-up in
+the selector it waits on, next to its socket, and the auxiliary sets
+the wake-up after putting the request in its queue.
+
+.. code:: python
+
+    wakeup = Wakeup()
+    selector.register(wakeup, selectors.EVENT_READ)
+    # in another thread
+    wakeup.set()
+
+.. currentmodule:: wakeup
+
+"""
+
+import socket
+
+
+class Wakeup:
+    """Event backed by a socket pair, so that it can be registered in a
+    selector.
+    """
+
+    def __init__(self):
+        """Initialize attributes."""
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+
+    def fileno(self) -> int:
+        """Return the file descriptor readable while the event is set.
+
+        :return: the file descriptor to register in a selector
+        """
+        return self._reader.fileno()
+
+    def set(self) -> None:
+        """Wake up the selectors waiting on the event."""
+        try:
+            self._writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            # already set, or closed once its owner stopped
+            pass
+
+    def clear(self) -> None:
+        """Reset the event, before waiting on it again."""
+        try:
+            while self._reader.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def close(self) -> None:
+        """Release the socket pair."""
+        self._reader.close()
+        self._writer.close()
@@ -0,0 +1,329 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+"""
+Auxiliary Worker Pool
+*********************
+
+:module: worker_pool
+
+:synopsis: run the loop of several auxiliaries on a fixed number of
+    threads.
+
+By default every auxiliary runs its loop in its own thread. An auxiliary
+created with ``use_worker_pool`` is instead executed step by step by the
+shared worker pool: a step (process a request, then poll the auxiliary
+instance without waiting) is scheduled each time a request is submitted,
+and repeated as long as the auxiliary instance has to be polled. The
+interval between two polls of an idle instance grows up to its
+receive timeout, so that waiting auxiliaries don't occupy any thread.
+
+The number of worker threads is defined in the ``worker_pool`` section
+of the YAML configuration file.
+
+The asyncio adapters running the blocking auxiliaries and channels on
+an event loop share another fixed set of threads, see
+:py:class:`PinnedExecutorPool`.
+
+.. currentmodule:: worker_pool
+
+"""
+
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+# workers of the shared pool if not configured otherwise
+DEFAULT_MAX_WORKERS = 4
+# first interval in seconds between two polls of an idle auxiliary
+MIN_POLL_INTERVAL = 0.001
+
+# pool shared by all the auxiliaries using a worker pool
+_worker_pool: Optional["WorkerPool"] = None
+_worker_pool_lock = threading.Lock()
+# executors shared by the asyncio adapters
+_adapter_executors: Optional["PinnedExecutorPool"] = None
+
+
+class WorkerPool:
+    """Execute the steps of registered auxiliaries on a fixed number of
+    threads.
+
+    A single step of a given auxiliary is queued or running at a time, so
+    that an auxiliary is never executed by two workers concurrently.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        """Initialize attributes.
+
+        :param max_workers: number of worker threads
+
+        :raise ValueError: if max_workers is lower than 1
+        """
+        if max_workers < 1:
+            raise ValueError("the worker pool needs at least one worker")
+        self.max_workers = max_workers
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="AuxiliaryWorker"
+        )
+        self._lock = threading.Lock()
+        self._timer_condition = threading.Condition(self._lock)
+        self._idle_condition = threading.Condition(self._lock)
+        # registered auxiliaries and the ones with a step queued or running
+        self._auxiliaries = set()
+        self._scheduled = set()
+        # current interval between two polls of the idle auxiliaries
+        self._poll_intervals = {}
+        # auxiliaries to poll again: heap of (deadline, sequence, auxiliary)
+        self._timers = []
+        # sequence of the pending timer of each auxiliary, the others are stale
+        self._timer_sequences = {}
+        self._timer_sequence = itertools.count()
+        self._timer_thread = None
+        self._is_shutdown = False
+
+    def register(self, aux) -> None:
+        """Start executing the given auxiliary.
+
+        :param aux: auxiliary to execute, it must not be started as a
+            thread
+
+        :raise RuntimeError: if the pool is shut down
+        """
+        with self._lock:
+            if self._is_shutdown:
+                raise RuntimeError("cannot register an auxiliary after shutdown")
+            self._auxiliaries.add(aux)
+        aux.stats.start()
+        self.wake(aux)
+
+    def wake(self, aux) -> None:
+        """Schedule a step of the given auxiliary, unless one is already
+        queued or running.
+
+        :param aux: auxiliary to wake up
+        """
+        with self._lock:
+            self._poll_intervals.pop(aux, None)
+            self._schedule(aux)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop all the registered auxiliaries and the worker threads.
+
+        :param timeout: maximum time in seconds to wait for the
+            auxiliaries to stop, None to wait forever
+        """
+        with self._lock:
+            auxiliaries = list(self._auxiliaries)
+        for aux in auxiliaries:
+            aux.stop()
+        with self._lock:
+            if not self._idle_condition.wait_for(
+                lambda: not self._auxiliaries, timeout
+            ):
+                log.error(f"auxiliaries {self._auxiliaries} did not stop in time")
+            self._is_shutdown = True
+            self._timer_condition.notify()
+        self._executor.shutdown(wait=True)
+
+    def _schedule(self, aux) -> None:
+        """Submit a step of the given auxiliary, the lock must be held.
+
+        :param aux: auxiliary to execute
+        """
+        if self._is_shutdown or aux not in self._auxiliaries:
+            return
+        if aux not in self._scheduled:
+            self._scheduled.add(aux)
+            self._timer_sequences.pop(aux, None)
+            self._executor.submit(self._step, aux)
+
+    def _schedule_timer(self, aux, delay: float) -> None:
+        """Wake the given auxiliary up after a delay, the lock must be held.
+
+        :param aux: auxiliary to wake up
+        :param delay: time in seconds to wait
+        """
+        sequence = next(self._timer_sequence)
+        self._timer_sequences[aux] = sequence
+        heapq.heappush(self._timers, (time.monotonic() + delay, sequence, aux))
+        if self._timer_thread is None:
+            self._timer_thread = threading.Thread(
+                target=self._run_timers, name="AuxiliaryWorkerTimer", daemon=True
+            )
+            self._timer_thread.start()
+        self._timer_condition.notify()
+
+    def _run_timers(self) -> None:
+        """Wake the auxiliaries up once their delay is elapsed."""
+        with self._lock:
+            while not self._is_shutdown:
+                if not self._timers:
+                    self._timer_condition.wait()
+                    continue
+                remaining = self._timers[0][0] - time.monotonic()
+                if remaining > 0:
+                    self._timer_condition.wait(remaining)
+                    continue
+                _, sequence, aux = heapq.heappop(self._timers)
+                if self._timer_sequences.get(aux) == sequence:
+                    self._schedule(aux)
+
+    def _step(self, aux) -> None:
+        """Execute one step of the given auxiliary and schedule the next
+        one.
+
+        :param aux: auxiliary to execute
+        """
+        try:
+            # never block a worker while waiting for the channel
+            wait_time = aux._run_step(0, receive_timeout=0)
+        except Exception:
+            log.exception(f"encountered error while executing {aux}, stopping it")
+            aux.stop_event.set()
+            wait_time = None
+        if aux.stop_event.is_set():
+            aux._finalize()
+            with self._lock:
+                self._scheduled.discard(aux)
+                self._auxiliaries.discard(aux)
+                self._poll_intervals.pop(aux, None)
+                self._timer_sequences.pop(aux, None)
+                self._idle_condition.notify_all()
+            return
+        with self._lock:
+            self._scheduled.discard(aux)
+            # a message was received or requests are pending: go on
+            if wait_time == 0 or aux.queue_in.qsize():
+                self._poll_intervals.pop(aux, None)
+                self._schedule(aux)
+            # otherwise sleep until the next request or the next poll,
+            # backing off up to the receive timeout
+            elif wait_time is not None:
+                interval = self._poll_intervals.get(aux, MIN_POLL_INTERVAL / 2)
+                interval = min(interval * 2, max(wait_time, MIN_POLL_INTERVAL))
+                self._poll_intervals[aux] = interval
+                self._schedule_timer(aux, interval)
+
+
+class PinnedExecutorPool:
+    """Fixed number of single-thread executors shared by the asyncio
+    adapters.
+
+    A CChannel can only be used by the thread that opened it, so each
+    adapter is pinned to one executor for its whole life. The adapters
+    are spread over the executors, whose threads are only created once
+    used.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        """Initialize attributes.
+
+        :param max_workers: number of executors, one thread each
+
+        :raise ValueError: if max_workers is lower than 1
+        """
+        if max_workers < 1:
+            raise ValueError("the executor pool needs at least one worker")
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executors = [
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"AdapterWorker_{index}"
+            )
+            for index in range(max_workers)
+        ]
+        # number of adapters pinned to each executor
+        self._users = [0] * max_workers
+
+    def acquire(self) -> concurrent.futures.Executor:
+        """Pin a new user to the least used executor.
+
+        :return: the executor to use until it is released
+        """
+        with self._lock:
+            index = min(range(self.max_workers), key=self._users.__getitem__)
+            self._users[index] += 1
+            return self._executors[index]
+
+    def release(self, executor: concurrent.futures.Executor) -> None:
+        """Unpin a user from its executor.
+
+        :param executor: executor returned by acquire
+        """
+        with self._lock:
+            self._users[self._executors.index(executor)] -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the threads of all the executors.
+
+        :param wait: wait for the running calls to finish
+        """
+        for executor in self._executors:
+            executor.shutdown(wait=wait)
+
+
+def get_adapter_executors() -> PinnedExecutorPool:
+    """Return the executors shared by the asyncio adapters, created
+    with the default number of threads if not created yet.
+
+    :return: the shared executors
+    """
+    global _adapter_executors
+    with _worker_pool_lock:
+        if _adapter_executors is None:
+            _adapter_executors = PinnedExecutorPool()
+        return _adapter_executors
+
+
+def configure_worker_pool(max_workers: int = DEFAULT_MAX_WORKERS) -> WorkerPool:
+    """Create the shared worker pool.
+
+    A previously created pool is shut down first.
+
+    :param max_workers: number of worker threads
+
+    :return: the shared worker pool
+    """
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _worker_pool.shutdown()
+        _worker_pool = WorkerPool(max_workers)
+        return _worker_pool
+
+
+def get_worker_pool() -> WorkerPool:
+    """Return the shared worker pool, created with the default number
+    of workers if not configured yet.
+
+    :return: the shared worker pool
+    """
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = WorkerPool()
+        return _worker_pool
+
+
+def shutdown_worker_pool() -> None:
+    """Stop the auxiliaries executed by the shared worker pool and its
+    worker threads.
+    """
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _worker_pool.shutdown()
+            _worker_pool = None
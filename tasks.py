@@ -23,6 +23,7 @@ from invoke import task
 
 ROOT_DIR = Path(__file__).parent
 TEST_DIR = ROOT_DIR / "tests"
+BENCHMARK_DIR = ROOT_DIR / "benchmarks"
 COVERAGE_DIR = TEST_DIR / "coverage_report.html"
 SOURCE_DIR = ROOT_DIR / "src"
 DOCS_DIR = ROOT_DIR / "docs"
@@ -63,6 +64,20 @@ def test(c):
     c.run("pytest")
 
 
+@task
+def benchmark(c, save=None, compare=None, tolerance=0.3):
+    """
+    Run the message codec benchmarks, optionally saving or comparing
+    with a baseline
+    """
+    cmd = f"python {BENCHMARK_DIR / 'codec_benchmark.py'} --tolerance {tolerance}"
+    if save:
+        cmd += f" --save {save}"
+    if compare:
+        cmd += f" --compare {compare}"
+    c.run(cmd)
+
+
 @task
 def docs(c):
     """
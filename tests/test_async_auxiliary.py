@@ -0,0 +1,215 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from pykiso import worker_pool
+from pykiso.async_auxiliary import (
+    AsyncAuxiliaryAdapter,
+    AsyncAuxiliaryInterface,
+)
+from pykiso.auxiliary import AuxiliaryInterface
+from pykiso.lib.auxiliaries.communication_auxiliary import (
+    CommunicationAuxiliary,
+)
+from pykiso.message import Message, MessageAckType, MessageType
+
+
+class MockAsyncAuxiliary(AsyncAuxiliaryInterface):
+    def __init__(self, messages=None, **kwargs):
+        super().__init__(name="async_aux", **kwargs)
+        self.messages = list(messages or [])
+
+    async def _create_auxiliary_instance(self):
+        return True
+
+    async def _delete_auxiliary_instance(self):
+        return True
+
+    async def _run_command(self, cmd_message, cmd_data=None):
+        if cmd_message == "slow":
+            await asyncio.sleep(1)
+        return cmd_message
+
+    async def _abort_command(self):
+        return True
+
+    async def _receive_message(self, timeout_in_s):
+        if self.messages:
+            return self.messages.pop(0)
+        return None
+
+
+def test_async_aux_lifecycle():
+    async def scenario():
+        aux = MockAsyncAuxiliary(messages=["log"])
+        assert await aux.create_instance() is True
+        assert await aux.run_command("ping", timeout_in_s=1) == "ping"
+        assert await aux.wait_and_get_report(blocking=True, timeout_in_s=1) == "log"
+        assert await aux.wait_and_get_report() is None
+        assert await aux.abort_command() is True
+        await aux.stop()
+        assert aux.is_instance is False
+        assert aux._receive_task is None
+
+    asyncio.run(scenario())
+
+
+def test_async_aux_command_timeout():
+    async def scenario():
+        aux = MockAsyncAuxiliary()
+        await aux.create_instance()
+        assert await aux.run_command("slow", timeout_in_s=0.01) is False
+        await aux.stop()
+
+    asyncio.run(scenario())
+
+
+def test_async_aux_command_without_instance():
+    async def scenario():
+        aux = MockAsyncAuxiliary()
+        assert await aux.run_command("ping") is False
+
+    asyncio.run(scenario())
+
+
+def test_async_auxiliaries_share_one_thread():
+    async def scenario():
+        auxes = [MockAsyncAuxiliary(messages=[i]) for i in range(50)]
+        await asyncio.gather(*(aux.create_instance() for aux in auxes))
+        reports = await asyncio.gather(
+            *(aux.wait_and_get_report(blocking=True, timeout_in_s=1) for aux in auxes)
+        )
+        await asyncio.gather(*(aux.stop() for aux in auxes))
+        return reports
+
+    assert asyncio.run(scenario()) == list(range(50))
+
+
+def test_adapter_communication_auxiliary(cchannel_inst):
+    cchannel_inst._cc_receive.return_value = b"\x01\x02"
+
+    async def scenario():
+        aux = AsyncAuxiliaryAdapter(CommunicationAuxiliary, com=cchannel_inst)
+        assert not aux.auxiliary.is_alive()
+        assert aux.channel is cchannel_inst
+        assert aux.is_proxy_capable is True
+        assert await aux.create_instance() is True
+        assert await aux.run_command("send", b"\x03") is True
+        received = await aux.wait_and_get_report(blocking=True, timeout_in_s=1)
+        await aux.stop()
+        return received
+
+    assert asyncio.run(scenario()) == b"\x01\x02"
+    cchannel_inst._cc_open.assert_called_once()
+    cchannel_inst._cc_send.assert_called_with(msg=b"\x03", raw=True)
+    cchannel_inst._cc_close.assert_called_once()
+
+
+def test_adapters_share_executors(cchannel_inst):
+    auxes = [
+        AsyncAuxiliaryAdapter(CommunicationAuxiliary, com=cchannel_inst)
+        for _ in range(10)
+    ]
+
+    async def scenario():
+        await asyncio.gather(*(aux.stop() for aux in auxes))
+
+    assert len({aux.executor for aux in auxes}) == worker_pool.DEFAULT_MAX_WORKERS
+    asyncio.run(scenario())
+
+
+def test_adapter_polls_without_waiting(cchannel_inst):
+    cchannel_inst._cc_receive.return_value = None
+
+    async def scenario():
+        aux = AsyncAuxiliaryAdapter(
+            CommunicationAuxiliary, com=cchannel_inst, receive_timeout=0.004
+        )
+        await aux.create_instance()
+        # poll the instance without the reception task
+        await aux._cancel_receive_task()
+        wait_times = [await aux._poll_instance() for _ in range(4)]
+        await aux.stop()
+        return wait_times
+
+    assert asyncio.run(scenario()) == [0.001, 0.002, 0.004, 0.004]
+    for call in cchannel_inst._cc_receive.call_args_list:
+        assert call.kwargs["timeout"] == 0
+
+
+class PipelinedAuxiliary(AuxiliaryInterface):
+    def __init__(self, **kwargs):
+        super().__init__(name="pipelined_aux", is_pipelined=True, **kwargs)
+        self.sent_commands = []
+        self.ack_ready = threading.Event()
+
+    def _create_auxiliary_instance(self):
+        return True
+
+    def _delete_auxiliary_instance(self):
+        return True
+
+    def _run_command(self, cmd_message, cmd_data=None):
+        return False
+
+    def _send_command(self, cmd_message, cmd_data=None):
+        self.sent_commands.append(cmd_message)
+        return True
+
+    def _abort_command(self):
+        return True
+
+    def _receive_message(self, timeout_in_s):
+        if self.sent_commands and self.ack_ready.is_set():
+            return self.sent_commands.pop(0).generate_ack_message(MessageAckType.ACK)
+        return None
+
+
+def test_adapter_pipelined_command_releases_executor():
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    aux = AsyncAuxiliaryAdapter(PipelinedAuxiliary, executor=executor)
+    cmd = Message(MessageType.COMMAND)
+
+    async def scenario():
+        await aux.create_instance()
+        command = asyncio.ensure_future(aux.run_command(cmd, timeout_in_s=1))
+        await asyncio.sleep(0.01)
+        # the executor thread is free while the acknowledgement is awaited
+        await asyncio.get_event_loop().run_in_executor(
+            executor, aux.auxiliary.ack_ready.set
+        )
+        result = await command
+        aux.auxiliary.ack_ready.clear()
+        timed_out = await aux.run_command(cmd, timeout_in_s=0.01)
+        await aux.stop()
+        return result, timed_out
+
+    assert asyncio.run(scenario()) == (True, False)
+    assert not aux.auxiliary._pending_commands
+    assert not aux.auxiliary.token_allocator.in_flight
+    executor.shutdown()
+
+
+def test_async_aux_drain():
+    async def scenario():
+        aux = MockAsyncAuxiliary(messages=list(range(5)))
+        await aux.create_instance()
+        first = await aux.drain(1, timeout_in_s=1)
+        await asyncio.sleep(0.05)
+        rest = await aux.drain(2) + await aux.drain()
+        empty = await aux.drain(timeout_in_s=0.01)
+        await aux.stop()
+        return first, rest, empty
+
+    assert asyncio.run(scenario()) == ([0], [1, 2, 3, 4], [])
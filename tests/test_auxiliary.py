@@ -0,0 +1,511 @@
+##########################################################################
+# Copyright (c) 2010-2020 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+import time
+
+import pytest
+
+from pykiso.auxiliary import AuxiliaryInterface
+from pykiso.lib.connectors.cc_udp_server import CCUdpServer
+from pykiso.message import Message, MessageAckType, MessageType, TokenAllocator
+
+
+class MockAuxiliary(AuxiliaryInterface):
+    def __init__(self, messages=None, **kwargs):
+        self.messages = list(messages or [])
+        self.receive_calls = 0
+        super().__init__(name="mock_aux", **kwargs)
+
+    def _create_auxiliary_instance(self):
+        return True
+
+    def _delete_auxiliary_instance(self):
+        return True
+
+    def _run_command(self, cmd_message, cmd_data=None):
+        return cmd_message
+
+    def _abort_command(self):
+        return True
+
+    def _receive_message(self, timeout_in_s):
+        self.receive_calls += 1
+        if self.messages:
+            return self.messages.pop(0)
+        return None
+
+
+class BlockingMockAuxiliary(MockAuxiliary):
+    def _receive_message(self, timeout_in_s):
+        # like a channel waiting for the whole timeout
+        self.receive_calls += 1
+        time.sleep(timeout_in_s)
+        return None
+
+
+class ChannelMockAuxiliary(MockAuxiliary):
+    def __init__(self, channel, **kwargs):
+        self.channel = channel
+        super().__init__(**kwargs)
+
+    def _create_auxiliary_instance(self):
+        self.channel.open()
+        return True
+
+    def _delete_auxiliary_instance(self):
+        self.channel.close()
+        return True
+
+    def _receive_message(self, timeout_in_s):
+        self.receive_calls += 1
+        return self.channel.cc_receive(timeout_in_s, raw=True)
+
+
+@pytest.fixture
+def aux_inst():
+    aux = MockAuxiliary(receive_timeout=0.05)
+    yield aux
+    aux.stop()
+    aux.join()
+
+
+def test_run_command(aux_inst):
+    assert aux_inst.create_instance() is True
+    assert aux_inst.run_command("ping", blocking=True, timeout_in_s=1) == "ping"
+    assert aux_inst.delete_instance() is True
+
+
+def test_run_blocks_while_no_instance(aux_inst):
+    time.sleep(0.1)
+
+    assert aux_inst.receive_calls == 0
+    assert aux_inst.is_alive()
+
+
+def test_run_does_not_spin_while_idle(aux_inst):
+    aux_inst.create_instance()
+    time.sleep(0.2)
+
+    # the channel returns immediately, the loop should still wait for
+    # the receive timeout between two receptions
+    assert 0 < aux_inst.receive_calls <= 6
+
+
+def test_run_forwards_received_messages():
+    aux = MockAuxiliary(messages=["log_1", "log_2"], receive_timeout=0.05)
+    aux.create_instance()
+
+    assert aux.wait_and_get_report(blocking=True, timeout_in_s=1) == "log_1"
+    assert aux.wait_and_get_report(blocking=True, timeout_in_s=1) == "log_2"
+    aux.stop()
+    aux.join()
+
+
+def test_pausable_aux_does_not_receive():
+    aux = MockAuxiliary(is_pausable=True, receive_timeout=0.01)
+    aux.create_instance()
+    time.sleep(0.05)
+
+    assert aux.receive_calls == 0
+    aux.stop()
+    aux.join()
+
+
+def test_request_interrupts_channel_wait():
+    aux = BlockingMockAuxiliary(receive_timeout=1)
+    aux.create_instance()
+    # let the thread wait on the channel
+    time.sleep(0.05)
+
+    t_start = time.perf_counter()
+    assert aux.run_command("ping", blocking=True, timeout_in_s=1) == "ping"
+
+    # the request is processed without waiting for the receive timeout
+    assert time.perf_counter() - t_start < 0.5
+    aux.stop()
+    aux.join()
+
+
+def test_request_check_interval():
+    aux = BlockingMockAuxiliary(receive_timeout=1, request_check_interval=0.1)
+    aux.create_instance()
+    time.sleep(0.35)
+
+    # the channel doesn't support the wake-up, it is waited on in slices
+    assert 2 <= aux.receive_calls <= 5
+    aux.stop()
+    aux.join()
+
+
+def test_request_wakes_up_channel_wait():
+    channel = CCUdpServer(dest_ip="127.0.0.1", dest_port=0)
+    aux = ChannelMockAuxiliary(channel, receive_timeout=1)
+    aux.create_instance()
+    time.sleep(0.3)
+
+    # the idle auxiliary waits on the channel for the whole timeout
+    assert aux.receive_calls <= 2
+
+    t_start = time.perf_counter()
+    assert aux.run_command("ping", blocking=True, timeout_in_s=1) == "ping"
+
+    assert time.perf_counter() - t_start < 0.1
+    aux.stop()
+    aux.join()
+    assert channel._wakeup is None
+
+
+def test_stop_wakes_up_thread(aux_inst):
+    t_start = time.perf_counter()
+    aux_inst.stop()
+    aux_inst.join(1)
+
+    assert not aux_inst.is_alive()
+    assert time.perf_counter() - t_start < 0.5
+
+
+def test_unknown_request(aux_inst, caplog):
+    aux_inst.queue_in.put("unknown")
+    time.sleep(0.05)
+
+    assert "Unknown request 'unknown'" in caplog.text
+
+
+class MockPipelinedAuxiliary(MockAuxiliary):
+    def __init__(self, **kwargs):
+        self.sent_commands = []
+        super().__init__(is_pipelined=True, **kwargs)
+
+    def _send_command(self, cmd_message, cmd_data=None):
+        self.sent_commands.append(cmd_message)
+        return True
+
+
+def test_submit_command(aux_inst):
+    aux_inst.create_instance()
+    futures = [aux_inst.submit_command(f"cmd_{i}") for i in range(5)]
+
+    assert [future.result(1) for future in futures] == [f"cmd_{i}" for i in range(5)]
+    assert aux_inst.wait_and_get_report() is None
+
+
+def test_run_command_timeout_drops_late_reply(mocker, aux_inst):
+    aux_inst.create_instance()
+    mocker.patch.object(
+        MockAuxiliary, "_run_command", side_effect=lambda *_: time.sleep(0.1) or "late"
+    )
+
+    assert aux_inst.run_command("slow", blocking=True, timeout_in_s=0.01) is False
+    time.sleep(0.2)
+
+    # the late reply must not be mistaken for an unsolicited message
+    assert aux_inst.wait_and_get_report() is None
+
+
+def test_unknown_request_with_future(aux_inst):
+    assert aux_inst.abort_command(timeout_in_s=1) is False
+
+
+def test_pipelined_aux_needs_send_command():
+    with pytest.raises(ValueError):
+        MockAuxiliary(is_pipelined=True, auto_start=False)
+
+
+def test_pipelined_commands():
+    aux = MockPipelinedAuxiliary(receive_timeout=0.01)
+    aux.create_instance()
+    commands = [Message(test_suite=i) for i in range(3)]
+    futures = [aux.submit_command(cmd) for cmd in commands]
+    time.sleep(0.05)
+
+    # all the commands are in flight at the same time
+    sent = aux.sent_commands
+    assert [cmd.test_suite for cmd in sent] == [0, 1, 2]
+    assert all(not future.done() for future in futures)
+
+    # acknowledge them out of order, with an unsolicited message in between
+    log_msg = Message(msg_type=MessageType.LOG)
+    aux.messages = [
+        sent[2].generate_ack_message(MessageAckType.ACK),
+        log_msg,
+        sent[0].generate_ack_message(MessageAckType.NACK),
+        sent[1].generate_ack_message(MessageAckType.ACK),
+    ]
+
+    assert [future.result(1) for future in futures] == [False, True, True]
+    assert aux.wait_and_get_report(blocking=True, timeout_in_s=1) == log_msg
+    assert aux._pending_commands == {}
+    aux.stop()
+    aux.join()
+
+
+def test_pipelined_command_token_in_flight():
+    aux = MockPipelinedAuxiliary(receive_timeout=0.01)
+    aux.create_instance()
+    cmd = Message()
+    first = aux.submit_command(cmd)
+
+    assert aux.submit_command(cmd).result(1) is False
+    assert not first.done()
+    assert aux.run_command(Message(), timeout_in_s=0.01) is False
+    assert len(aux._pending_commands) == 1
+    aux.stop()
+    aux.join()
+
+
+def test_pipelined_commands_discarded_on_stop():
+    aux = MockPipelinedAuxiliary(receive_timeout=0.01)
+    aux.create_instance()
+    first = aux.submit_command(Message())
+    time.sleep(0.05)
+
+    assert aux.delete_instance() is True
+    assert first.result(1) is False
+    aux.create_instance()
+    second = aux.submit_command(Message())
+    time.sleep(0.05)
+    aux.stop()
+    aux.join()
+
+    assert second.result(0) is False
+    assert not aux._pending_commands
+    assert not aux.token_allocator.in_flight
+
+
+def test_pipelined_command_tokens():
+    aux = MockPipelinedAuxiliary(receive_timeout=0.01)
+    aux.token_allocator = TokenAllocator(window=2)
+    aux.create_instance()
+    commands = [Message(), Message(), Message()]
+    commands[1].msg_token = commands[0].msg_token
+    tokens = [cmd.msg_token for cmd in commands]
+    futures = [aux.submit_command(cmd) for cmd in commands]
+
+    # the third command doesn't fit in the window
+    assert futures[2].result(1) is False
+    assert [cmd.msg_token for cmd in aux.sent_commands] == [0, 1]
+    assert aux.token_allocator.in_flight == {0, 1}
+    # the given commands are left untouched
+    assert [cmd.msg_token for cmd in commands] == tokens
+
+    aux.messages = [aux.sent_commands[1].generate_ack_message(MessageAckType.ACK)]
+    assert futures[1].result(1) is True
+    assert aux.token_allocator.in_flight == {0}
+    aux.submit_command(commands[2])
+    time.sleep(0.05)
+    assert [cmd.msg_token for cmd in aux.sent_commands] == [0, 1, 2]
+    aux.stop()
+    aux.join()
+
+
+def test_pipelined_command_fan_out():
+    auxes = [MockPipelinedAuxiliary(receive_timeout=0.01) for _ in range(2)]
+    auxes[1].token_allocator.allocate()
+    for aux in auxes:
+        aux.create_instance()
+    cmd = Message()
+    token = cmd.msg_token
+
+    futures = [aux.run_command_async(cmd) for aux in auxes]
+    time.sleep(0.05)
+
+    assert cmd.msg_token == token
+    assert [aux.sent_commands[0].msg_token for aux in auxes] == [0, 1]
+    for aux in auxes:
+        aux.messages = [aux.sent_commands[0].generate_ack_message(MessageAckType.ACK)]
+    assert AuxiliaryInterface.gather(futures, timeout_in_s=1) == [True, True]
+    for aux in auxes:
+        aux.stop()
+        aux.join()
+
+
+def test_run_command_async_and_gather():
+    auxes = [MockAuxiliary(receive_timeout=0.01) for _ in range(3)]
+    for aux in auxes:
+        aux.create_instance()
+
+    futures = [aux.run_command_async(f"cmd_{i}") for i, aux in enumerate(auxes)]
+
+    assert AuxiliaryInterface.gather(futures, timeout_in_s=1) == [
+        "cmd_0",
+        "cmd_1",
+        "cmd_2",
+    ]
+    for aux in auxes:
+        aux.stop()
+        aux.join()
+
+
+def test_gather_waits_for_the_slowest_only(mocker):
+    auxes = [MockAuxiliary(receive_timeout=0.01) for _ in range(4)]
+    for aux in auxes:
+        aux.create_instance()
+    mocker.patch.object(
+        MockAuxiliary, "_run_command", side_effect=lambda *_: time.sleep(0.1) or True
+    )
+
+    t_start = time.perf_counter()
+    results = AuxiliaryInterface.gather(
+        [aux.run_command_async("cmd") for aux in auxes], timeout_in_s=1
+    )
+
+    assert results == [True] * 4
+    assert time.perf_counter() - t_start < 0.3
+    for aux in auxes:
+        aux.stop()
+        aux.join()
+
+
+def test_gather_timeout(mocker, aux_inst):
+    aux_inst.create_instance()
+    mocker.patch.object(
+        MockAuxiliary, "_run_command", side_effect=lambda *_: time.sleep(0.1) or True
+    )
+    done = aux_inst.run_command_async("cmd")
+    done.result(1)
+
+    assert AuxiliaryInterface.gather(
+        [done, aux_inst.run_command_async("cmd")], timeout_in_s=0.01
+    ) == [True, False]
+
+
+def test_gather_timeout_releases_tokens():
+    aux = MockPipelinedAuxiliary(receive_timeout=0.01)
+    aux.token_allocator = TokenAllocator(window=2)
+    aux.create_instance()
+
+    for _ in range(5):
+        futures = [aux.run_command_async(Message())]
+        assert AuxiliaryInterface.gather(futures, timeout_in_s=0.05) == [False]
+
+    assert not aux._pending_commands
+    assert not aux.token_allocator.in_flight
+    future = aux.run_command_async(Message())
+    time.sleep(0.05)
+    aux.messages = [aux.sent_commands[-1].generate_ack_message(MessageAckType.ACK)]
+    assert AuxiliaryInterface.gather([future], timeout_in_s=1) == [True]
+    aux.stop()
+    aux.join()
+
+
+def test_gather_timeout_cancels_pending_request(mocker, aux_inst):
+    aux_inst.create_instance()
+    run_command = mocker.patch.object(
+        MockAuxiliary, "_run_command", side_effect=lambda *_: time.sleep(0.1) or True
+    )
+    futures = [aux_inst.run_command_async(f"cmd_{i}") for i in range(2)]
+
+    assert AuxiliaryInterface.gather(futures, timeout_in_s=0.01) == [False, False]
+    time.sleep(0.2)
+
+    # the second command was still queued, it is never run
+    run_command.assert_called_once_with("cmd_0", None)
+    assert futures[1].cancelled()
+
+
+def test_bounded_queue_out_drop_oldest():
+    aux = MockAuxiliary(
+        messages=list(range(10)),
+        receive_timeout=0.01,
+        queue_maxsize=3,
+        queue_overflow_policy="drop-oldest",
+    )
+    aux.create_instance()
+    time.sleep(0.1)
+
+    queue_in_metrics, queue_out_metrics = aux.queue_metrics
+    assert queue_out_metrics.high_water_mark == 3
+    assert queue_out_metrics.dropped == 7
+    assert queue_in_metrics.maxsize == 3
+    assert [aux.wait_and_get_report() for _ in range(3)] == [7, 8, 9]
+    aux.stop()
+    aux.join()
+
+
+def test_bounded_queue_out_fail_drops_messages(caplog):
+    aux = MockAuxiliary(
+        messages=list(range(3)),
+        receive_timeout=0.01,
+        queue_maxsize=1,
+        queue_overflow_policy="fail",
+    )
+    aux.create_instance()
+    time.sleep(0.05)
+
+    # the overflow is reported but the auxiliary goes on receiving
+    assert aux.is_alive()
+    assert not aux.stop_event.is_set()
+    assert aux.receive_calls > 3
+    assert aux.queue_metrics[1].dropped == 2
+    assert "message dropped (2 dropped so far)" in caplog.text
+    assert aux.wait_and_get_report() == 0
+    aux.stop()
+    aux.join()
+
+
+def test_bounded_queue_out_block_stops():
+    aux = MockAuxiliary(messages=list(range(3)), receive_timeout=0.01, queue_maxsize=1)
+    aux.create_instance()
+    time.sleep(0.05)
+
+    # the thread is blocked by the full queue_out until it is stopped
+    assert aux.queue_out.full()
+    assert aux.receive_calls == 2
+    aux.stop()
+    aux.join(1)
+    assert not aux.is_alive()
+
+
+def test_drain():
+    aux = MockAuxiliary(messages=list(range(5)), receive_timeout=0.01)
+    aux.create_instance()
+
+    assert aux.drain(1, timeout_in_s=1) == [0]
+    time.sleep(0.05)
+    assert aux.drain(2) == [1, 2]
+    assert aux.drain() == [3, 4]
+    assert aux.drain() == []
+    assert aux.drain(timeout_in_s=0.01) == []
+    aux.stop()
+    aux.join()
+
+
+def test_stats():
+    aux = MockAuxiliary(messages=["log"], receive_timeout=0.01)
+    aux.create_instance()
+    aux.run_command("ping", timeout_in_s=1)
+    aux.wait_and_get_report(blocking=True, timeout_in_s=1)
+    time.sleep(0.05)
+    aux.stop()
+    aux.join()
+
+    stats = aux.stats
+    assert stats.commands == 1
+    assert stats.command_latency.count == 1
+    assert stats.run_command_time.count == 1
+    assert stats.receive_message_time.count == aux.receive_calls
+    assert stats.empty_receives == aux.receive_calls - 1
+    assert stats.loop_iterations > 0
+    assert stats.queue_in_depth.count == stats.loop_iterations
+    assert stats.ack_wait.count == 0
+
+
+def test_stats_pipelined():
+    aux = MockPipelinedAuxiliary(receive_timeout=0.01)
+    aux.create_instance()
+    cmd = Message()
+    future = aux.submit_command(cmd)
+    time.sleep(0.02)
+    aux.messages = [aux.sent_commands[0].generate_ack_message(MessageAckType.ACK)]
+
+    assert future.result(1) is True
+    assert aux.stats.ack_wait.count == 1
+    assert aux.stats.ack_wait.min >= 0.02
+    aux.stop()
+    aux.join()
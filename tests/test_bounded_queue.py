@@ -0,0 +1,122 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+import queue
+import threading
+
+import pytest
+
+from pykiso.bounded_queue import BoundedQueue, OverflowPolicy, QueueMetrics
+
+
+def fill(bounded_queue, items):
+    for item in items:
+        bounded_queue.put(item)
+
+
+def get_all(bounded_queue):
+    return [bounded_queue.get_nowait() for _ in range(bounded_queue.qsize())]
+
+
+def test_unbounded_queue():
+    bounded_queue = BoundedQueue(overflow_policy="drop-newest")
+    fill(bounded_queue, range(100))
+
+    assert bounded_queue.metrics == QueueMetrics(100, 0, 100, 0)
+
+
+def test_drop_oldest():
+    bounded_queue = BoundedQueue(3, "drop-oldest")
+    fill(bounded_queue, range(5))
+
+    assert get_all(bounded_queue) == [2, 3, 4]
+    assert bounded_queue.metrics == QueueMetrics(0, 3, 3, 2)
+    assert bounded_queue.unfinished_tasks == 3
+
+
+def test_drop_newest():
+    bounded_queue = BoundedQueue(3, OverflowPolicy.DROP_NEWEST)
+    fill(bounded_queue, range(5))
+
+    assert get_all(bounded_queue) == [0, 1, 2]
+    assert bounded_queue.dropped == 2
+
+
+def test_fail():
+    bounded_queue = BoundedQueue(1, "fail")
+    bounded_queue.put(0)
+
+    with pytest.raises(queue.Full):
+        bounded_queue.put(1)
+    assert bounded_queue.dropped == 1
+
+
+def test_block():
+    bounded_queue = BoundedQueue(1)
+    bounded_queue.put(0)
+
+    with pytest.raises(queue.Full):
+        bounded_queue.put(1, timeout=0.01)
+
+    consumer = threading.Timer(0.05, bounded_queue.get)
+    consumer.start()
+    bounded_queue.put(1, timeout=1)
+    consumer.join()
+
+    assert get_all(bounded_queue) == [1]
+    assert bounded_queue.dropped == 0
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedQueue(1, "drop-all")
+
+
+def test_first_drop_logged(caplog):
+    bounded_queue = BoundedQueue(1, "drop-newest", name="aux out")
+    fill(bounded_queue, range(3))
+
+    assert caplog.text.count("queue aux out is full") == 1
+
+
+def test_get_many():
+    bounded_queue = BoundedQueue(10)
+    fill(bounded_queue, range(5))
+
+    assert bounded_queue.get_many(2) == [0, 1]
+    assert bounded_queue.get_many() == [2, 3, 4]
+    assert bounded_queue.get_many(block=False) == []
+    assert bounded_queue.get_many(timeout=0.01) == []
+
+
+def test_get_many_waits_for_first_item():
+    bounded_queue = BoundedQueue()
+    producer = threading.Timer(0.05, fill, (bounded_queue, range(3)))
+    producer.start()
+
+    assert bounded_queue.get_many(timeout=1) == [0, 1, 2]
+    producer.join()
+
+
+def test_get_many_unblocks_producers():
+    bounded_queue = BoundedQueue(2)
+    fill(bounded_queue, range(2))
+    producer = threading.Thread(target=fill, args=(bounded_queue, range(2, 4)))
+    producer.start()
+
+    items = bounded_queue.get_many()
+    producer.join(1)
+
+    assert not producer.is_alive()
+    assert items + bounded_queue.get_many() == [0, 1, 2, 3]
+
+
+def test_get_many_negative_timeout():
+    with pytest.raises(ValueError):
+        BoundedQueue().get_many(timeout=-1)
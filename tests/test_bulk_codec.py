@@ -0,0 +1,96 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+import pytest
+
+from pykiso.message import (
+    Message,
+    MessageCommandType,
+    MessageLogType,
+    MessageType,
+    TlvKnownTags,
+)
+
+np = pytest.importorskip("numpy")
+bulk_codec = pytest.importorskip("pykiso.bulk_codec")
+
+
+@pytest.fixture
+def messages():
+    return [
+        Message(
+            msg_type=MessageType.COMMAND,
+            sub_type=MessageCommandType.TEST_CASE_RUN,
+            test_suite=1,
+            test_case=2,
+        ),
+        Message(
+            msg_type=MessageType.LOG,
+            sub_type=MessageLogType.RESERVED,
+            error_code=3,
+            tlv_dict={TlvKnownTags.TEST_REPORT: "OK" * 50},
+        ),
+        Message(
+            msg_type=MessageType.REPORT,
+            test_case=5,
+            tlv_dict={TlvKnownTags.FAILURE_REASON: b"\x01"},
+        ),
+    ]
+
+
+def test_decode(messages):
+    packets = [msg.serialize() for msg in messages]
+    capture = b"".join(packets)
+
+    records = bulk_codec.decode(capture)
+
+    assert records.dtype == bulk_codec.MESSAGE_DTYPE
+    assert list(records["msg_type"]) == [0, 3, 1]
+    assert list(records["msg_token"]) == [msg.msg_token for msg in messages]
+    assert list(records["sub_type"]) == [13, 0, 0]
+    assert list(records["error_code"]) == [0, 3, 0]
+    assert list(records["test_suite"]) == [1, 0, 0]
+    assert list(records["test_case"]) == [2, 0, 5]
+    assert list(records["offset"]) == [0, len(packets[0]), len(capture) - 13]
+    assert records["crc_valid"].all()
+    for record, msg in zip(records, messages):
+        payload_end = record["payload_offset"] + record["payload_length"]
+        assert capture[record["payload_offset"] : payload_end] == (
+            msg._serialize_payload()
+        )
+
+
+def test_decode_packet_list_and_invalid_crc(messages):
+    packets = [msg.serialize() for msg in messages]
+    packets[1] = packets[1][:-1] + bytes([packets[1][-1] ^ 0xFF])
+
+    # the incomplete trailing packet is ignored
+    records = bulk_codec.decode(packets + [packets[0][:5]])
+
+    assert len(records) == 3
+    assert list(records["crc_valid"]) == [True, False, True]
+
+
+def test_encode(messages):
+    capture = b"".join(msg.serialize() for msg in messages)
+    records = bulk_codec.decode(capture)
+    payloads = [msg._serialize_payload() for msg in messages]
+
+    assert bulk_codec.encode(records, payloads) == capture
+    assert bulk_codec.encode(records[:1]) == messages[0].serialize()
+    assert bulk_codec.encode(records[:0]) == b""
+
+
+def test_encode_invalid_payloads(messages):
+    records = np.zeros(2, bulk_codec.MESSAGE_DTYPE)
+
+    with pytest.raises(ValueError):
+        bulk_codec.encode(records, [b""])
+    with pytest.raises(ValueError):
+        bulk_codec.encode(records, [b"", bytes(256)])
@@ -0,0 +1,170 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+import asyncio
+import socket
+
+import pytest
+
+from pykiso import worker_pool
+from pykiso.lib.connectors.cc_async_adapter import (
+    CCAsyncAdapter,
+    CCAsyncTcpip,
+    CCAsyncUdp,
+    to_async_channel,
+)
+from pykiso.lib.connectors.cc_tcp_ip import CCTcpip
+from pykiso.lib.connectors.cc_udp import CCUdp
+from pykiso.lib.connectors.cc_udp_server import CCUdpServer
+from pykiso.message import Message
+
+
+def test_to_async_channel(cchannel_inst):
+    assert isinstance(to_async_channel(CCUdp("127.0.0.1", 5005)), CCAsyncUdp)
+    assert isinstance(to_async_channel(CCUdpServer("127.0.0.1", 5005)), CCAsyncUdp)
+    assert isinstance(to_async_channel(CCTcpip("127.0.0.1", 5005)), CCAsyncTcpip)
+    assert isinstance(to_async_channel(cchannel_inst), CCAsyncAdapter)
+
+
+def test_adapter(cchannel_inst):
+    cchannel_inst._cc_receive.return_value = b"\x12"
+
+    async def scenario():
+        async with CCAsyncAdapter(cchannel_inst) as channel:
+            await channel.cc_send(b"\x34", raw=True)
+            return await channel.cc_receive(timeout=0.1, raw=True)
+
+    assert asyncio.run(scenario()) == b"\x12"
+    cchannel_inst._cc_send.assert_called_with(msg=b"\x34", raw=True)
+    # the channel is polled without blocking the shared executor
+    cchannel_inst._cc_receive.assert_called_with(timeout=0, raw=True)
+
+
+def test_adapter_polls_until_received(cchannel_inst):
+    cchannel_inst._cc_receive.side_effect = [None, (None, None), b"\x12"]
+
+    async def scenario():
+        async with CCAsyncAdapter(cchannel_inst) as channel:
+            return await channel.cc_receive(timeout=1, raw=True)
+
+    assert asyncio.run(scenario()) == b"\x12"
+    assert cchannel_inst._cc_receive.call_count == 3
+
+
+def test_adapter_receive_timeout(cchannel_inst):
+    cchannel_inst._cc_receive.return_value = None
+
+    async def scenario():
+        async with CCAsyncAdapter(cchannel_inst) as channel:
+            return await channel.cc_receive(timeout=0.05, raw=True)
+
+    assert asyncio.run(scenario()) is None
+    # the polling interval grows while nothing is received
+    assert 2 < cchannel_inst._cc_receive.call_count < 20
+
+
+def test_adapters_share_executors(cchannel_inst):
+    adapters = [CCAsyncAdapter(cchannel_inst) for _ in range(10)]
+    executors = {adapter.executor for adapter in adapters}
+
+    assert len(executors) == worker_pool.DEFAULT_MAX_WORKERS
+    for adapter in adapters:
+        adapter._shared_executors.release(adapter.executor)
+
+
+def test_adapter_not_opened(cchannel_inst):
+    async def scenario():
+        await CCAsyncAdapter(cchannel_inst).cc_send(b"\x34")
+
+    with pytest.raises(ConnectionRefusedError):
+        asyncio.run(scenario())
+
+
+def test_udp_client_server():
+    server = CCUdpServer("127.0.0.1", 0)
+
+    async def scenario():
+        async with to_async_channel(server) as async_server:
+            port = server.udp_socket.getsockname()[1]
+            async with to_async_channel(CCUdp("127.0.0.1", port)) as async_client:
+                await async_client.cc_send(Message())
+                request = await async_server.cc_receive(timeout=1)
+                await async_server.cc_send(b"\x01\x02", raw=True)
+                response = await async_client.cc_receive(timeout=1, raw=True)
+                timeout = await async_client.cc_receive(timeout=0.01)
+        return request, response, timeout
+
+    request, response, timeout = asyncio.run(scenario())
+    assert isinstance(request, Message)
+    assert response == b"\x01\x02"
+    assert timeout is None
+    # the datagram socket selectors are closed with the transport
+    assert server._datagram_socket is None
+    assert server.udp_socket.fileno() == -1
+
+
+def test_tcp_client():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    port = listener.getsockname()[1]
+
+    async def scenario():
+        loop = asyncio.get_event_loop()
+        async with to_async_channel(CCTcpip("127.0.0.1", port)) as channel:
+            conn, _ = await loop.run_in_executor(None, listener.accept)
+            await channel.cc_send("*IDN?")
+            request = await loop.run_in_executor(None, conn.recv, 64)
+            conn.sendall(b"instrument\n")
+            response = await channel.cc_receive(timeout=1)
+            timeout = await channel.cc_receive(timeout=0.01)
+            conn.close()
+        return request, response, timeout
+
+    request, response, timeout = asyncio.run(scenario())
+    listener.close()
+    assert request == b"*IDN?"
+    assert response == "instrument"
+    assert timeout == ""
+
+
+def test_tcp_client_framing_and_reconnection():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    port = listener.getsockname()[1]
+
+    async def scenario():
+        loop = asyncio.get_event_loop()
+        channel = to_async_channel(CCTcpip("127.0.0.1", port, framing="length"))
+        async with channel:
+            conn, _ = await loop.run_in_executor(None, listener.accept)
+            await channel.cc_send("*IDN?")
+            request = await loop.run_in_executor(None, conn.recv, 64)
+            # a frame split over several segments, followed by another one
+            conn.sendall(b"\x00\x00\x00\x0afirst")
+            partial = await channel.cc_receive(timeout=0.05)
+            conn.sendall(b" part\x00\x00\x00\x06second")
+            responses = [await channel.cc_receive(timeout=1) for _ in range(2)]
+            # the peer closes the connection, it is reestablished on send
+            conn.close()
+            lost = await channel.cc_receive(timeout=1)
+            await channel.cc_send("*RST")
+            conn, _ = await loop.run_in_executor(None, listener.accept)
+            resent = await loop.run_in_executor(None, conn.recv, 64)
+            conn.close()
+        return request, partial, responses, lost, resent
+
+    request, partial, responses, lost, resent = asyncio.run(scenario())
+    listener.close()
+    assert request == b"\x00\x00\x00\x05*IDN?"
+    assert partial == ""
+    assert responses == ["first part", "second"]
+    assert lost == ""
+    assert resent == b"\x00\x00\x00\x04*RST"
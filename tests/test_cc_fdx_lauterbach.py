@@ -9,8 +9,11 @@
 
 """ Test module for CCLauterbach.py
 """
-from pykiso.lib.connectors.cc_fdx_lauterbach import CCFdxLauterbach
-from pykiso.message import Message
+from pykiso.lib.connectors.cc_fdx_lauterbach import (
+    FDX_MAX_SIZE,
+    CCFdxLauterbach,
+)
+from pykiso.message import Message, TlvKnownTags
 
 
 class Mock_t32_api:
@@ -335,6 +338,31 @@ def test_send_message():
     assert poll_len == expected_len
 
 
+def test_send_too_large_message(caplog):
+    """ Test send a message exceeding the FDX channel size """
+    lauterbach_inst = CCFdxLauterbach(
+        "C:/T32/bin/windows64/t32mppc.exe",
+        "C:/PATH_OF_config_mc.t32",
+        "C:/PATH_OF_fdx.cmm",
+        "C:/PATH_OF_reset.cmm",
+        "C:/PATH_OF_fdx_clear.cmm",
+        "C:/PATH_OF_inTest_reset.cmm",
+        "C:/T32/demo/api/capi/dll/t32api.dll",
+        "20000",
+        "localhost",
+        "1024",
+        1,
+    )
+    msg = Message(tlv_dict={TlvKnownTags.FAILURE_REASON: b"x" * FDX_MAX_SIZE})
+    lauterbach_inst.t32_api = Mock_t32_api()
+
+    assert lauterbach_inst._cc_send(msg) == 0
+    assert lauterbach_inst._cc_send(msg.serialize(), raw=True) == 0
+    assert "doesn't fit in the buffer" in caplog.text
+    assert f"limited to {FDX_MAX_SIZE} bytes" in caplog.text
+    assert [record.levelname for record in caplog.records] == ["ERROR", "ERROR"]
+
+
 def test_receive():
     """ Test receive message using t32 api """
 
@@ -391,4 +419,121 @@ def test_reset_board_success(mocker):
     # reset_board can be called only after the receive function was called.
     lauterbach_inst.reset_board()
 
-    assert lauterbach_inst.reset_flag == False
+    # the FDX channels are usable again
+    assert not lauterbach_inst._fdx_lock.locked()
+
+
+def test_receive_reuses_buffer():
+    """ Test the receive function does not allocate a new buffer """
+
+    lauterbach_inst = CCFdxLauterbach()
+    mock_t32_api = Mock_t32_api()
+    lauterbach_inst.t32_api = mock_t32_api
+    receive_buffer = lauterbach_inst._receive_buffer
+
+    for token in (1, 2):
+        msg = Message()
+        msg.msg_token = token
+        mock_t32_api.t32_Fdx_ReceivePoll_msg = msg.serialize()
+        message = lauterbach_inst._cc_receive(timeout=0)
+        assert message.msg_token == token
+
+    assert lauterbach_inst._receive_buffer is receive_buffer
+
+
+def test_receive_into():
+    """ Test the receive_into function writes into the given buffer """
+
+    lauterbach_inst = CCFdxLauterbach()
+    mock_t32_api = Mock_t32_api()
+    msg_received = Message().serialize()
+    mock_t32_api.t32_Fdx_ReceivePoll_msg = msg_received
+    lauterbach_inst.t32_api = mock_t32_api
+    buffer = bytearray(64)
+
+    nbytes = lauterbach_inst._cc_receive_into(buffer, timeout=0)
+
+    assert buffer[:nbytes] == msg_received
+
+
+def test_receive_raw():
+    """ Test receive raw bytes using t32 api """
+
+    lauterbach_inst = CCFdxLauterbach()
+    mock_t32_api = Mock_t32_api()
+    msg_received = Message().serialize()
+    mock_t32_api.t32_Fdx_ReceivePoll_msg = msg_received
+    lauterbach_inst.t32_api = mock_t32_api
+
+    assert lauterbach_inst._cc_receive(timeout=0, raw=True) == msg_received
+
+
+def test_receive_poll_backoff(mocker):
+    """ Test the polling interval grows while nothing is received """
+
+    lauterbach_inst = CCFdxLauterbach(max_poll_interval=0.004)
+    lauterbach_inst.t32_api = Mock_t32_api()
+    sleep_durations = []
+    mocker.patch(
+        "pykiso.lib.connectors.cc_fdx_lauterbach.time.sleep",
+        side_effect=sleep_durations.append,
+    )
+
+    assert lauterbach_inst._cc_receive(timeout=0.05) is None
+    assert sleep_durations[:4] == [0.0005, 0.001, 0.002, 0.004]
+    assert max(sleep_durations) <= 0.004
+
+
+def test_receive_waits_for_reset(mocker):
+    """ Test the FDX channel is not polled during the board reset """
+
+    lauterbach_inst = CCFdxLauterbach()
+    mock_t32_api = Mock_t32_api()
+    mock_t32_api.t32_Fdx_ReceivePoll_msg = Message().serialize()
+    lauterbach_inst.t32_api = mock_t32_api
+    receive_poll = mocker.spy(mock_t32_api, "T32_Fdx_ReceivePoll")
+
+    with lauterbach_inst._fdx_lock:
+        assert lauterbach_inst._cc_receive(timeout=0.01) is None
+    receive_poll.assert_not_called()
+
+    assert lauterbach_inst._cc_receive(timeout=0.01) is not None
+
+
+def test_receive_batch():
+    """ Test all the available packets are read in one call """
+
+    lauterbach_inst = CCFdxLauterbach()
+    mock_t32_api = Mock_t32_api()
+    lauterbach_inst.t32_api = mock_t32_api
+    packets = []
+    for token in (1, 2, 3):
+        msg = Message()
+        msg.msg_token = token
+        packets.append(msg.serialize())
+    pending = iter(packets + [b""])
+
+    def receive_poll(fdx_id, buffer, width, length):
+        packet = next(pending)
+        buffer.contents.raw = packet
+        return len(packet)
+
+    mock_t32_api.T32_Fdx_ReceivePoll = receive_poll
+
+    messages = lauterbach_inst.cc_receive_batch(timeout=0)
+
+    assert [message.msg_token for message in messages] == [1, 2, 3]
+
+
+def test_receive_batch_max_count():
+    """ Test the number of packets read in one call can be limited """
+
+    lauterbach_inst = CCFdxLauterbach()
+    mock_t32_api = Mock_t32_api()
+    msg_received = Message().serialize()
+    mock_t32_api.t32_Fdx_ReceivePoll_msg = msg_received
+    lauterbach_inst.t32_api = mock_t32_api
+
+    packets = lauterbach_inst.cc_receive_batch(timeout=0, raw=True, max_count=2)
+
+    assert packets == [msg_received, msg_received]
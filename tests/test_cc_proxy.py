@@ -65,3 +65,13 @@ def test_cc_receive_timeout():
         msg, src = proxy_inst._cc_receive()
         assert msg == None
         assert src == None
+
+
+def test_bounded_queues():
+    with CCProxy(queue_maxsize=2, queue_overflow_policy="drop-oldest") as proxy_inst:
+        for msg in (b"\x01", b"\x02", b"\x03"):
+            proxy_inst.queue_out.put((msg, None))
+
+        assert proxy_inst._cc_receive(0)[0] == b"\x02"
+        assert proxy_inst.queue_out.metrics.dropped == 1
+        assert proxy_inst.queue_in.maxsize == 2
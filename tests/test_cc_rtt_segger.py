@@ -180,17 +180,19 @@ def test_rtt_segger_rtt_logger_running(
     )
     mocker_rtt_read = mocker.patch("pylink.JLink.rtt_read", return_value=bytes_to_read)
 
-    cc_rtt_inst = CCRttSegger(rtt_log_path=tmpdir)
+    cc_rtt_inst = CCRttSegger(rtt_log_path=tmpdir, rtt_log_buffer_idx=1)
     cc_rtt_inst._cc_open()
 
     mocker_buffer.assert_called_once()
-    mocker_rtt_read.assert_called()
     assert cc_rtt_inst._is_running == True
     assert cc_rtt_inst.rtt_log_buffer_size == expected_size_of_buffer
     assert (Path(tmpdir) / "rtt.log").is_file()
 
     cc_rtt_inst._cc_close()
+    # the buffers are read at least once before the reader thread stops
+    mocker_rtt_read.assert_called()
     assert cc_rtt_inst._is_running == False
+    assert cc_rtt_inst.rtt_log_thread is None
     assert rtt_log in (Path(tmpdir) / "rtt.log").read_text()
 
 
@@ -233,3 +235,124 @@ def test_rtt_segger_timeout(mocker, mock_pylink_square_socket):
         response = cc_rtt_inst._cc_receive(timeout=0.010, raw=True)
 
     assert response == None
+
+
+def test_rtt_segger_receive_bulk(mocker, mock_pylink_square_socket):
+    packets = message_with_tlv.serialize() + message_with_no_tlv.serialize()
+    mocker_rtt_read = mocker.patch(
+        "pylink.JLink.rtt_read", side_effect=[list(packets), []]
+    )
+
+    with CCRttSegger(rx_buffer_idx=1, rx_buffer_size=512) as cc_rtt_inst:
+        first = cc_rtt_inst._cc_receive(timeout=0.1, raw=True)
+        second = cc_rtt_inst._cc_receive(timeout=0.1, raw=True)
+
+    assert first == message_with_tlv.serialize()
+    assert second == message_with_no_tlv.serialize()
+    # both messages are read at once
+    mocker_rtt_read.assert_called_once_with(1, 512)
+
+
+def test_rtt_segger_receive_split_message(mocker, mock_pylink_square_socket):
+    packet = message_with_tlv.serialize()
+    mocker.patch(
+        "pylink.JLink.rtt_read",
+        side_effect=[list(packet[:5]), [], list(packet[5:])],
+    )
+    mocker_sleep = mocker.patch("pykiso.lib.connectors.cc_rtt_segger.time.sleep")
+
+    with CCRttSegger() as cc_rtt_inst:
+        response = cc_rtt_inst._cc_receive(timeout=1, raw=True)
+
+    assert response == packet
+    mocker_sleep.assert_called()
+
+
+def test_rtt_segger_receive_poll_backoff(mocker, mock_pylink_square_socket):
+    mocker.patch("pylink.JLink.rtt_read", return_value=[])
+    sleep_durations = []
+    mocker.patch(
+        "pykiso.lib.connectors.cc_rtt_segger.time.sleep",
+        side_effect=sleep_durations.append,
+    )
+
+    with CCRttSegger(max_poll_interval=0.004) as cc_rtt_inst:
+        response = cc_rtt_inst._cc_receive(timeout=0.05)
+
+    assert response is None
+    assert sleep_durations[:4] == [0.0005, 0.001, 0.002, 0.004]
+    assert max(sleep_durations) <= 0.004
+
+
+def test_rtt_segger_receive_poll_reset_after_partial_read(
+    mocker, mock_pylink_square_socket
+):
+    packet = message_with_tlv.serialize()
+    mocker.patch(
+        "pylink.JLink.rtt_read",
+        side_effect=[[], [], [], list(packet[:5]), [], list(packet[5:])],
+    )
+    sleep_durations = []
+    mocker.patch(
+        "pykiso.lib.connectors.cc_rtt_segger.time.sleep",
+        side_effect=sleep_durations.append,
+    )
+
+    with CCRttSegger() as cc_rtt_inst:
+        response = cc_rtt_inst._cc_receive(timeout=1, raw=True)
+
+    assert response == packet
+    assert sleep_durations == [0.0005, 0.001, 0.002, 0.0005, 0.001]
+
+
+def test_rtt_segger_logger_on_reception_buffer(tmpdir):
+    with pytest.raises(ValueError):
+        CCRttSegger(rtt_log_path=tmpdir)
+    with pytest.raises(ValueError):
+        CCRttSegger(rx_buffer_idx=2, rtt_log_path=tmpdir, rtt_log_buffer_idx=2)
+
+
+def test_rtt_segger_logger_invalid_buffer_index(
+    mocker, mock_pylink_square_socket, tmpdir, caplog
+):
+    mocker.patch(
+        "pykiso.lib.connectors.cc_rtt_segger.pylink.JLink.rtt_get_buf_descriptor",
+        side_effect=pylink.errors.JLinkRTTException(-1),
+    )
+    mocker.patch("pylink.JLink.rtt_get_num_up_buffers", return_value=3)
+    packet = message_with_tlv.serialize()
+    buffers = [list(packet)]
+    mocker_rtt_read = mocker.patch(
+        "pylink.JLink.rtt_read", side_effect=lambda *_: buffers.pop() if buffers else []
+    )
+
+    with CCRttSegger(rtt_log_path=tmpdir, rtt_log_buffer_idx=10) as cc_rtt_inst:
+        response = cc_rtt_inst._cc_receive(timeout=1, raw=True)
+
+    # RTT logging fell back to the reception buffer, the messages are
+    # not written to the log
+    assert response == packet
+    assert "is the reception buffer" in caplog.text
+    assert (Path(tmpdir) / "rtt.log").read_text() == ""
+    assert {call.args[0] for call in mocker_rtt_read.call_args_list} == {0}
+
+
+def test_rtt_segger_receive_with_logger(mocker, mock_pylink_square_socket, tmpdir):
+    mocker.patch(
+        "pykiso.lib.connectors.cc_rtt_segger.pylink.JLink.rtt_get_buf_descriptor",
+        return_value=pylink.jlink.structs.JLinkRTTerminalBufDesc(SizeOfBuffer=64),
+    )
+    packet = message_with_tlv.serialize()
+    buffers = {0: [list(packet)], 1: [list(b"target log")]}
+
+    def rtt_read(buffer_index, num_bytes):
+        return buffers[buffer_index].pop() if buffers[buffer_index] else []
+
+    mocker.patch("pylink.JLink.rtt_read", side_effect=rtt_read)
+
+    with CCRttSegger(rtt_log_path=tmpdir, rtt_log_buffer_idx=1) as cc_rtt_inst:
+        response = cc_rtt_inst._cc_receive(timeout=1)
+
+    assert isinstance(response, Message)
+    assert response.get_message_token() == message_with_tlv.get_message_token()
+    assert "target log" in (Path(tmpdir) / "rtt.log").read_text()
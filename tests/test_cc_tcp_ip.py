@@ -12,15 +12,11 @@ import socket
 import pytest
 
 from pykiso.lib.connectors import cc_tcp_ip
+from pykiso.message import Message, MessageType
 
 constructor_params = {"ip": "10.10.10.10", "port": 5000, "max_msg_size": 100}
 example_message = "example message"
 example_response = "example response"
-query_value = {"query_value": "query_value"}
-errors_to_catch = {
-    "timeout": "timeout",
-    "Exception": "Exception",
-}
 
 
 @pytest.fixture
@@ -34,25 +30,45 @@ def mock_socket(mocker):
 
         connect = mocker.stub(name="connect")
         close = mocker.stub(name="close")
-        send = mocker.stub(name="send")
+        sendall = mocker.stub(name="sendall")
         settimeout = mocker.stub(name="settimeout")
-
-        def recv(self, max_msg_size):
-            # the max_msg_size parameter is used to trigger different scenarios
-            if max_msg_size == query_value["query_value"]:
-                response = "42.00 V"
-            elif max_msg_size == errors_to_catch["timeout"]:
-                raise socket.timeout("Timeout error raised")
-            elif max_msg_size == errors_to_catch["Exception"]:
-                raise Exception("Exception raised")
-            else:
-                response = example_response
-            return response.encode()
+        setsockopt = mocker.stub(name="setsockopt")
 
     mocker.patch.object(cc_tcp_ip.socket, "socket", new=MockSocket)
+    mocker.patch.object(cc_tcp_ip.selectors, "DefaultSelector")
     return cc_tcp_ip
 
 
+@pytest.fixture
+def tcp_server():
+    """Listening socket on the loopback interface."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    server.settimeout(1)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def connection(tcp_server):
+    """Open CCTcpip connected to tcp_server, and the accepted socket."""
+
+    def connect(**kwargs):
+        channel = cc_tcp_ip.CCTcpip(*tcp_server.getsockname(), **kwargs)
+        channel._cc_open()
+        peer, _ = tcp_server.accept()
+        peer.settimeout(1)
+        opened.append((channel, peer))
+        return channel, peer
+
+    opened = []
+    yield connect
+    for channel, peer in opened:
+        peer.close()
+        channel._cc_close()
+
+
 @pytest.mark.parametrize(
     "constructor_params",
     [
@@ -69,6 +85,14 @@ def test_constructor(constructor_params):
     assert socket_connector.dest_port == constructor_params["port"]
     assert socket_connector.max_msg_size == constructor_params["max_msg_size"]
     assert isinstance(socket_connector.socket, socket.socket)
+    socket_connector.socket.close()
+
+
+def test_constructor_invalid_framing():
+    with pytest.raises(ValueError):
+        cc_tcp_ip.CCTcpip("10.10.10.10", 5000, framing="unknown")
+    with pytest.raises(ValueError):
+        cc_tcp_ip.CCTcpip("10.10.10.10", 5000, framing="length", length_prefix_size=3)
 
 
 @pytest.mark.parametrize(
@@ -84,6 +108,9 @@ def test__cc_open(mock_socket, constructor_params):
 
     socket_connector._cc_open()
     mock_socket.socket.socket.connect.assert_called_once()
+    mock_socket.socket.socket.setsockopt.assert_called_once_with(
+        socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+    )
 
 
 @pytest.mark.parametrize(
@@ -114,40 +141,178 @@ def test__cc_send(
     """Test _cc_send """
     param = constructor_params.values()
     socket_connector = cc_tcp_ip.CCTcpip(*param)
+    socket_connector._cc_open()
 
     socket_connector._cc_send(msg_to_send, is_raw)
-    mock_socket.socket.socket.send.assert_called_once_with(expected_sent_message)
+    mock_socket.socket.socket.sendall.assert_called_once_with(expected_sent_message)
+
+
+def test__cc_send_connection_lost(mock_socket):
+    socket_connector = cc_tcp_ip.CCTcpip("127.0.0.1", 5005)
+    socket_connector._cc_open()
+    sendall = mock_socket.socket.socket.sendall
+    sendall.side_effect = [BrokenPipeError, None]
+
+    socket_connector._cc_send(b"data", raw=True)
+
+    # sent again on the new connection
+    assert sendall.call_count == 2
+    assert socket_connector._connected
+
+    sendall.side_effect = BrokenPipeError
+    with pytest.raises(BrokenPipeError):
+        socket_connector._cc_send(b"data", raw=True)
+    assert not socket_connector._connected
+
+
+def test__cc_send_timeout(mock_socket):
+    socket_connector = cc_tcp_ip.CCTcpip("127.0.0.1", 5005)
+    socket_connector._cc_open()
+    sendall = mock_socket.socket.socket.sendall
+    sendall.side_effect = socket.timeout
+
+    with pytest.raises(socket.timeout):
+        socket_connector._cc_send(b"data", raw=True)
+
+    # neither sent again nor disconnected
+    sendall.assert_called_once()
+    assert socket_connector._connected
 
 
 @pytest.mark.parametrize(
-    "constructor_params, expected_response, is_raw",
+    "expected_response, is_raw",
     [
-        (constructor_params, example_response, False),
-        (constructor_params, example_response.encode(), True),
+        (example_response, False),
+        (example_response.encode(), True),
     ],
 )
-def test__cc_receive(mock_socket, constructor_params, expected_response, is_raw):
+def test__cc_receive(connection, expected_response, is_raw):
     """Test _cc_receive """
-    param = constructor_params.values()
-    socket_connector = cc_tcp_ip.CCTcpip(*param)
+    socket_connector, peer = connection(max_msg_size=100)
+    peer.sendall(example_response.encode())
+
+    assert expected_response == socket_connector._cc_receive(timeout=1, raw=is_raw)
+
+
+def test__cc_receive_timeout_not_logged(connection, caplog):
+    """Test _cc_receive without received data"""
+    socket_connector, _ = connection()
 
-    assert expected_response == socket_connector._cc_receive(raw=is_raw)
+    assert socket_connector._cc_receive(timeout=0.01) == ""
+    assert "error" not in caplog.text
 
 
 @pytest.mark.parametrize(
-    "constructor_params, expected_response, is_raw",
+    "framing, first_data, last_data",
     [
-        (constructor_params, example_response, False),
+        ("delimiter", b"*IDN?\r\nfirst", b" second\r\n"),
+        ("length", b"\x00\x00\x00\x05*IDN?\x00\x00\x00\x0cfirst", b" second"),
     ],
 )
-def test__cc_receive_with_errors(
-    mock_socket, constructor_params, expected_response, is_raw
-):
-    """Test _cc_receive with errors"""
-    param = constructor_params.values()
-    socket_connector = cc_tcp_ip.CCTcpip(*param)
+def test__cc_receive_framing(connection, framing, first_data, last_data):
+    """Test a frame split over several segments"""
+    socket_connector, peer = connection(framing=framing, delimiter="\r\n")
+
+    peer.sendall(first_data)
+    assert socket_connector._cc_receive(timeout=1) == "*IDN?"
+    # the incomplete frame is kept
+    assert socket_connector._cc_receive(timeout=0.01) == ""
+    peer.sendall(last_data)
+    assert socket_connector._cc_receive(timeout=1) == "first second"
+
+
+def test__cc_send_framing(connection):
+    socket_connector, peer = connection(framing="length", length_prefix_size=2)
+
+    socket_connector._cc_send("*IDN?")
+    socket_connector._cc_send(b"\x01", raw=True)
+
+    assert peer.recv(100) == b"\x00\x05*IDN?\x00\x01\x01"
+
+
+def test__cc_message_framing(connection):
+    socket_connector, peer = connection(framing="message")
+    msg = Message(msg_type=MessageType.LOG, msg_token=3)
+
+    socket_connector._cc_send(msg)
+    packet = peer.recv(100)
+    peer.sendall(packet * 2)
+
+    assert packet == msg.serialize()
+    assert socket_connector._cc_receive(timeout=1).msg_token == 3
+    assert socket_connector._cc_receive(timeout=1, raw=True) == packet
+    assert socket_connector._cc_receive(timeout=0.01) is None
+
+
+def test_reconnect(connection, tcp_server, mocker):
+    """Test the reconnection after the peer closed the connection"""
+    socket_connector, peer = connection(framing="delimiter")
+    peer.close()
+
+    assert socket_connector._cc_receive(timeout=1) == ""
+    assert not socket_connector._connected
+    socket_connector._cc_send("*RST")
+    new_peer, _ = tcp_server.accept()
+
+    assert new_peer.recv(100) == b"*RST\n"
+    new_peer.close()
+
+
+def test_reconnect_backoff(mocker):
+    socket_connector = cc_tcp_ip.CCTcpip("127.0.0.1", 1)
+    socket_connector._cc_close()
+    socket_connector._next_reconnect_time = 0
+    sleep = mocker.patch("time.sleep")
+
+    with pytest.raises(ConnectionError):
+        socket_connector._cc_send("*RST")
+    # the next attempt is delayed
+    assert socket_connector._cc_receive(timeout=0.2) == ""
+    sleep.assert_called_once_with(pytest.approx(0.2, abs=0.01))
+    assert socket_connector._reconnect_delay == 2 * socket_connector.RECONNECT_DELAY
+
+
+def test__cc_receive_into(connection):
+    """Test _cc_receive_into writing the received data into a buffer"""
+    socket_connector, peer = connection()
+    response = example_response.encode()
+    peer.sendall(response)
+    buffer = bytearray(100)
+
+    nbytes = socket_connector._cc_receive_into(buffer, timeout=1)
+
+    assert buffer[:nbytes] == response
+
+
+def test__cc_receive_into_framing(connection):
+    socket_connector, peer = connection(framing="delimiter")
+    peer.sendall(b"first\nsecond\n")
+    buffer = bytearray(100)
+
+    nbytes = socket_connector._cc_receive_into(buffer, timeout=1)
+
+    assert buffer[:nbytes] == b"first"
+
+
+def test_framing_has_pending():
+    framing = cc_tcp_ip.DelimiterFraming()
+    message_framing = cc_tcp_ip.MessageFraming()
+
+    assert not framing.has_pending()
+    framing.feed(b"first\nsec")
+    assert framing.get() == "first"
+    assert framing.has_pending()
+    assert not message_framing.has_pending()
+    message_framing.feed(Message().serialize()[:4])
+    assert message_framing.has_pending()
+
+
+def test__cc_receive_with_errors(connection, mocker):
+    """Test _cc_receive and _cc_receive_into with errors"""
+    socket_connector, peer = connection()
+    peer.sendall(b"data")
+    socket_connector.socket = mocker.Mock(wraps=socket_connector.socket)
+    socket_connector.socket.recv_into.side_effect = Exception
 
-    # using max_msg_size attribute tu trigger exceptions in mock
-    for err in errors_to_catch:
-        socket_connector.max_msg_size = err
-        assert socket_connector._cc_receive() == ""
+    assert socket_connector._cc_receive_into(bytearray(100), timeout=1) == 0
+    assert socket_connector._cc_receive(timeout=1) == ""
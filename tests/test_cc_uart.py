@@ -14,12 +14,16 @@ import pytest
 pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="tests for linux only")
 
 import pathlib
+import struct
 import subprocess
 import threading
 import time
 
 from pykiso import message
-from pykiso.lib.connectors.cc_uart import CCUart
+from pykiso.checksum import crc16
+from pykiso.lib.connectors.cc_uart import CCUart, SlipDecoder, slip_encode
+
+PACKET = b"\x40\x01\x03\x00\x01\x02\x03\x00"
 
 
 @pytest.fixture
@@ -114,3 +118,163 @@ def test_virtual_communication(virtual_serial):
         t.start()
     for t in threads:
         t.join(timeout=10)
+
+
+def _slip_frame(ch, packet):
+    """Build the frame sent by the device for the given packet."""
+    import struct
+
+    crc_packet = struct.pack(">H", ch._calculate_crc32(packet)) + packet
+    return b"\xc0" + crc_packet.replace(b"\xdb", b"\xdb\xdd").replace(
+        b"\xc0", b"\xdb\xdc"
+    )
+
+
+def test_receive_into(mocker):
+    ch = CCUart(serialPort="/dev/null")
+    packet = b"\x40\x01\x03\x00\x01\x02\x03\x00"
+    ch.serial = mocker.MagicMock(in_waiting=0)
+    ch.serial.read.side_effect = [bytes([b]) for b in _slip_frame(ch, packet)]
+    buffer = bytearray(16)
+
+    nbytes = ch._cc_receive_into(buffer, timeout=0.1)
+
+    assert nbytes == len(packet)
+    assert buffer[:nbytes] == packet
+
+
+def test_receive_parses_packet(mocker):
+    ch = CCUart(serialPort="/dev/null")
+    packet = b"\x40\x05\x03\x00\x01\x02\x03\x02\x6e\x00"
+    ch.serial = mocker.MagicMock(in_waiting=0)
+    ch.serial.read.side_effect = [bytes([b]) for b in _slip_frame(ch, packet)]
+
+    msg = ch._cc_receive(timeout=0.1)
+
+    assert msg.msg_token == 5
+    assert msg.test_case == 3
+
+
+def test_receive_nothing(mocker):
+    ch = CCUart(serialPort="/dev/null")
+    ch.serial = mocker.MagicMock(in_waiting=0)
+    ch.serial.read.return_value = b""
+
+    assert ch._cc_receive(timeout=0.1) is None
+    assert ch._cc_receive_into(bytearray(16), timeout=0.1) == 0
+
+
+def test_receive_buffered(mocker):
+    ch = CCUart(serialPort="/dev/null")
+    # header byte escaped, payload length and crc of the second frame too
+    first = b"\x40\xc0\x03\x00\x01\x02\x03\x00"
+    second = b"\x40\x02\x03\x00\x01\x02\x04\x02\x6e\xdb"
+    stream = b"\x00" + _slip_frame(ch, first) + _slip_frame(ch, second)
+    ch.serial = mocker.MagicMock(timeout=0.1, in_waiting=len(stream))
+    ch.serial.read.side_effect = [stream[:5], stream[5:], b""]
+
+    assert ch._cc_receive_into(bytearray(16), timeout=0.1) == len(first)
+    # the second frame was read at once with the first one
+    msg = ch._cc_receive(timeout=0.1)
+
+    assert msg.test_case == 4
+    ch.serial.read.assert_called_with(len(stream))
+    assert ch.serial.read.call_count == 2
+    # the timeout didn't change, the port is not reconfigured
+    assert ch.serial.timeout == 0.1
+
+
+def test_receive_partial_frame_survives_timeout(mocker):
+    ch = CCUart(serialPort="/dev/null")
+    frame = _slip_frame(ch, b"\x40\xc0\x03\x00\x01\x02\x03\x00")
+    ch.serial = mocker.MagicMock(in_waiting=0)
+    # split the frame in the middle of an escape sequence
+    escape_position = frame.index(b"\xdb") + 1
+    ch.serial.read.side_effect = [
+        frame[:escape_position],
+        b"",
+        frame[escape_position:],
+    ]
+
+    assert ch._cc_receive(timeout=0.1) is None
+    assert ch._cc_receive(timeout=0.1).msg_token == 0xC0
+
+
+def test_slip_decoder_extended_frames():
+    decoder = SlipDecoder()
+    msg = message.Message(tlv_dict={message.TlvKnownTags.FAILURE_REASON: b"\xc0" * 300})
+    # the device sends its packets without the message CRC
+    packet = msg.serialize()[: -message.Message.crc_byte_size]
+    frame = slip_encode(struct.pack(">H", crc16(packet)) + packet)
+
+    # the frame is only complete once its 2 bytes payload length is known
+    assert decoder.feed(frame[:11]) == 0
+    assert decoder.feed(frame[11:] + b"\xc0" + struct.pack(">H", crc16(PACKET))) == 1
+    assert decoder.feed(PACKET) == 2
+
+    assert decoder.get_packet() == packet
+    assert decoder.get_packet() == PACKET
+    assert decoder.dropped_frames == 0
+
+
+def test_slip_decoder_invalid_frames():
+    decoder = SlipDecoder()
+    frame = b"\xc0" + struct.pack(">H", crc16(PACKET)) + PACKET
+    corrupted = frame[:-2] + b"\xff" + frame[-1:]
+
+    # an incomplete frame is dropped at the start of the next one
+    assert decoder.feed(frame[:6] + corrupted + frame) == 1
+
+    assert decoder.get_packet() == PACKET
+    assert decoder.get_packet() is None
+    assert decoder.dropped_frames == 1
+    decoder.feed(frame[:4])
+    decoder.reset()
+    assert decoder.feed(frame[4:]) == 0
+
+
+def test_usb_send(mocker):
+    from pykiso.lib.connectors.cc_usb import CCUsb
+
+    ch = CCUsb("/dev/null")
+    ch.serial = mocker.MagicMock()
+    msg = message.Message()
+    raw_packet = msg.serialize()
+
+    ch._cc_send(msg)
+
+    expected = _slip_frame(ch, raw_packet)
+    ch.serial.write.assert_called_once_with(bytearray(expected))
+
+
+def test_slip_encode():
+    assert slip_encode(b"\x01\xc0\xdb\xdc") == b"\xc0\x01\xdb\xdc\xdb\xdd\xdc"
+
+
+def test_send_single_write(mocker):
+    ch = CCUart(serialPort="/dev/null", baudrate=115200)
+    ch.serial = mocker.MagicMock(baudrate=115200)
+    msg = message.Message(msg_token=0xC0)
+
+    ch._cc_send(msg)
+
+    ch.serial.write.assert_called_once_with(_slip_frame(ch, msg.serialize()))
+    ch.serial.flushOutput.assert_not_called()
+    assert ch.frame_gap == pytest.approx(20 / 115200)
+
+
+def test_send_pacing(mocker):
+    ch = CCUart(serialPort="/dev/null", baudrate=1000, frame_gap=0.5)
+    ch.serial = mocker.MagicMock(baudrate=1000)
+    perf_counter = mocker.patch("time.perf_counter", side_effect=[10.0, 10.1, 20.0])
+    sleep = mocker.patch("time.sleep")
+
+    # 10 bytes take 0.1 second at 1000 bauds
+    ch._send_using_slip(b"\x00" * 9)
+    ch._send_using_slip(b"\x00" * 9)
+    ch._send_using_slip(b"\x00" * 9)
+
+    # only the second frame was sent before the end of the first one
+    sleep.assert_called_once_with(pytest.approx(0.5))
+    assert ch.serial.write.call_count == 3
+    assert perf_counter.call_count == 3
@@ -11,7 +11,7 @@ import socket
 
 import pytest
 
-from pykiso.lib.connectors.cc_udp import CCUdp
+from pykiso.lib.connectors.cc_udp import CCUdp, DatagramSocket
 from pykiso.message import (
     Message,
     MessageCommandType,
@@ -55,13 +55,31 @@ def mock_udp_socket(mocker):
 
         close = mocker.stub(name="close")
         sendto = mocker.stub(name="sendto")
-        settimeout = mocker.stub(name="settimeout")
-        recvfrom = mocker.stub(name="recvfrom")
+        setblocking = mocker.stub(name="setblocking")
+        setsockopt = mocker.stub(name="setsockopt")
+        recvfrom_into = mocker.stub(name="recvfrom_into")
 
     mocker.patch.object(socket, "socket", new=MockSocket)
+    mocker.patch("selectors.DefaultSelector")
     return socket
 
 
+def recvfrom_into_returning(*datagrams):
+    """Create a recvfrom_into side effect receiving the given
+    datagrams, then raising BlockingIOError.
+    """
+    datagrams = list(datagrams)
+
+    def recvfrom_into(buffer):
+        if not datagrams:
+            raise BlockingIOError
+        data, address = datagrams.pop(0)
+        buffer[: len(data)] = data
+        return len(data), address
+
+    return recvfrom_into
+
+
 def test_constructor_invalid():
     """Test invalid construct with no parameters given"""
 
@@ -75,7 +93,7 @@ def test_constructor_valid(mock_udp_socket):
 
     assert udp_inst.dest_ip == "120.0.0.7"
     assert udp_inst.dest_port == 5005
-    assert udp_inst.max_msg_size == 256
+    assert udp_inst.max_msg_size == 65535
 
 
 def test_udp_close(mock_udp_socket):
@@ -111,6 +129,26 @@ def test_udp_send_valid(mock_udp_socket, msg_to_send, raw_state):
     mock_udp_socket.socket.sendto.assert_called_once()
 
 
+def test_datagram_socket_send_waits_for_writable(mocker):
+    """Test the sending of a datagram when the socket buffer is full.
+
+    Validation criteria:
+     - the datagram is sent again once the socket is writable
+     - socket.timeout is raised if it stays full until the timeout
+    """
+    selector = mocker.patch("selectors.DefaultSelector").return_value
+    udp_socket = mocker.MagicMock()
+    udp_socket.sendto.side_effect = [BlockingIOError, 4]
+    datagram_socket = DatagramSocket(udp_socket)
+
+    assert datagram_socket.send(b"ping", ("127.0.0.1", 5005)) == 4
+    selector.select.assert_called_once_with(None)
+
+    udp_socket.sendto.side_effect = BlockingIOError
+    with pytest.raises(socket.timeout):
+        datagram_socket.send(b"ping", ("127.0.0.1", 5005), timeout=0.01)
+
+
 @pytest.mark.parametrize(
     "raw_state",
     [
@@ -124,7 +162,9 @@ def test_udp_recv_invalid(mocker, mock_udp_socket, raw_state):
     Validation criteria:
      - NotImplementedError raised
     """
-    mocker.patch("socket.socket.recvfrom", return_value=None)
+    mock_udp_socket.socket.recvfrom_into = mocker.Mock(
+        side_effect=recvfrom_into_returning()
+    )
 
     with CCUdp("120.0.0.7", 5005) as udp_inst:
         msg_received = udp_inst._cc_receive(timeout=0.0000001, raw=raw_state)
@@ -155,15 +195,109 @@ def test_udp_recv_valid(
 
     Validation criteria:
      - message return is type of Message
-     - settimeout is call once
-     - recvfrom is call once
+     - the socket timeout is not changed
+     - recvfrom_into is call once
     """
-    mocker.patch("socket.socket.recvfrom", return_value=raw_data)
+    mock_udp_socket.socket.recvfrom_into = mocker.Mock(
+        side_effect=recvfrom_into_returning(raw_data)
+    )
 
     with CCUdp("120.0.0.7", 5005) as udp_inst:
         msg_received = udp_inst._cc_receive(*cc_receive_param)
 
     assert isinstance(msg_received, expected_type) == True
     assert udp_inst.source_addr == raw_data[1]
-    mock_udp_socket.socket.settimeout.assert_called_once()
-    mock_udp_socket.socket.recvfrom.assert_called_once()
+    mock_udp_socket.socket.setblocking.assert_called_once_with(False)
+    mock_udp_socket.socket.recvfrom_into.assert_called_once()
+
+
+def test_udp_recv_into(mocker, mock_udp_socket):
+    """Test _cc_receive_into method writing the datagram into a buffer.
+
+    Validation criteria:
+     - the datagram is written into the given buffer
+     - the buffer can be parsed as a Message
+    """
+    raw_data = message_with_no_tlv.serialize()
+
+    def recvfrom_into(buffer):
+        buffer[: len(raw_data)] = raw_data
+        return len(raw_data), 1002
+
+    mock_udp_socket.socket.recvfrom_into = mocker.Mock(side_effect=recvfrom_into)
+    buffer = bytearray(256)
+
+    with CCUdp("120.0.0.7", 5005) as udp_inst:
+        nbytes = udp_inst._cc_receive_into(buffer, timeout=0.1)
+
+    assert nbytes == len(raw_data)
+    assert udp_inst.source_addr == 1002
+    msg = Message.parse_packet(memoryview(buffer)[:nbytes])
+    assert msg.serialize() == raw_data
+
+
+@pytest.mark.parametrize("error", [socket.timeout, BlockingIOError, ValueError])
+def test_udp_recv_into_error(mocker, mock_udp_socket, error):
+    mock_udp_socket.socket.recvfrom_into = mocker.Mock(side_effect=error)
+
+    with CCUdp("120.0.0.7", 5005) as udp_inst:
+        assert udp_inst._cc_receive_into(bytearray(256)) == 0
+
+
+@pytest.fixture
+def udp_peer():
+    """Real UDP socket bound on the loopback interface."""
+    peer = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    peer.bind(("127.0.0.1", 0))
+    yield peer
+    peer.close()
+
+
+def test_udp_loopback_batch_and_large_datagram(udp_peer):
+    """Test the reception on a real socket.
+
+    Validation criteria:
+     - datagrams longer than 256 bytes are not truncated
+     - the batch reception drains every queued datagram
+     - the receive buffer size is applied
+    """
+    large_message = Message(
+        msg_type=MessageType.LOG, tlv_dict={TlvKnownTags.FAILURE_REASON: "x" * 1000}
+    )
+    with CCUdp(*udp_peer.getsockname(), receive_buffer_size=65536) as udp_inst:
+        assert udp_inst._cc_receive(timeout=0.01) is None
+        udp_inst._cc_send(b"ping", raw=True)
+        _, address = udp_peer.recvfrom(16)
+        for msg in (large_message, message_with_tlv, message_with_no_tlv):
+            udp_peer.sendto(msg.serialize(), address)
+
+        received = udp_inst._cc_receive(timeout=1)
+        batch = udp_inst.cc_receive_batch(timeout=1)
+
+        assert received.tlv_dict[TlvKnownTags.FAILURE_REASON] == [ord("x")] * 1000
+        assert [msg.tlv_dict for msg in batch] == [
+            {
+                TlvKnownTags.TEST_REPORT: [79, 75],
+                TlvKnownTags.FAILURE_REASON: [18, 52, 86],
+            },
+            None,
+        ]
+        assert udp_inst.cc_receive_batch(timeout=0) == []
+        assert (
+            udp_inst.udp_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 65536
+        )
+
+
+def test_udp_loopback_batch_raw_max_count(udp_peer):
+    with CCUdp(*udp_peer.getsockname()) as udp_inst:
+        udp_inst._cc_send(b"ping", raw=True)
+        _, address = udp_peer.recvfrom(16)
+        for data in (b"\x01", b"\x02", b"\x03"):
+            udp_peer.sendto(data, address)
+
+        assert udp_inst.cc_receive_batch(timeout=1, raw=True, max_count=2) == [
+            b"\x01",
+            b"\x02",
+        ]
+        assert udp_inst.cc_receive_batch(timeout=1, raw=True) == [b"\x03"]
+        assert udp_inst.source_addr == udp_peer.getsockname()
@@ -56,13 +56,31 @@ def mock_udp_socket(mocker):
         bind = mocker.stub(name="bind")
         close = mocker.stub(name="close")
         sendto = mocker.stub(name="sendto")
-        settimeout = mocker.stub(name="settimeout")
-        recvfrom = mocker.stub(name="recvfrom")
+        setblocking = mocker.stub(name="setblocking")
+        setsockopt = mocker.stub(name="setsockopt")
+        recvfrom_into = mocker.stub(name="recvfrom_into")
 
     mocker.patch.object(socket, "socket", new=MockSocket)
+    mocker.patch("selectors.DefaultSelector")
     return socket
 
 
+def recvfrom_into_returning(*datagrams):
+    """Create a recvfrom_into side effect receiving the given
+    datagrams, then raising BlockingIOError.
+    """
+    datagrams = list(datagrams)
+
+    def recvfrom_into(buffer):
+        if not datagrams:
+            raise BlockingIOError
+        data, address = datagrams.pop(0)
+        buffer[: len(data)] = data
+        return len(data), address
+
+    return recvfrom_into
+
+
 def test_constructor_invalid():
     """Test invalid construct with no parameters given"""
 
@@ -77,7 +95,7 @@ def test_constructor_valid(mock_udp_socket):
     assert udp_server_inst.dest_ip == "120.0.0.7"
     assert udp_server_inst.dest_port == 5005
     assert udp_server_inst.address == None
-    assert udp_server_inst.max_msg_size == 256
+    assert udp_server_inst.max_msg_size == 65535
 
 
 def test_udp_server_close(mock_udp_socket):
@@ -127,14 +145,62 @@ def test_udp_server_recv_valid(
 
     Validation criteria:
      - message return is type of Message
-     - settimeout is call once
-     - recvfrom is call once
+     - the socket timeout is not changed
+     - recvfrom_into is call once
     """
-    mocker.patch("socket.socket.recvfrom", return_value=(raw_data[0], raw_data[1]))
+    mock_udp_socket.socket.recvfrom_into = mocker.Mock(
+        side_effect=recvfrom_into_returning(raw_data)
+    )
 
     with CCUdpServer("120.0.0.7", 5005) as udp_server:
         msg_received = udp_server._cc_receive(*cc_receive_param)
 
     assert isinstance(msg_received, expected_type) == True
-    mock_udp_socket.socket.settimeout.assert_called_once()
-    mock_udp_socket.socket.recvfrom.assert_called_once()
+    mock_udp_socket.socket.setblocking.assert_called_once_with(False)
+    mock_udp_socket.socket.recvfrom_into.assert_called_once()
+
+
+def test_udp_server_recv_into(mocker, mock_udp_socket):
+    """Test _cc_receive_into method writing the datagram into a buffer.
+
+    Validation criteria:
+     - the datagram is written into the given buffer
+     - the sender address is stored
+    """
+    raw_data = b"\x40\x01\x03\x00\x01\x02\x03\x00"
+
+    def recvfrom_into(buffer):
+        buffer[: len(raw_data)] = raw_data
+        return len(raw_data), 36
+
+    mock_udp_socket.socket.recvfrom_into = mocker.Mock(side_effect=recvfrom_into)
+    buffer = bytearray(256)
+
+    with CCUdpServer("120.0.0.7", 5005) as udp_server:
+        nbytes = udp_server._cc_receive_into(buffer, timeout=0.1)
+
+    assert buffer[:nbytes] == raw_data
+    assert udp_server.address == 36
+
+
+def test_udp_server_recv_batch(mocker, mock_udp_socket):
+    """Test cc_receive_batch draining the queued datagrams.
+
+    Validation criteria:
+     - the invalid datagrams are skipped
+     - the responses go to the sender of the last datagram
+    """
+    mock_udp_socket.socket.recvfrom_into = mocker.Mock(
+        side_effect=recvfrom_into_returning(
+            (message_with_tlv.serialize(), 1),
+            (b"\x00", 2),
+            (message_with_no_tlv.serialize(), 3),
+        )
+    )
+
+    with CCUdpServer("120.0.0.7", 5005) as udp_server:
+        messages = udp_server.cc_receive_batch(timeout=0.1)
+
+    assert [msg.tlv_dict is None for msg in messages] == [False, True]
+    assert udp_server.address == 3
+    assert mock_udp_socket.socket.recvfrom_into.call_count == 4
@@ -0,0 +1,66 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+import os
+
+import pytest
+
+from pykiso.checksum import Crc16, crc16
+
+
+def bitwise_crc16(data):
+    """Reference per-bit implementation of the message CRC."""
+    crc = 0
+    for byte in data:
+        crc = ((crc >> 8) | (crc << 8)) & 0xFFFF
+        crc ^= byte
+        crc ^= (crc & 0xFF) >> 4
+        crc ^= (crc << 12) & 0xFFFF
+        crc ^= ((crc & 0xFF) << 5) & 0xFFFF
+    return crc
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 7, 8, 255, 1024])
+def test_crc16_matches_bitwise_implementation(size):
+    data = os.urandom(size)
+
+    assert crc16(data) == bitwise_crc16(data)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"@\x01\x00\x00\x00UU\x00",
+        bytearray(b"@\x01\x00\x00\x00UU\x00"),
+        memoryview(b"xx@\x01\x00\x00\x00UU\x00")[2:],
+        [64, 1, 0, 0, 0, 85, 85, 0],
+    ],
+)
+def test_crc16_bytes_like(data):
+    assert crc16(data) == 2757
+
+
+def test_crc16_incremental():
+    data = os.urandom(100)
+    crc = Crc16()
+
+    for index in range(0, len(data), 7):
+        assert crc.update(data[index : index + 7]) is crc
+
+    assert crc.value == crc16(data)
+    assert crc.value == crc16(data[50:], crc16(data[:50]))
+
+
+def test_crc16_digest_and_reset():
+    crc = Crc16(b"@\x01\x00\x00\x00UU\x00")
+
+    assert crc.digest() == (2757).to_bytes(2, "big")
+    assert crc.digest("little") == (2757).to_bytes(2, "little")
+    crc.reset()
+    assert crc.value == 0
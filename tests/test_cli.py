@@ -47,3 +47,45 @@ def test_get_logging_options():
     assert options is not None
     assert options.log_level == "ERROR"
     assert options.report_type is None
+
+
+def test_initialize_logging_async(mocker):
+    root_logger = logging.getLogger()
+    mocker.patch.object(root_logger, "handlers", [])
+
+    cli.initialize_logging(None, "INFO", "text", async_logging=True)
+
+    assert cli.log_options.async_logging is True
+    assert len(root_logger.handlers) == 1
+    assert isinstance(root_logger.handlers[0], cli.DeferredQueueHandler)
+    assert cli.log_listener is not None
+    assert cli.log_listener._thread is not None
+
+    cli.stop_log_listener()
+
+    assert cli.log_listener is None
+
+
+def test_async_logging_writes_from_listener_thread(mocker):
+    written = []
+    handler = logging.Handler()
+    handler.emit = lambda record: written.append(record.getMessage())
+    queue_handler = cli.start_log_listener([handler])
+    logger = logging.getLogger("test_async_logging")
+    mocker.patch.object(logger, "handlers", [queue_handler])
+    mocker.patch.object(logger, "propagate", False)
+
+    logger.warning("value: %d", 42)
+    cli.stop_log_listener()
+
+    assert written == ["value: 42"]
+
+
+def test_deferred_queue_handler_prepare():
+    record = logging.LogRecord("test", logging.INFO, "", 0, "%s", ("arg",), None)
+
+    prepared = cli.DeferredQueueHandler(None).prepare(record)
+
+    assert prepared is record
+    assert prepared.msg == "%s"
+    assert prepared.args == ("arg",)
@@ -8,6 +8,7 @@
 ##########################################################################
 
 import itertools
+import logging
 import sys
 from unittest import TestCase, TestResult
 
@@ -157,6 +158,51 @@ def test_config_registry_and_test_execution(tmp_cfg, capsys):
     assert "FAIL" not in output.err
 
 
+def test_config_registry_and_test_execution_stats(tmp_cfg, caplog):
+    """Call run method and check the auxiliaries statistics
+
+    Validation criteria:
+        -  statistics are available for each auxiliary
+        -  a summary is logged at the end of the execution
+    """
+    cfg = parse_config(tmp_cfg)
+    ConfigRegistry.register_aux_con(cfg)
+    with caplog.at_level(logging.INFO, logger=test_execution.log.name):
+        test_execution.execute(cfg)
+    stats = ConfigRegistry.get_auxes_stats()
+    aliases = ConfigRegistry.get_auxes_alias()
+    ConfigRegistry.delete_aux_con()
+
+    assert set(stats) == set(aliases)
+    for alias, aux_stats in stats.items():
+        assert aux_stats["commands"] > 0
+        assert f"statistics of auxiliary {alias}" in caplog.text
+
+
+def test_config_registry_and_test_execution_worker_pool(tmp_cfg):
+    """Call run method with auxiliaries executed by the worker pool
+
+    Validation criteria:
+        -  run is executed without error
+        -  no thread is started for the auxiliaries
+    """
+    cfg = parse_config(tmp_cfg)
+    cfg["worker_pool"] = {"max_workers": 1}
+    for aux_details in cfg["auxiliaries"].values():
+        aux_details["config"] = {"use_worker_pool": True}
+    ConfigRegistry.register_aux_con(cfg)
+    exit_code = test_execution.execute(cfg)
+    auxes = list(ConfigRegistry.get_all_auxes().values())
+    ConfigRegistry.delete_aux_con()
+
+    assert exit_code == test_execution.ExitCode.ALL_TESTS_SUCCEEDED
+    assert auxes
+    for aux in auxes:
+        assert aux.worker_pool.max_workers == 1
+        assert not aux.is_alive()
+        assert aux.stop_event.is_set()
+
+
 def test_config_registry_and_test_execution_with_text_reporting(tmp_cfg, capsys):
     """Call run method from test_factory_and_execution using
     configuration data coming from parse_config method and
@@ -10,6 +10,7 @@
 import pytest
 
 from pykiso import CChannel, Flasher
+from pykiso.message import Message, MessageType, TlvKnownTags
 
 
 def test_cchan_abstract():
@@ -55,3 +56,54 @@ def test_cchan_interface(cchannel_inst, mocker):
     ]
     print(repr(expected_calls))
     assert expected_calls == tracer.mock_calls
+
+
+def test_cchan_receive_into(cchannel_inst):
+    cchannel_inst._cc_receive.return_value = b"\x01\x02\x03"
+    buffer = bytearray(8)
+
+    nbytes = cchannel_inst.cc_receive_into(buffer, timeout=0)
+
+    assert nbytes == 3
+    assert buffer[:nbytes] == b"\x01\x02\x03"
+    cchannel_inst._cc_receive.assert_called_once_with(timeout=0, raw=True)
+
+
+def test_cchan_receive_into_truncated(cchannel_inst, caplog):
+    cchannel_inst._cc_receive.return_value = b"\x01\x02\x03"
+    buffer = bytearray(2)
+
+    assert cchannel_inst.cc_receive_into(memoryview(buffer)) == 2
+    assert buffer == b"\x01\x02"
+    assert "truncated" in caplog.text
+
+
+def test_cchan_receive_into_nothing_received(cchannel_inst):
+    cchannel_inst._cc_receive.return_value = None
+
+    assert cchannel_inst.cc_receive_into(bytearray(2)) == 0
+
+
+def test_cchan_segmentation(cchannel_inst):
+    message = Message(
+        msg_type=MessageType.LOG, tlv_dict={TlvKnownTags.FAILURE_REASON: "x" * 500}
+    )
+    cchannel_inst.max_packet_size = 64
+
+    cchannel_inst.cc_send(message)
+
+    packets = [call.kwargs["msg"] for call in cchannel_inst._cc_send.call_args_list]
+    assert len(packets) == 10
+    assert all(call.kwargs["raw"] for call in cchannel_inst._cc_send.call_args_list)
+    cchannel_inst._cc_receive.side_effect = packets
+    received = [cchannel_inst.cc_receive() for _ in packets]
+    assert received[:-1] == [None] * 9
+    assert received[-1].tlv_dict[TlvKnownTags.FAILURE_REASON] == [ord("x")] * 500
+
+
+def test_cchan_segmentation_invalid_packet(cchannel_inst, caplog):
+    cchannel_inst.max_packet_size = 64
+    cchannel_inst._cc_receive.return_value = b"\x4f\x00"
+
+    assert cchannel_inst.cc_receive() is None
+    assert "invalid packet" in caplog.text
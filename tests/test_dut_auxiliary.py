@@ -434,3 +434,44 @@ def test_initialize_loggers_default(mocker):
 
     assert aux_log.level == logging.DEBUG
     assert pykiso_log.level == logging.DEBUG
+
+
+def test_receive_message_ack_not_acknowledged(mocker):
+    """ Test received acknowledgements are not acknowledged back """
+
+    receive_msg = Message(msg_type=MessageType.ACK)
+    com = MockCChanel(msg=receive_msg)
+
+    mocker.patch.object(AuxiliaryInterface, "start")
+    auxiliary = DUTAuxiliary("connector", com)
+    send_mock = mocker.patch.object(com, "_cc_send")
+
+    assert auxiliary._receive_message(1) == receive_msg
+    send_mock.assert_not_called()
+
+
+def test_send_command(mocker):
+    """ Test send command of a pipelined auxiliary """
+
+    com = MockCChanel()
+
+    mocker.patch.object(AuxiliaryInterface, "start")
+    auxiliary = DUTAuxiliary("connector", com, is_pipelined=True)
+    send_mock = mocker.patch.object(com, "cc_send")
+    cmd = Message()
+
+    assert auxiliary.is_pipelined
+    assert auxiliary._send_command(cmd) is True
+    send_mock.assert_called_once_with(msg=cmd)
+
+
+def test_send_command_fail(mocker):
+    """ Test send command fail """
+
+    com = MockCChanel()
+
+    mocker.patch.object(AuxiliaryInterface, "start")
+    auxiliary = DUTAuxiliary("connector", com, is_pipelined=True)
+    mocker.patch.object(com, "cc_send", side_effect=ConnectionError)
+
+    assert auxiliary._send_command(Message()) is False
@@ -0,0 +1,87 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+import threading
+
+import pytest
+
+from pykiso.instrumentation import DEPTH_BOUNDS, AuxiliaryStats, Histogram
+
+
+def test_histogram_empty():
+    histogram = Histogram()
+
+    assert histogram.snapshot() == {
+        "count": 0,
+        "mean": None,
+        "min": None,
+        "max": None,
+        "p50": None,
+        "p99": None,
+    }
+
+
+def test_histogram():
+    histogram = Histogram(bounds=(1, 2, 4, 8))
+    for value in (0.5, 1.5, 1.5, 3, 100):
+        histogram.record(value)
+
+    assert histogram.count == 5
+    assert histogram.mean == pytest.approx(21.3)
+    assert histogram.min == 0.5
+    assert histogram.max == 100
+    assert histogram.buckets == [1, 2, 1, 0, 1]
+    assert histogram.percentile(50) == 2
+    assert histogram.percentile(99) == 100
+
+
+def test_histogram_concurrent_record():
+    histogram = Histogram(bounds=(1, 2, 4, 8))
+
+    def record():
+        for value in range(1000):
+            histogram.record(value % 10)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert histogram.count == 4000
+    assert sum(histogram.buckets) == 4000
+    assert histogram.total == 4 * 100 * sum(range(10))
+    assert histogram.snapshot()["max"] == 9
+
+
+def test_histogram_percentile_bounded_by_max():
+    histogram = Histogram(DEPTH_BOUNDS)
+    histogram.record(3)
+
+    assert histogram.percentile(50) == 3
+
+
+def test_auxiliary_stats_summary():
+    stats = AuxiliaryStats()
+    stats.start()
+    stats.loop_iterations = 10
+    stats.run_command_time.record(0.25)
+
+    snapshot = stats.snapshot()
+    summary = stats.summary()
+
+    assert snapshot["loop_rate"] > 0
+    assert snapshot["run_command_time"]["count"] == 1
+    assert "loop_iterations: 10" in summary
+    assert "run_command_time: count=1, mean=0.25" in summary
+    assert "ack_wait" not in summary
+
+
+def test_auxiliary_stats_not_started():
+    assert AuxiliaryStats().loop_rate is None
@@ -14,11 +14,17 @@ import pytest
 
 from pykiso import message as message_mod
 from pykiso.message import (
+    MAX_EXTENDED_MESSAGE_SIZE,
     Message,
     MessageAckType,
     MessageCommandType,
+    MessageFlag,
+    MessageReassembler,
+    MessageStreamDecoder,
     MessageType,
     TlvKnownTags,
+    TlvView,
+    TokenAllocator,
 )
 
 
@@ -133,6 +139,20 @@ class MessageTest(unittest.TestCase):
             message.get_message_tlv_dict(),
         )
 
+    def test_parse_back_message_from_memoryview(self):
+        # Create raw message in a bigger reception buffer
+        raw_message = b"\x40\x01\x03\x00\x01\x02\x03\x09\x6e\x02\x4f\x4b\x70\x03\x12\x34\x56\x00\x8f"
+        buffer = bytearray(64)
+        buffer[: len(raw_message)] = raw_message
+        # Parse message back
+        message = Message.parse_packet(memoryview(buffer)[: len(raw_message)])
+        # Check content
+        self.assertEqual(1, message.get_message_token())
+        self.assertDictEqual(
+            Message.parse_packet(raw_message).get_message_tlv_dict(),
+            message.get_message_tlv_dict(),
+        )
+
     def test_ack_message_matching(self):
         # Create the messages
         message_sent = Message(
@@ -166,6 +186,352 @@ class MessageTest(unittest.TestCase):
         crc = Message.get_crc(b"@\x01\x00\x00\x00UU\x00", 2)
         self.assertEqual(b"\xc5\n", struct.pack("H", crc))
 
+    def test_message_serialization_tlv_int_and_crc(self):
+        message_for_test = Message(
+            msg_type=MessageType.COMMAND,
+            sub_type=MessageCommandType.TEST_CASE_SETUP,
+            tlv_dict={TlvKnownTags.TEST_REPORT: 0x1234},
+        )
+        message_for_test.msg_token = 1
+
+        output_result = message_for_test.serialize()
+
+        raw_packet = bytes.fromhex("40010300000000046e02") + struct.pack("H", 0x1234)
+        crc = struct.pack("H", Message.get_crc(raw_packet))
+        self.assertEqual(raw_packet + crc, output_result)
+
+    def test_message_serialization_unsupported_tlv(self):
+        message_for_test = Message(
+            msg_type=MessageType.COMMAND,
+            tlv_dict={TlvKnownTags.TEST_REPORT: 1.5, 0x12: "OK"},
+        )
+        message_for_test.msg_token = 1
+
+        output_result = message_for_test.serialize()
+
+        # unsupported value is sent empty, unsupported tag is not sent
+        self.assertEqual("40010000000000" + "056e00024f4b", output_result[:-2].hex())
+
+
+@pytest.mark.parametrize("offset", [0, 3])
+def test_serialize_into(offset):
+    message = Message(
+        msg_type=MessageType.COMMAND,
+        sub_type=MessageCommandType.TEST_CASE_SETUP,
+        test_suite=2,
+        test_case=3,
+        tlv_dict={TlvKnownTags.TEST_REPORT: "OK"},
+    )
+    buffer = bytearray(b"\xff" * 32)
+
+    length = message.serialize_into(buffer, offset)
+
+    expected = message.serialize()
+    assert length == len(expected)
+    assert buffer[offset : offset + length] == expected
+    assert buffer[:offset] == b"\xff" * offset
+    assert buffer[offset + length :] == b"\xff" * (32 - offset - length)
+
+
+def test_serialize_into_ctypes_buffer():
+    import ctypes
+
+    message = Message(
+        msg_type=MessageType.LOG, tlv_dict={TlvKnownTags.TEST_REPORT: "OK"}
+    )
+    buffer = ctypes.create_string_buffer(message_mod.MAX_MESSAGE_SIZE)
+
+    length = message.serialize_into(buffer)
+
+    assert buffer.raw[:length] == message.serialize()
+
+
+def test_serialize_into_too_small_buffer():
+    message = Message(
+        msg_type=MessageType.LOG, tlv_dict={TlvKnownTags.TEST_REPORT: "OK"}
+    )
+    buffer = bytearray(13)
+
+    with pytest.raises(ValueError):
+        message.serialize_into(memoryview(buffer), 1)
+    assert buffer == bytearray(13)
+
+
+RAW_MESSAGE_WITH_TLV = (
+    b"\x40\x01\x03\x00\x01\x02\x03\x09\x6e\x02\x4f\x4b\x70\x03\x12\x34\x56\x00\x8f"
+)
+
+
+def test_parse_packet_does_not_consume_token():
+    token = Message().msg_token
+
+    Message.parse_packet(RAW_MESSAGE_WITH_TLV)
+
+    assert Message().msg_token == (token + 1) % 256
+
+
+def test_parse_packet_lazy():
+    buffer = bytearray(RAW_MESSAGE_WITH_TLV)
+
+    message = Message.parse_packet(memoryview(buffer), lazy=True)
+
+    assert message.msg_type is MessageType.COMMAND
+    assert message.sub_type is MessageCommandType.TEST_CASE_SETUP
+    assert message.error_code == 0
+    assert (message.test_suite, message.test_case) == (2, 3)
+    tlv_dict = message.get_message_tlv_dict()
+    assert isinstance(tlv_dict, TlvView)
+    assert tlv_dict._offsets is None
+    assert tlv_dict == {
+        TlvKnownTags.TEST_REPORT: b"OK",
+        TlvKnownTags.FAILURE_REASON: b"\x12\x34\x56",
+    }
+    assert "tlv_dict:{<TlvKnownTags.TEST_REPORT: 110>: 'OK'" in str(message)
+
+
+def test_tlv_view_unknown_and_truncated_tlvs():
+    tlv_view = TlvView(memoryview(b"\x01\x01\xaa\x6e\x05\x4f\x4b"))
+
+    assert list(tlv_view) == [1, TlvKnownTags.TEST_REPORT]
+    assert tlv_view[1] == b"\xaa"
+    assert tlv_view[TlvKnownTags.TEST_REPORT] == b"OK"
+    # a tag without length is ignored
+    assert TlvView(memoryview(b"\x6e\x02\x4f\x4b\x70")) == {
+        TlvKnownTags.TEST_REPORT: b"OK"
+    }
+
+
+def test_parse_packet_invalid_sub_type():
+    raw_packet = b"\x40\x01\x62\x00\x00\x00\x00\x00"
+
+    with pytest.raises(ValueError):
+        Message.parse_packet(raw_packet + struct.pack("H", Message.get_crc(raw_packet)))
+
+
+def test_message_is_slotted():
+    message = Message(msg_type=MessageType.LOG)
+
+    assert not hasattr(message, "__dict__")
+    assert (Message.header_size, Message.crc_byte_size, Message.reserved) == (8, 2, 0)
+    with pytest.raises(AttributeError):
+        message.reserved = 1
+
+
+def test_message_token_policy():
+    token = Message().msg_token
+
+    message = Message(msg_type=MessageType.COMMAND, msg_token=200)
+    ack = message.generate_ack_message(MessageAckType.ACK)
+
+    assert message.msg_token == ack.msg_token == 200
+    assert message.check_if_ack_message_is_matching(ack)
+    # neither the explicit token nor the acknowledgement consumed one
+    assert Message().msg_token == (token + 1) % 256
+
+
+@pytest.fixture
+def stream_messages():
+    return [
+        Message(
+            msg_type=MessageType.LOG,
+            test_case=i,
+            tlv_dict={TlvKnownTags.TEST_REPORT: "log" * i} if i else None,
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_stream_decoder_chunks(stream_messages, chunk_size):
+    stream = b"".join(msg.serialize() for msg in stream_messages)
+    decoder = MessageStreamDecoder()
+    decoded = []
+
+    for i in range(0, len(stream), chunk_size):
+        decoder.feed(stream[i : i + chunk_size])
+        decoded.extend(decoder)
+
+    assert [(msg.msg_token, msg.test_case) for msg in decoded] == [
+        (msg.msg_token, msg.test_case) for msg in stream_messages
+    ]
+    assert decoded[1].tlv_dict == {TlvKnownTags.TEST_REPORT: [108, 111, 103]}
+    assert decoder.dropped_bytes == 0
+    assert len(decoder) == 0
+    assert decoder.get_message() is None
+
+
+def test_stream_decoder_resynchronization(stream_messages):
+    first, second = (msg.serialize() for msg in stream_messages[1:3])
+    corrupted = first[:-1] + bytes([first[-1] ^ 0xFF])
+
+    # depending on the tokens, the corrupted packet can contain a header
+    # announcing a payload longer than the following packet
+    filler = b"".join(msg.serialize() for msg in stream_messages * 4)
+
+    decoder = MessageStreamDecoder()
+    assert decoder.feed(b"\x00\x41" + corrupted + second[:5]) == 0
+    assert decoder.feed(second[5:] + filler) == 1 + 4 * len(stream_messages)
+
+    assert decoder.get_packet() == second
+    assert decoder.dropped_bytes == 2 + len(corrupted)
+
+
+def test_stream_decoder_resynchronization_long_header(stream_messages):
+    # valid header announcing a 200 bytes payload, with a wrong CRC
+    header = bytearray(stream_messages[0].serialize()[: Message.header_size])
+    header[-1] = 200
+    corrupted = bytes(header) + b"\x00" * 3
+    packets = [msg.serialize() for msg in stream_messages * 4]
+    stream = b"".join(packets)
+    assert len(stream) > 200
+
+    decoder = MessageStreamDecoder()
+    # the decoder waits for the announced payload
+    assert decoder.feed(corrupted + stream[:20]) == 0
+    assert decoder.feed(stream[20:]) == len(packets)
+
+    # the CRC check failed, only the bytes before the first packet are lost
+    assert [decoder.get_packet() for _ in packets] == packets
+    assert decoder.dropped_bytes == len(corrupted)
+
+
+def test_stream_decoder_lazy_and_reset(stream_messages):
+    decoder = MessageStreamDecoder(lazy=True)
+    decoder.feed(stream_messages[1].serialize() * 2 + b"\x40\x01")
+
+    assert len(decoder) == 2
+    assert decoder.get_message().tlv_dict == {TlvKnownTags.TEST_REPORT: b"log"}
+    decoder.reset()
+    assert len(decoder) == 0
+    assert decoder.feed(stream_messages[0].serialize()) == 1
+
+
+def test_token_allocator():
+    allocator = TokenAllocator(window=3)
+
+    assert [allocator.allocate() for _ in range(3)] == [0, 1, 2]
+    # the window is full
+    assert allocator.allocate() is None
+    allocator.release(1)
+    assert allocator.in_flight == {0, 2}
+    assert allocator.allocate() == 3
+
+
+def test_token_allocator_skips_tokens_in_flight():
+    allocator = TokenAllocator()
+    tokens = [allocator.allocate() for _ in range(256)]
+    for token in tokens[1:]:
+        allocator.release(token)
+
+    assert allocator.allocate() is not None
+    # the token 0 is still in flight and not reused after wrapping
+    assert 0 not in [allocator.allocate() for _ in range(254)]
+    assert allocator.allocate() is None
+
+
+def test_token_allocator_invalid_window():
+    with pytest.raises(ValueError):
+        TokenAllocator(window=0)
+
+
+@pytest.fixture
+def extended_message():
+    return Message(
+        msg_type=MessageType.LOG,
+        msg_token=7,
+        test_suite=1,
+        test_case=2,
+        tlv_dict={
+            TlvKnownTags.TEST_REPORT: "OK",
+            TlvKnownTags.FAILURE_REASON: bytes(range(256)) * 4,
+        },
+    )
+
+
+def test_extended_format(extended_message):
+    raw_packet = extended_message.serialize()
+
+    assert raw_packet[0] == 0x70 | MessageFlag.EXTENDED
+    assert struct.unpack_from("=H", raw_packet, 7)[0] == len(raw_packet) - 11
+    message = Message.parse_packet(raw_packet)
+    assert message.tlv_dict[TlvKnownTags.TEST_REPORT] == [79, 75]
+    assert message.tlv_dict[TlvKnownTags.FAILURE_REASON] == list(range(256)) * 4
+    lazy_message = Message.parse_packet(raw_packet, lazy=True)
+    assert lazy_message.tlv_dict == {
+        TlvKnownTags.TEST_REPORT: b"OK",
+        TlvKnownTags.FAILURE_REASON: bytes(range(256)) * 4,
+    }
+    buffer = bytearray(len(raw_packet))
+    assert extended_message.serialize_into(buffer) == len(raw_packet)
+    assert buffer == raw_packet
+
+
+def test_extended_format_only_if_needed():
+    # 255 bytes of payload still fit in the standard format
+    message = Message(
+        msg_type=MessageType.LOG, tlv_dict={TlvKnownTags.TEST_REPORT: "x" * 253}
+    )
+
+    raw_packet = message.serialize()
+
+    assert raw_packet[0] == 0x70
+    assert len(raw_packet) == 8 + 255 + 2
+    assert message.serialize_segments(len(raw_packet)) == [raw_packet]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_segments_reassembly(extended_message, lazy):
+    segments = extended_message.serialize_segments(100)
+    reassembler = MessageReassembler(lazy=lazy)
+
+    assert all(len(segment) <= 100 for segment in segments)
+    assert [segment[0] & 0xF for segment in segments] == [7] * (len(segments) - 1) + [3]
+    # segments of another message can be interleaved
+    assert reassembler.add(segments[0]) is None
+    assert reassembler.add(RAW_MESSAGE_WITH_TLV).msg_type is MessageType.COMMAND
+    for segment in segments[1:-1]:
+        assert reassembler.add(segment) is None
+    message = reassembler.add(segments[-1])
+
+    assert (message.msg_token, message.test_suite, message.test_case) == (7, 1, 2)
+    assert len(message.tlv_dict[TlvKnownTags.FAILURE_REASON]) == 1024
+    assert reassembler._payloads == {}
+
+
+def test_segments_corrupted_and_invalid(extended_message, caplog):
+    segments = extended_message.serialize_segments(100)
+    reassembler = MessageReassembler()
+
+    reassembler.add(segments[0])
+    assert reassembler.add(segments[1][:-1] + b"\x00") is None
+    assert "CRC check failed" in caplog.text
+    # the incomplete message was dropped
+    assert reassembler._payloads == {}
+    # segments cannot be decoded without reassembly
+    with pytest.raises(ValueError):
+        Message.parse_packet(segments[0])
+    with pytest.raises(ValueError):
+        extended_message.serialize_segments(11)
+
+
+def test_stream_decoder_extended_and_segments(extended_message, stream_messages):
+    stream = (
+        extended_message.serialize()
+        + stream_messages[1].serialize()
+        + b"".join(extended_message.serialize_segments(64))
+    )
+    decoder = MessageStreamDecoder(max_packet_size=MAX_EXTENDED_MESSAGE_SIZE)
+
+    for i in range(0, len(stream), 50):
+        decoder.feed(stream[i : i + 50])
+
+    assert [msg.test_case for msg in decoder] == [2, 1, 2]
+    assert decoder.dropped_bytes == 0
+    # the extended message is too long for the default decoder
+    decoder = MessageStreamDecoder()
+    decoder.feed(stream)
+    assert [msg.test_case for msg in decoder] == [1, 2]
+
 
 if __name__ == "__main__":
     # Start unittests
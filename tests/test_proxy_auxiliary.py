@@ -16,6 +16,7 @@ import unittest.mock as mock
 import pytest
 
 import pykiso
+from pykiso.bounded_queue import BoundedQueue
 from pykiso.connector import CChannel
 from pykiso.lib.auxiliaries.proxy_auxiliary import (
     AuxiliaryInterface,
@@ -23,6 +24,7 @@ from pykiso.lib.auxiliaries.proxy_auxiliary import (
     ProxyAuxiliary,
     log,
 )
+from pykiso.lib.connectors.cc_proxy import CCProxy
 
 AUX_LIST_NAMES = ["MockAux1", "MockAux2"]
 AUX_LIST_INCOMPATIBLE = ["MockAux3"]
@@ -344,6 +346,24 @@ def test_dispatch_command(mocker, cchannel_inst, mock_auxiliaries, message, remo
     assert r_id == remote_id
 
 
+def test_dispatch_command_queue_full(mocker, caplog, cchannel_inst, mock_auxiliaries):
+    mocker.patch(
+        "pykiso.lib.auxiliaries.proxy_auxiliary.ProxyAuxiliary.run", return_value=None
+    )
+
+    proxy_inst = ProxyAuxiliary(cchannel_inst, [*AUX_LIST_NAMES])
+
+    conn_use = sys.modules["pykiso.auxiliarie.MockAux1"].channel
+    conn_not_use = sys.modules["pykiso.auxiliarie.MockAux2"].channel
+    conn_not_use.queue_out = BoundedQueue(1, "fail")
+
+    proxy_inst._dispatch_command(b"\x01", conn_use, None)
+    proxy_inst._dispatch_command(b"\x02", conn_use, None)
+
+    assert conn_not_use.queue_out.get() == [b"\x01", None]
+    assert "message lost" in caplog.text
+
+
 def test_run_command(mocker, cchannel_inst, mock_auxiliaries):
     mocker.patch(
         "pykiso.lib.auxiliaries.proxy_auxiliary.ProxyAuxiliary.run", return_value=None
@@ -413,3 +433,36 @@ def test_run(mocker, cchannel_inst, mock_auxiliaries):
     msg, r_id = conn_2.queue_out.get()
     assert msg == b"\x12\x34\x56"
     assert r_id == None
+
+
+def test_proxy_connector_send_wakes_up_proxy(mocker, cchannel_inst):
+    class MockAuxWithProxy:
+        def __init__(self, **kwargs):
+            self.channel = CCProxy(name="proxy_channel")
+            self.is_proxy_capable = True
+
+    sys.modules["pykiso.auxiliarie.MockAuxWithProxy"] = MockAuxWithProxy()
+
+    def blocking_receive(timeout, raw):
+        time.sleep(timeout)
+        return None, None
+
+    mocker.patch.object(cchannel_inst, "cc_receive", side_effect=blocking_receive)
+    proxy_inst = ProxyAuxiliary(cchannel_inst, ["MockAuxWithProxy"], receive_timeout=1)
+    proxy_channel = proxy_inst.proxy_channels[0]
+    proxy_channel.open()
+    proxy_inst.create_instance()
+    # let the proxy wait on its channel
+    time.sleep(0.05)
+
+    t_start = time.perf_counter()
+    proxy_channel.cc_send(msg=b"\x01", raw=True)
+    while not cchannel_inst._cc_send.called and time.perf_counter() - t_start < 1:
+        time.sleep(0.001)
+
+    # the command is forwarded without waiting for the receive timeout
+    assert time.perf_counter() - t_start < 0.5
+    cchannel_inst._cc_send.assert_called_once_with(msg=b"\x01", raw=True)
+    proxy_channel.close()
+    proxy_inst.stop()
+    proxy_inst.join()
@@ -9,6 +9,7 @@
 
 import sys
 import unittest
+from unittest import mock
 
 import pytest
 
@@ -53,6 +54,30 @@ class IntegrationTestCase(unittest.TestCase):
         self.assertEqual(result.testsRun, len(parameters))
 
 
+@pytest.mark.usefixtures("CustomTestCaseAndSuite")
+class IntegrationConcurrentTestCase(unittest.TestCase):
+    def test_load_concurrent_test_case(self):
+        """run a default test case interacting with all its auxiliaries at
+        once
+
+        Validation criteria:
+        -  all test are PASSED
+        -  no error nor failure are reported
+        """
+        self.init.create_communication_pipeline(3)
+        self.init.prepare_default_test_cases((1, 1, self.init.auxiliaries))
+
+        with mock.patch.object(test_case.BasicTest, "concurrent_interaction", True):
+            runner = unittest.TextTestRunner()
+            result = runner.run(self.init.suite)
+        self.init.stop()
+
+        self.assertEqual(result.wasSuccessful(), True)
+        self.assertEqual(len(result.errors), 0)
+        self.assertEqual(len(result.failures), 0)
+        self.assertEqual(result.testsRun, 1)
+
+
 @pytest.mark.parametrize(
     "suite_id, case_id, aux_list, setup_timeout, run_timeout, teardown_timeout, test_ids",
     [
@@ -0,0 +1,188 @@
+##########################################################################
+# Copyright (c) 2010-2021 Robert Bosch GmbH
+# This program and the accompanying materials are made available under the
+# terms of the Eclipse Public License 2.0 which is available at
+# http://www.eclipse.org/legal/epl-2.0.
+#
+# SPDX-License-Identifier: EPL-2.0
+##########################################################################
+
+import threading
+import time
+
+import pytest
+
+from pykiso import worker_pool
+from pykiso.auxiliary import AuxiliaryInterface
+
+
+class MockAuxiliary(AuxiliaryInterface):
+    def __init__(self, messages=None, **kwargs):
+        self.messages = list(messages or [])
+        self.receive_calls = 0
+        self.receive_timeouts = set()
+        self.deleted = threading.Event()
+        self.threads = set()
+        super().__init__(use_worker_pool=True, **kwargs)
+
+    def _create_auxiliary_instance(self):
+        return True
+
+    def _delete_auxiliary_instance(self):
+        self.deleted.set()
+        return True
+
+    def _run_command(self, cmd_message, cmd_data=None):
+        self.threads.add(threading.current_thread().name)
+        return cmd_message
+
+    def _abort_command(self):
+        return True
+
+    def _receive_message(self, timeout_in_s):
+        self.receive_calls += 1
+        self.receive_timeouts.add(timeout_in_s)
+        if self.messages:
+            return self.messages.pop(0)
+        return None
+
+
+@pytest.fixture
+def pool():
+    pool = worker_pool.configure_worker_pool(2)
+    yield pool
+    worker_pool.shutdown_worker_pool()
+
+
+def test_worker_pool_invalid_max_workers():
+    with pytest.raises(ValueError):
+        worker_pool.WorkerPool(0)
+
+
+def test_get_worker_pool_default():
+    pool = worker_pool.get_worker_pool()
+
+    assert pool is worker_pool.get_worker_pool()
+    assert pool.max_workers == worker_pool.DEFAULT_MAX_WORKERS
+    worker_pool.shutdown_worker_pool()
+    assert worker_pool._worker_pool is None
+
+
+def test_aux_runs_on_worker_pool(pool):
+    auxes = [MockAuxiliary(name=f"aux_{i}", receive_timeout=0.01) for i in range(5)]
+
+    for aux in auxes:
+        assert aux.worker_pool is pool
+        assert not aux.is_alive()
+        assert aux.create_instance() is True
+    for aux in auxes:
+        assert aux.run_command("ping", timeout_in_s=1) == "ping"
+    workers = set.union(*(aux.threads for aux in auxes))
+    assert all(name.startswith("AuxiliaryWorker") for name in workers)
+    assert len(workers) <= pool.max_workers
+
+
+def test_aux_on_worker_pool_forwards_messages(pool):
+    aux = MockAuxiliary(name="aux", messages=["log_1", "log_2"], receive_timeout=0.01)
+    aux.create_instance()
+
+    assert aux.wait_and_get_report(blocking=True, timeout_in_s=1) == "log_1"
+    assert aux.wait_and_get_report(blocking=True, timeout_in_s=1) == "log_2"
+    # the instance keeps being polled while idle, without spinning
+    time.sleep(0.1)
+    assert 2 < aux.receive_calls <= 20
+
+
+def test_idle_aux_is_not_polled(pool):
+    aux = MockAuxiliary(name="aux", receive_timeout=0.01)
+    time.sleep(0.05)
+
+    assert aux.receive_calls == 0
+    assert aux.stats.loop_iterations <= 1
+
+
+def test_idle_aux_does_not_block_workers():
+    pool = worker_pool.configure_worker_pool(1)
+    try:
+        idle_aux = MockAuxiliary(name="idle_aux", receive_timeout=1)
+        idle_aux.create_instance()
+        aux = MockAuxiliary(name="aux", receive_timeout=1)
+        aux.create_instance()
+
+        t_start = time.perf_counter()
+        assert aux.run_command("ping", timeout_in_s=1) == "ping"
+        assert time.perf_counter() - t_start < 0.5
+        assert idle_aux.receive_timeouts == {0}
+    finally:
+        worker_pool.shutdown_worker_pool()
+
+
+def test_idle_aux_poll_backoff(pool):
+    aux = MockAuxiliary(name="aux", receive_timeout=0.05)
+    aux.create_instance()
+    time.sleep(0.2)
+
+    assert pool._poll_intervals[aux] == pytest.approx(0.05, rel=0.2)
+    # a request resets the backoff
+    aux.run_command("ping", timeout_in_s=1)
+    assert pool._poll_intervals.get(aux, 0) < 0.05
+
+
+def test_stop_aux_on_worker_pool(pool):
+    aux = MockAuxiliary(name="aux", receive_timeout=0.01)
+    aux.create_instance()
+    aux.stop()
+
+    assert aux.deleted.wait(1)
+    assert aux not in pool._auxiliaries
+
+
+def test_shutdown_stops_auxiliaries(pool):
+    aux = MockAuxiliary(name="aux", receive_timeout=0.01)
+    aux.create_instance()
+
+    worker_pool.shutdown_worker_pool()
+
+    assert aux.stop_event.is_set()
+    assert aux.deleted.is_set()
+    with pytest.raises(RuntimeError):
+        pool.register(aux)
+
+
+def test_step_error_stops_aux(mocker, pool, caplog):
+    aux = MockAuxiliary(name="aux", receive_timeout=0.01)
+    mocker.patch.object(aux, "_run_command", side_effect=ValueError("boom"))
+    aux.create_instance()
+
+    aux.submit_command("ping")
+
+    assert aux.deleted.wait(1)
+    assert aux.stop_event.is_set()
+    assert "encountered error while executing" in caplog.text
+
+
+def test_pinned_executor_pool_invalid_max_workers():
+    with pytest.raises(ValueError):
+        worker_pool.PinnedExecutorPool(0)
+
+
+def test_pinned_executor_pool_spreads_users():
+    executors = worker_pool.PinnedExecutorPool(2)
+    first = executors.acquire()
+    second = executors.acquire()
+    third = executors.acquire()
+
+    assert first is not second
+    assert third is first
+    executors.release(first)
+    executors.release(third)
+    # the least used executor is given first
+    assert executors.acquire() is first
+    # a pinned user always runs in the same thread
+    threads = {first.submit(threading.current_thread).result() for _ in range(5)}
+    assert len(threads) == 1
+    executors.shutdown()
+
+
+def test_get_adapter_executors():
+    assert worker_pool.get_adapter_executors() is worker_pool.get_adapter_executors()